@@ -1,92 +1,123 @@
 import cv2
-import os
-from utils import overlay_transparent
-# -------------------------------
-# Load the sunglasses image
-# IMREAD_UNCHANGED keeps the alpha channel (transparency)
-# This is what lets the background to show through
-# -------------------------------
-
-script_dir = os.path.dirname(os.path.abspath(__file__))
-assets_path = os.path.join(script_dir, "..", "assets", "sunglasses.png")
-sunglasses = cv2.imread(assets_path, cv2.IMREAD_UNCHANGED)
-
-if sunglasses is None:
-    print(f"Error: Could not load image at {assets_path}")
-    exit()
-
-# -------------------------------
-# Load the pre-trained face detection model
-# This model was trained to recognize human faces
-# -------------------------------
-face_cascade = cv2.CascadeClassifier(
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
-
-# if the model fails to load, stop the program
-if face_cascade.empty():
-    print("Error loading face detection model")
-    exit()
-
-# -------------------------------
-# Open the webcam
-# 0 = default camera on your computer
-# -------------------------------
-
-cap = cv2.VideoCapture(0)
-
-if not cap.isOpened():
-    print("Can't open the camera")
-    exit()
-
-# -------------------------------
-# main loop: runs continuously until the user quits
-# -------------------------------
-
-while True:
-    ret, frame = cap.read()
-    if not ret: # if the frame wasn't captured properly, stop
-        print("Can't receive frame")
-        break
+from sprites import load_sprite
+from quality import apply_face_quality
+from runner import run_demo
+from profiling import profiler
+from face_tracking import FaceTracker
+from face_detector import CascadeDetector
+from frame_pool import FramePool
 
-    # -------------------------------
-    # convert the image to grayscale
-    # face detection works faster and better in grayscale
-    # -------------------------------
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-    # -------------------------------
-    # detect faces in the image
-    # scaleFactor: how much the image size is reduced at each scale
-    # minNeighbors: how many neighbors each candidate rectangle should have
-    # higher = fewer false positives but more true negatives
-    # minSize: smalest face size to detect
-    # -------------------------------
-    faces = face_cascade.detectMultiScale(
-        gray, 
-        scaleFactor = 1.1,
-        minNeighbors = 5, 
-        minSize = (30, 30)
-    )
+class ARSunglassesDemo:
+    WINDOW_NAME = "Face Detection with AR Sunglasses"
+
+    def __init__(self, face_cascade=None):
+        # -------------------------------
+        # Load the sunglasses image
+        # The alpha channel (transparency) is kept
+        # This is what lets the background to show through
+        # -------------------------------
+        # A Sprite caches resized copies by size instead of resizing again on
+        # every frame; it loads from the asset cache, so the PNG is only
+        # decoded the first time (see asset_store.py)
+        self.sunglasses = load_sprite("sunglasses.png")
+
+        if self.sunglasses is None:
+            raise RuntimeError("Error: Could not load image assets/sunglasses.png")
+
+        # -------------------------------
+        # Load the pre-trained face detection model
+        # This model was trained to recognize human faces
+        # -------------------------------
+        if face_cascade is None:
+            face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+            )
+
+        # if the model fails to load, stop the program
+        if face_cascade.empty():
+            raise RuntimeError("Error loading face detection model")
+
+        # -------------------------------
+        # detect faces in the image
+        # scaleFactor: how much the image size is reduced at each scale
+        # minNeighbors: how many neighbors each candidate rectangle should have
+        # higher = fewer false positives but more true negatives
+        # min_face: smalest face size to detect
+        # the frame is shrunk before detection so a min_face-sized face is just
+        # big enough for the cascade; a bigger min_face (e.g. 60) is much faster
+        # on HD cameras, but faces smaller than it are missed
+        # -------------------------------
+        self.detector = CascadeDetector(
+            face_cascade,
+            min_face = 30,
+            scale_factor = 1.1,
+            min_neighbors = 5
+        )
+
+        # -------------------------------
+        # the detector is slow, so it only runs every 10 frames
+        # in between, each face is followed by a quick search near its last position
+        # this also keeps the sunglasses from jittering
+        # -------------------------------
+        self.tracker = FaceTracker(self.detector.detect, detect_every=10, detect_near=self.detector.detect)
+
+        # -------------------------------
+        # the grayscale image is written into the same buffer every frame
+        # instead of a new one
+        # -------------------------------
+        self.buffers = FramePool()
+
+    def process_frame(self, frame):
+        # -------------------------------
+        # convert the image to grayscale
+        # face detection works faster and better in grayscale
+        # -------------------------------
+        with profiler.span("cvtColor"):
+            gray = self.buffers.get("gray", frame.shape[:2])
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+
+        # -------------------------------
+        # detect (or track) the faces in the image
+        # -------------------------------
+        faces = self.tracker.update(gray)
+
+        # -------------------------------
+        # for each detected face, add some sunglasses
+        # -------------------------------
+        for face in faces:
+            x, y, w, h = face.rect()
+            # position sunglasses roughly over the eyes
+            # y + h/4 moves them down from the top of the face
+            self.sunglasses.draw(frame, x, y + h // 4, size=(w, h // 3))
+        return frame
+
+    def set_quality(self, settings):
+        # Called by run_demo to hold the target frame rate (see quality.py)
+        apply_face_quality(self.detector, self.tracker, settings)
+
+    def handle_key(self, key):
+        return True
+
+    def close(self):
+        pass
+
+
+def main():
+    try:
+        demo = ARSunglassesDemo()
+    except RuntimeError as error:
+        print(error)
+        return
 
     # -------------------------------
-    # for each detected face, add some sunglasses
-    # -------------------------------
-    for (x, y, w, h) in faces:
-        # position sunglasses roughly over the eyes
-        # y + h/4 moves them down from the top of the face
-        overlay_transparent(frame, sunglasses, x, y + h // 4, overlay_size=(w, h // 3))
-    
-    # -------------------------------
-    # # Display the final result
-    # -------------------------------
-    cv2.imshow("Face Detection with AR Sunglasses", frame)
+    # main loop: runs continuously until the user quits
+    # reads from the webcam (0 = default camera on your computer,
+    # or set UTEACH_SOURCE to use a video file or a synthetic test pattern)
     # press 'q' to quit the program
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-# -------------------------------
-# release the camera and close all windows
-# -------------------------------
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+    # -------------------------------
+    run_demo(demo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Converts PNG assets once into cache files that load instantly.
+
+Decoding a big PNG (watermelon.png is 2500x2500) takes a while, and drawing it
+at 80x80 means shrinking the whole thing. So each asset is converted once into
+a cache file next to it (assets/.cache/<file name>-<path hash>.bin) that holds:
+
+    - premultiplied alpha: color already multiplied by alpha, ready to blend
+    - a mipmap chain: the image at full size, half size, quarter size, ...
+      each one filtered down from the one before
+
+The .bin file is memory-mapped, so startup only reads the small index file
+(the .json next to it) and the sizes that are actually drawn come from the nearest
+mip level instead of the full-size image. When the PNG changes (its size or
+modification time), the cache is rebuilt the next time it's loaded.
+
+    python3 demos/asset_store.py            # convert every asset, compare load times
+    python3 demos/asset_store.py --rebuild  # convert even if the cache is fresh
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import cv2
+import numpy as np
+from utils import PreparedOverlay
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets")
+CACHE_DIR = os.path.join(ASSETS_DIR, ".cache")
+CACHE_VERSION = 1
+MIN_MIP_SIZE = 8  # stop halving once a side would get smaller than this
+
+
+def premultiply(image):
+    """BGR or BGRA uint8 -> BGRA uint8 with the color multiplied by alpha (rounded)."""
+    if image.ndim != 3 or image.shape[2] not in (3, 4):
+        raise ValueError(f"Expected a BGR or BGRA image, got shape {image.shape}")
+    if image.shape[2] == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)  # opaque: nothing to multiply
+    alpha = image[:, :, 3:4].astype(np.uint16)
+    out = np.empty_like(image)
+    out[:, :, :3] = (image[:, :, :3] * alpha + 127) // 255
+    out[:, :, 3:4] = alpha
+    return out
+
+
+class MipChain:
+    """
+    An image as premultiplied BGRA levels, full size first and each next level
+    half the size of the one before.
+
+    Filtering premultiplied pixels (instead of plain RGBA) keeps transparent
+    pixels from bleeding dark fringes into the edges of smaller levels.
+    """
+
+    def __init__(self, levels):
+        self.levels = levels
+
+    @classmethod
+    def from_image(cls, image):
+        levels = [premultiply(image)]
+        h, w = levels[0].shape[:2]
+        while min(w, h) // 2 >= MIN_MIP_SIZE:
+            w, h = w // 2, h // 2
+            levels.append(cv2.resize(levels[-1], (w, h), interpolation=cv2.INTER_AREA))
+        return cls(levels)
+
+    @property
+    def size(self):
+        h, w = self.levels[0].shape[:2]
+        return (w, h)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+    def level_for(self, size):
+        """Index of the smallest level that is still at least `size`, so it is only ever shrunk."""
+        w, h = size
+        best = 0
+        for index, level in enumerate(self.levels):
+            if level.shape[1] >= w and level.shape[0] >= h:
+                best = index
+            else:
+                break
+        return best
+
+    def prepare(self, size=None):
+        """Returns a PreparedOverlay at size=(width, height), resized from the nearest level."""
+        if size is None:
+            size = self.size
+        level = self.levels[self.level_for(size)]
+        if (level.shape[1], level.shape[0]) != tuple(size):
+            shrinking = level.shape[1] >= size[0] and level.shape[0] >= size[1]
+            interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+            level = cv2.resize(level, tuple(size), interpolation=interpolation)
+
+        # Resizing can round a color a step above its alpha; clamp so the
+        # saturating blend in utils.blend_prepared stays exact
+        alpha = level[:, :, 3:4]
+        premultiplied = np.minimum(level[:, :, :3], alpha)
+        inv_alpha = np.repeat(255 - alpha, 3, axis=2)
+        return PreparedOverlay(premultiplied, inv_alpha)
+
+
+# -------------------------------
+# The cache files
+# -------------------------------
+
+def _cache_paths(path, cache_dir):
+    # The file name (extension included) keeps the cache readable, and a hash
+    # of the full path keeps foo.png and foo.jpg, or two sprites/foo.png in
+    # different folders, from overwriting each other's cache
+    digest = hashlib.sha1(os.path.realpath(path).encode("utf-8")).hexdigest()[:10]
+    name = f"{os.path.basename(path)}-{digest}"
+    return os.path.join(cache_dir, name + ".json"), os.path.join(cache_dir, name + ".bin")
+
+
+def _source_key(path):
+    # Cheap to check on every start: no need to read the PNG itself
+    info = os.stat(path)
+    return {"version": CACHE_VERSION, "size": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def _read_cache(path, cache_dir):
+    """Returns the cached MipChain, or None if there is none or the PNG changed since."""
+    index_path, data_path = _cache_paths(path, cache_dir)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get("source") != _source_key(path):
+            return None
+        data = np.memmap(data_path, dtype=np.uint8, mode="r")
+    except (OSError, ValueError):
+        return None
+
+    levels = []
+    for w, h, offset in index["levels"]:
+        if offset + w * h * 4 > data.size:
+            return None  # truncated file
+        levels.append(data[offset:offset + w * h * 4].reshape(h, w, 4))
+    return MipChain(levels)
+
+
+def _write_cache(path, cache_dir, mips):
+    index_path, data_path = _cache_paths(path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    levels, offset = [], 0
+    # Write to temporary files and rename them into place, so a demo starting
+    # at the same time (e.g. classroom mode) never reads a half-written cache
+    suffix = f".{os.getpid()}.tmp"
+    with open(data_path + suffix, "wb") as f:
+        for level in mips.levels:
+            h, w = level.shape[:2]
+            f.write(np.ascontiguousarray(level).tobytes())
+            levels.append([w, h, offset])
+            offset += w * h * 4
+    with open(index_path + suffix, "w") as f:
+        json.dump({"source": _source_key(path), "levels": levels}, f)
+    # The data goes first: the index is what marks the cache as valid
+    os.replace(data_path + suffix, data_path)
+    os.replace(index_path + suffix, index_path)
+
+
+def load_mips(name, cache_dir=CACHE_DIR, rebuild=False):
+    """
+    Loads an asset as a MipChain: `name` is a file in assets/ (e.g. "splash.png")
+    or a path. Uses the cache when it's fresh and (re)builds it otherwise.
+    Returns None if the image can't be loaded, just like cv2.imread.
+    """
+    path = name if os.path.dirname(name) else os.path.join(ASSETS_DIR, name)
+    if not rebuild:
+        mips = _read_cache(path, cache_dir)
+        if mips is not None:
+            return mips
+
+    image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        return None
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    mips = MipChain.from_image(image)
+    try:
+        _write_cache(path, cache_dir, mips)
+    except OSError as error:
+        # Still works without a cache, it just starts slower next time
+        print(f"Warning: could not write asset cache for {path}: {error}")
+    return mips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="convert every asset even if its cache is fresh")
+    args = parser.parse_args()
+
+    names = sorted(name for name in os.listdir(ASSETS_DIR) if name.lower().endswith(".png"))
+    print(f"{'asset':<22} {'size':>11} {'levels':>6} {'cache MB':>9} {'PNG ms':>8} {'cache ms':>9}")
+    for name in names:
+        path = os.path.join(ASSETS_DIR, name)
+        mips = load_mips(name, rebuild=args.rebuild)
+        if mips is None:
+            print(f"{name:<22} could not be loaded")
+            continue
+
+        start = time.perf_counter()
+        cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        png_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        load_mips(name)
+        cache_ms = (time.perf_counter() - start) * 1000
+
+        w, h = mips.size
+        print(f"{name:<22} {f'{w}x{h}':>11} {len(mips.levels):>6} {mips.nbytes / 2**20:>9.1f} "
+              f"{png_ms:>8.1f} {cache_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
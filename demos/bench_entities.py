@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Fruit Ninja physics and collisions ("frenzy mode" sizes).
+
+Compares the old list-of-dicts loop with EntityStore at 10, 100 and 1000
+entities, testing against 10 pointers (every fingertip of two hands).
+Drawing is left out so only the game logic is measured.
+
+    python3 demos/bench_entities.py
+"""
+import time
+import numpy as np
+from entities import EntityStore, FRUIT
+
+ENTITY_COUNTS = [10, 100, 1000]
+STEPS = 200
+GRAVITY = 0.4
+SLICE_DISTANCE = 45
+
+
+def make_state(count, rng):
+    x = rng.uniform(0, 1280, count)
+    y = rng.uniform(0, 720, count)
+    vx = rng.uniform(-3, 3, count)
+    vy = rng.uniform(-18, -12, count)
+    return x, y, vx, vy
+
+
+def step_dicts(fruits, pointers):
+    kept = []
+    for fruit in fruits:
+        fruit['x'] += fruit['vx']
+        fruit['y'] += fruit['vy']
+        fruit['vy'] += GRAVITY
+        is_sliced = False
+        for tip_x, tip_y in pointers:
+            dist = ((tip_x - fruit['x'])**2 + (tip_y - fruit['y'])**2)**0.5
+            if dist < SLICE_DISTANCE:
+                is_sliced = True
+                break
+        if not is_sliced and fruit['y'] < 10_000:
+            kept.append(fruit)
+    return kept
+
+
+def step_store(store, pointers):
+    store.integrate(GRAVITY)
+    sliced = store.hits(pointers, SLICE_DISTANCE, FRUIT)
+    store.remove(sliced | store.below(10_000, FRUIT))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    # Pointers far off screen, so nothing is removed and the entity count stays fixed
+    pointers = np.full((10, 2), -1000.0)
+
+    print(f"{'entities':>9} {'dicts us/step':>14} {'store us/step':>14}")
+    for count in ENTITY_COUNTS:
+        x, y, vx, vy = make_state(count, rng)
+
+        fruits = [{'x': a, 'y': b, 'vx': c, 'vy': d} for a, b, c, d in zip(x, y, vx, vy)]
+        start = time.perf_counter()
+        for _ in range(STEPS):
+            fruits = step_dicts(fruits, pointers)
+        dict_time = (time.perf_counter() - start) / STEPS
+
+        store = EntityStore()
+        store.spawn(FRUIT, x, y, vx, vy)
+        start = time.perf_counter()
+        for _ in range(STEPS):
+            step_store(store, pointers)
+        store_time = (time.perf_counter() - start) / STEPS
+
+        print(f"{count:>9} {dict_time * 1e6:>14.1f} {store_time * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the fixed-timestep Fruit Ninja simulation.
+
+Runs the game logic (no camera, no window) with a simulated clock at several
+camera frame rates and a scripted, fast-swiping fingertip, then reports:
+  - a hash of the game state after the same number of physics steps with no
+    pointer (identical hashes = the simulation is deterministic across frame rates)
+  - the score with swept slicing vs. testing only the sampled fingertip points
+  - the time spent per camera frame on game logic
+
+    python3 demos/bench_fixed_timestep.py
+"""
+import hashlib
+import math
+import time
+import numpy as np
+from fruit_ninja import FruitNinjaGame
+
+FRAME_RATES = [10, 15, 30, 60, 144]
+SECONDS = 20
+FRAME_SIZE = (720, 1280)
+SEED = 7
+
+
+class NoCamera:
+    def isOpened(self):
+        return False
+
+
+def fingertip(t):
+    # A fast figure-eight swipe, several thousand pixels per second at its peak
+    x = 640 + 560 * math.sin(2 * math.pi * 1.3 * t)
+    y = 380 + 220 * math.sin(2 * math.pi * 2.1 * t)
+    return np.array([[x, y]])
+
+
+def state_hash(game):
+    store = game.entities
+    h = hashlib.sha1()
+    for name in store.FIELDS:
+        h.update(store.view(name).tobytes())
+    h.update(f"{game.score} {game.lives}".encode())
+    return h.hexdigest()[:12]
+
+
+def simulate(fps, with_pointer, swept=True):
+    game = FruitNinjaGame(source=NoCamera(), seed=SEED)
+    game.lives = 10**6  # never run out of lives, so every run lasts the full time
+    game.BOMB_SPAWN_RATE = 0.0
+    if not swept:
+        game.pointer_segments = lambda pointers: (pointers, pointers)
+
+    target_steps = SECONDS * game.TICK_RATE
+    steps = 0
+    snapshot = None
+    original_step = game.step
+
+    def counted_step(*args):
+        nonlocal steps, snapshot
+        original_step(*args)
+        steps += 1
+        if steps == target_steps:
+            snapshot = state_hash(game)
+
+    game.step = counted_step
+    game.clock.reset(now=0.0)
+    h, w = FRAME_SIZE
+    empty = np.empty((0, 2))
+
+    frame = 0
+    start = time.perf_counter()
+    while steps < target_steps:
+        frame += 1
+        t = frame / fps
+        game.update(w, h, fingertip(t) if with_pointer else empty, now=t)
+    elapsed = time.perf_counter() - start
+    return snapshot, game.score, elapsed / frame * 1000
+
+
+def main():
+    print(f"{'fps':>5} {'state hash (no pointer)':>24} {'swept score':>12} {'point score':>12} {'ms/frame':>9}")
+    for fps in FRAME_RATES:
+        snapshot, _, _ = simulate(fps, with_pointer=False)
+        _, swept_score, ms = simulate(fps, with_pointer=True, swept=True)
+        _, point_score, _ = simulate(fps, with_pointer=True, swept=False)
+        print(f"{fps:>5} {snapshot:>24} {swept_score:>12} {point_score:>12} {ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
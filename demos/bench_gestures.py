@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for gesture classification.
+
+Compares the old get_gesture(), which read landmark objects one attribute at
+a time, with gestures.classify_rps() on a (hands, 21, 3) array, and reports
+hands per second. Given a recorded session, it also classifies every hand in
+it offline and prints how often each gesture appears, which is how to try out
+a new gesture rule on real data.
+
+    python3 demos/bench_gestures.py
+    python3 demos/bench_gestures.py sessions/slice
+"""
+import sys
+import time
+from types import SimpleNamespace
+import numpy as np
+from gestures import classify_rps, GESTURE_NAMES
+
+HANDS = 1_000_000
+LOOP_HANDS = 20_000
+
+
+def old_get_gesture(hand_landmarks):
+    """The original rock_paper_scissors.get_gesture, on MediaPipe-style landmark objects."""
+    finger_tips = [8, 12, 16, 20]
+    thumb_tip = 4
+    fingers_up = 0
+    if hand_landmarks.landmark[thumb_tip].x < hand_landmarks.landmark[thumb_tip - 1].x:
+        fingers_up += 1
+    for tip in finger_tips:
+        if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y:
+            fingers_up += 1
+    if fingers_up == 0:
+        return "ROCK"
+    elif fingers_up == 2:
+        return "SCISSORS"
+    elif fingers_up >= 4:
+        return "PAPER"
+    return "UNKNOWN"
+
+
+def as_objects(landmarks):
+    return [
+        SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand])
+        for hand in landmarks.tolist()
+    ]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    landmarks = rng.random((HANDS, 21, 3), dtype=np.float32)
+
+    objects = as_objects(landmarks[:LOOP_HANDS])
+    start = time.perf_counter()
+    old = [old_get_gesture(hand) for hand in objects]
+    loop_rate = LOOP_HANDS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    codes = classify_rps(landmarks)
+    vector_rate = HANDS / (time.perf_counter() - start)
+
+    same = all(GESTURE_NAMES[c] == name for c, name in zip(codes[:LOOP_HANDS], old))
+    print(f"get_gesture loop:  {loop_rate:>14,.0f} hands/s")
+    print(f"classify_rps:      {vector_rate:>14,.0f} hands/s  ({vector_rate / loop_rate:.0f}x)")
+    print(f"same answers: {same}")
+
+    if len(sys.argv) > 1:
+        from session import Session
+
+        session = Session(sys.argv[1])
+        start = time.perf_counter()
+        codes = classify_rps(session.landmarks, session.handedness)
+        elapsed = time.perf_counter() - start
+        present = session.handedness >= 0
+        print(f"\n{sys.argv[1]}: {int(present.sum())} hands in {len(session)} frames, "
+              f"classified in {elapsed * 1000:.2f} ms")
+        for code, name in enumerate(GESTURE_NAMES):
+            print(f"  {name:<9}{int((codes[present] == code).sum()):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark for landmark filtering and prediction.
+
+Replays a fingertip track as if hand inference only ran every 1st, 2nd or
+3rd frame, and measures how far the fingertip the game would use is from
+where the finger really was on every frame, in pixels on a 1280x720 frame:
+
+    raw        the newest result, held until the next one (what games did)
+    one_euro   landmark_filter.OneEuroFilter, predicted to the current frame
+    kalman     landmark_filter.KalmanFilter, predicted to the current frame
+
+"worker" adds the delay of HandInferenceService (a frame's result arrives
+when the next frame is submitted, 1, 2 or 3 frames later). Without arguments the track is a
+synthetic pattern of swipes and rests with 1.5 px of measurement noise, so the true
+position is known. Given a recorded session, its index fingertip positions
+are the track (the true position is then the raw landmark itself, noise and
+all, so expect larger numbers).
+
+    python3 demos/bench_landmark_filter.py
+    python3 demos/bench_landmark_filter.py sessions/fruit
+"""
+import sys
+import numpy as np
+from hand_service import HandResult
+from landmark_filter import LandmarkSmoother
+
+FRAME_SIZE = np.array([1280, 720])
+FPS = 30
+SECONDS = 60
+NOISE_PX = 1.5
+INDEX_TIP = 8
+
+
+def synthetic_track(rng):
+    """Fingertip positions (normalized) over time: slow wandering, fast swipes and rests."""
+    t = np.arange(SECONDS * FPS) / FPS
+    # The hand holds still for one second out of every four
+    moving = (t % 4.0) < 3.0
+    s = np.concatenate([[0.0], np.cumsum(moving[1:] / FPS)])
+    x = 0.5 + 0.25 * np.sin(0.7 * s) + 0.1 * np.sin(2.3 * s + 1.0)
+    y = 0.5 + 0.2 * np.sin(0.9 * s + 0.5) + 0.08 * np.cos(3.1 * s)
+    # A quick sideways swipe every two seconds, like slicing a fruit
+    phase = (s % 2.0) / 0.3
+    swipe = np.where(phase < 1.0, 0.5 - 0.5 * np.cos(np.pi * np.clip(phase, 0, 1)), 1.0)
+    direction = np.where((s // 2.0) % 2 == 0, 1.0, -1.0)
+    x = x + 0.3 * direction * (swipe - 0.5)
+    truth = np.stack([x, y], axis=1)
+    noise = rng.normal(0, NOISE_PX, truth.shape) / FRAME_SIZE
+    return t, truth, truth + noise
+
+
+def session_track(path):
+    """The index fingertip of the first hand in every frame of a recorded session, as one track."""
+    from session import Session
+
+    session = Session(path)
+    present = session.hand_counts > 0
+    if not present.any():
+        raise RuntimeError(f"Error: no hands recorded in {path}")
+    t = np.asarray(session.timestamps)[present]
+    tips = np.asarray(session.landmarks[present, 0, INDEX_TIP, :2], dtype=np.float64)
+    return t, tips, tips
+
+
+def simulate(kind, t, measured, every, delay, **filter_kwargs):
+    """Returns the fingertip the game would use on each frame (normalized), NaN before the first result."""
+    smoother = None if kind == "raw" else LandmarkSmoother(kind, **filter_kwargs)
+    out = np.full((len(t), 2), np.nan)
+    result = None
+    hand = np.zeros((1, 21, 3), dtype=np.float32)
+    for i in range(len(t)):
+        # The result of frame i - delay arrives now, if inference ran on that frame
+        j = i - delay
+        if j >= 0 and j % every == 0:
+            hand[0, :, :2] = measured[j]
+            result = (j, HandResult(j, hand.copy(), ["Right"], 0.0, 0.0))
+        if result is None:
+            continue
+        j, hands = result
+        if smoother is None:
+            out[i] = hands.landmarks[0, INDEX_TIP, :2]
+        else:
+            out[i] = smoother.track(hands, t[j], t[i])[0, INDEX_TIP, :2]
+    return out
+
+
+def error_px(track, truth):
+    valid = ~np.isnan(track[:, 0])
+    return np.linalg.norm((track[valid] - truth[valid]) * FRAME_SIZE, axis=1)
+
+
+def main():
+    if len(sys.argv) > 1:
+        try:
+            t, truth, measured = session_track(sys.argv[1])
+        except RuntimeError as error:
+            print(error)
+            return
+        print(f"{sys.argv[1]}: {len(t)} frames with a hand")
+    else:
+        t, truth, measured = synthetic_track(np.random.default_rng(0))
+        print(f"synthetic: {len(t)} frames at {FPS} FPS, {NOISE_PX} px noise")
+
+    print(f"{'inference':<16} {'filter':<10} {'mean px':>8} {'p95 px':>8}")
+    for label in ("local", "worker"):
+        for every in (1, 2, 3):
+            delay = 0 if label == "local" else every
+            for kind in ("raw", "one_euro", "kalman"):
+                errors = error_px(simulate(kind, t, measured, every, delay), truth)
+                name = f"{label}, 1/{every}"
+                print(f"{name:<16} {kind:<10} {errors.mean():>8.2f} {np.percentile(errors, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark for motion detection on synthetic 1280x720 frames.
+
+Each frame has camera-like noise, a fast square and a slow square (0.5 px per
+frame). Compares the original loop (full-resolution 21x21 blur, difference with
+the previous frame) with MotionDetector at several downscale factors, and
+reports the time per frame and how often each square was found.
+
+    python3 demos/bench_motion.py
+"""
+import time
+import cv2
+import numpy as np
+from motion import MotionDetector, extract_regions, merge_regions
+
+FRAME_SIZE = (720, 1280)
+FRAMES = 150
+SQUARE = 80
+MIN_AREA = 500
+
+
+def make_frames(rng):
+    frames, squares = [], []
+    for i in range(FRAMES):
+        frame = rng.integers(95, 115, (*FRAME_SIZE, 3), dtype=np.uint8)
+        fast = (100 + 6 * i, 150)
+        slow = (300 + i // 2, 450)
+        for (x, y) in (fast, slow):
+            cv2.rectangle(frame, (x, y), (x + SQUARE, y + SQUARE), (20, 200, 240), -1)
+        frames.append(frame)
+        squares.append((fast, slow))
+    return frames, squares
+
+
+def frame_difference():
+    """The original motion_detection.py loop, returning boxes for each frame."""
+    prev_gray = None
+
+    def step(frame):
+        nonlocal prev_gray
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        if prev_gray is None:
+            prev_gray = gray
+            return []
+        diff = cv2.absdiff(prev_gray, gray)
+        _, thresh = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) >= MIN_AREA]
+        prev_gray = gray
+        return boxes
+
+    return step
+
+
+def background_model(**kwargs):
+    motion = MotionDetector(**kwargs)
+
+    def step(frame):
+        motion.apply(frame)
+        return motion.boxes(min_area=MIN_AREA)
+
+    return step
+
+
+def found(boxes, square):
+    """True if any box overlaps the square."""
+    sx, sy = square
+    return any(x < sx + SQUARE and sx < x + w and y < sy + SQUARE and sy < y + h
+               for (x, y, w, h) in boxes)
+
+
+def run(step, frames, squares):
+    hits = [0, 0]
+    start = time.perf_counter()
+    for frame, pair in zip(frames, squares):
+        boxes = step(frame)
+        for i, square in enumerate(pair):
+            hits[i] += found(boxes, square)
+    elapsed = (time.perf_counter() - start) / len(frames)
+    return elapsed, hits
+
+
+def main():
+    frames, squares = make_frames(np.random.default_rng(0))
+    variants = [
+        ("frame difference (full res)", frame_difference()),
+        ("average, downscale 1", background_model(downscale=1, blur=21)),
+        ("average, downscale 2", background_model(downscale=2, blur=11)),
+        ("average, downscale 4", background_model(downscale=4)),
+        ("average, downscale 4, update/4", background_model(downscale=4, update_every=4)),
+        ("mog2, downscale 4", background_model(downscale=4, method="mog2")),
+    ]
+
+    print(f"{FRAMES} frames at {FRAME_SIZE[1]}x{FRAME_SIZE[0]}")
+    print(f"{'method':<32}{'ms/frame':>10}{'fast found':>12}{'slow found':>12}")
+    baseline = None
+    for name, step in variants:
+        elapsed, (fast, slow) = run(step, frames, squares)
+        baseline = baseline or elapsed
+        print(f"{name:<32}{elapsed * 1000:>10.2f}{fast:>12}{slow:>12}"
+              f"   ({baseline / elapsed:.1f}x)")
+
+    bench_regions(np.random.default_rng(1))
+
+
+def contour_boxes(mask):
+    """The original per-contour loop."""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = []
+    for contour in contours:
+        if cv2.contourArea(contour) < MIN_AREA:
+            continue
+        boxes.append(cv2.boundingRect(contour))
+    return boxes
+
+
+def bench_regions(rng):
+    """Region extraction on a busy full-resolution mask (speckle noise plus two movers)."""
+    mask = np.where(rng.random(FRAME_SIZE) < 0.05, 255, 0).astype(np.uint8)
+    mask = cv2.dilate(mask, None, iterations=1)
+    cv2.rectangle(mask, (200, 200), (400, 500), 255, -1)
+    cv2.rectangle(mask, (700, 150), (900, 400), 255, -1)
+    variants = [
+        ("findContours loop", lambda: contour_boxes(mask)),
+        ("connected components", lambda: extract_regions(mask, MIN_AREA)),
+        ("components + merge (gap 20)", lambda: merge_regions(extract_regions(mask, MIN_AREA), 20)),
+    ]
+
+    print()
+    print("Region extraction on a noisy mask")
+    print(f"{'method':<32}{'ms/frame':>10}{'regions':>12}")
+    for name, extract in variants:
+        regions = extract()
+        start = time.perf_counter()
+        for _ in range(20):
+            extract()
+        elapsed = (time.perf_counter() - start) / 20
+        print(f"{name:<32}{elapsed * 1000:>10.2f}{len(regions):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark for compositing the Motion Paint canvas onto a 1280x720 frame.
+
+Compares the original full-frame cv2.addWeighted with PaintCanvas, which
+blends only the tiles that have paint, at different amounts of paint.
+
+    python3 demos/bench_paint_canvas.py
+"""
+import time
+import cv2
+import numpy as np
+from paint_canvas import PaintCanvas
+
+FRAME_SIZE = (720, 1280)
+BOX_COUNTS = [0, 5, 50, 500]
+RUNS = 200
+
+
+def paint(canvas, legacy, count, rng):
+    h, w = FRAME_SIZE
+    for _ in range(count):
+        x, y = int(rng.integers(0, w - 200)), int(rng.integers(0, h - 150))
+        bw, bh = int(rng.integers(60, 200)), int(rng.integers(60, 150))
+        canvas.rectangle((x, y), (x + bw, y + bh), (0, 255, 0), 3)
+        cv2.rectangle(legacy, (x, y), (x + bw, y + bh), (0, 255, 0), 3)
+
+
+def measure(compose, frame):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        compose(frame)
+    return (time.perf_counter() - start) / RUNS
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (*FRAME_SIZE, 3), dtype=np.uint8)
+    print(f"{'boxes':>6}{'dirty tiles':>13}{'addWeighted ms':>16}{'PaintCanvas ms':>16}{'speedup':>9}")
+    for count in BOX_COUNTS:
+        canvas = PaintCanvas(FRAME_SIZE[1], FRAME_SIZE[0])
+        legacy = np.zeros((*FRAME_SIZE, 3), dtype=np.uint8)
+        paint(canvas, legacy, count, rng)
+
+        full = measure(lambda f: cv2.addWeighted(f, 0.8, legacy, 0.2, 0), frame)
+        tiled = measure(lambda f: canvas.compose(f.copy()), frame)
+        copy = measure(lambda f: f.copy(), frame)  # compose works in place, so take the copy back out
+        tiled = max(tiled - copy, 1e-9)
+        print(f"{count:>6}{canvas.dirty_fraction():>12.0%}{full * 1000:>16.3f}"
+              f"{tiled * 1000:>16.3f}{full / tiled:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Headless end-to-end benchmark for every demo.
+
+Drives each demo's process_frame() from a video file or the synthetic test
+pattern, without opening a window (output goes to the null sink unless
+--sink says otherwise), and reports throughput and per-frame
+latency percentiles as JSON. With --baseline it compares against a saved
+run and exits with status 1 if any demo got slower.
+
+Hand demos are only measured once they are live (their first landmarks are
+back), since frames before that skip inference. Their report includes
+dropped_frames: frames the hands worker had no room for while measuring,
+which didn't pay for inference either.
+
+With --allocations it also reports how much new memory each frame
+allocates (capture included), measured with tracemalloc: the peak of
+memory allocated since the frame started. Buffers that are reused from
+frame to frame (see frame_pool.py) don't count, so well-behaved demos
+stay close to 0 KB. tracemalloc slows every allocation down, so leave it
+off when comparing latencies.
+
+    python3 demos/benchmark.py                                  # all demos, synthetic 720p
+    python3 demos/benchmark.py face_detection --source clip.mp4
+    python3 demos/benchmark.py --save-baseline baseline.json
+    python3 demos/benchmark.py --baseline baseline.json
+    python3 demos/benchmark.py --allocations --source synthetic:1920x1080
+"""
+import argparse
+import importlib
+import json
+import sys
+import time
+import tracemalloc
+import numpy as np
+from frame_source import open_source
+from sinks import open_sink
+
+# Longest a demo may take to go live (its first landmarks back) before measuring
+WARMUP_TIMEOUT = 30.0
+
+# demo name -> (module, class)
+DEMOS = {
+    "face_detection": ("face_detection", "FaceDetectionDemo"),
+    "ar_sunglasses": ("ar_sunglasses", "ARSunglassesDemo"),
+    "face_overlay": ("face_overlay", "FaceOverlayDemo"),
+    "motion_detection": ("motion_detection", "MotionDetectionDemo"),
+    "motion_game": ("motion_game", "MotionPaintDemo"),
+    "hand_tracking": ("hand_tracking", "HandTrackingDemo"),
+    "gesture_detection": ("gesture_detection", "GestureDetectionDemo"),
+    "rock_paper_scissors": ("rock_paper_scissors", "RockPaperScissorsGame"),
+    "fruit_ninja": ("fruit_ninja", "FruitNinjaGame"),
+}
+
+
+def load_demo(name):
+    """Imports a demo module only when it is needed (the hand demos need mediapipe)."""
+    module_name, class_name = DEMOS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def benchmark_demo(name, source_spec, frames, warmup, sink_spec="null", allocations=False):
+    demo = load_demo(name)()
+    source = open_source(source_spec, drop_frames=False)
+    sink = open_sink(sink_spec, window_name=demo.WINDOW_NAME)
+    latencies = []
+    allocated = []  # bytes of new memory per frame (with allocations=True)
+    try:
+        # Warm up for at least `warmup` frames, and until the demo is live: a
+        # hands worker takes about a second to start, and until then frames
+        # skip inference, which would make the demo look far faster than it is
+        # (the same check as launcher.start_demo)
+        perception = getattr(demo, "perception", None)
+        deadline = time.perf_counter() + WARMUP_TIMEOUT
+        warmed = 0
+        while True:
+            live = perception is None or not perception.waiting
+            if warmed >= warmup and (live or time.perf_counter() > deadline):
+                break
+            ret, frame = source.read()
+            if not ret:
+                break
+            sink.write(demo.process_frame(frame))
+            sink.poll_key()
+            warmed += 1
+
+        hands = getattr(demo, "hands", None)
+        dropped_before = getattr(hands, "dropped_frames", 0)
+        if allocations:
+            tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(frames):
+            if allocations:
+                tracemalloc.reset_peak()
+                frame_start, _ = tracemalloc.get_traced_memory()
+            ret, frame = source.read()
+            if not ret:
+                break
+            t0 = time.perf_counter()
+            sink.write(demo.process_frame(frame))
+            sink.poll_key()
+            latencies.append(time.perf_counter() - t0)
+            if allocations:
+                _, peak = tracemalloc.get_traced_memory()
+                allocated.append(peak - frame_start)
+        elapsed = time.perf_counter() - start
+        dropped = getattr(hands, "dropped_frames", 0) - dropped_before
+    finally:
+        if allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        demo.close()
+        source.release()
+        sink.close()
+
+    if not latencies:
+        return {"status": "no frames"}
+    ms = np.array(latencies) * 1000
+    result = {
+        "status": "ok",
+        "frames": len(latencies),
+        "fps": len(latencies) / elapsed,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "warmup_frames": warmed,
+    }
+    if hands is not None:
+        # Frames the hands service turned away while measuring (all its slots
+        # busy): those skipped inference, so the latencies are too low
+        result["dropped_frames"] = dropped
+        if perception is not None and perception.waiting:
+            result["status"] = "not live"
+    if allocations:
+        kb = np.array(allocated) / 1024
+        result["alloc_kb_mean"] = float(kb.mean())
+        result["alloc_kb_max"] = float(kb.max())
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of human-readable regressions (p95 latency above baseline * (1 + tolerance))."""
+    regressions = []
+    for name, result in results["demos"].items():
+        old = baseline.get("demos", {}).get(name)
+        if result.get("status") != "ok" or not old or old.get("status") != "ok":
+            continue
+        limit = old["p95_ms"] * (1 + tolerance)
+        if result["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.2f} ms > baseline {old['p95_ms']:.2f} ms (+{tolerance:.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("demos", nargs="*", help=f"demos to run (default: all): {', '.join(DEMOS)}")
+    parser.add_argument("--source", default="synthetic:1280x720", help="video file or synthetic[:WxH]")
+    parser.add_argument("--frames", type=int, default=200, help="frames to measure per demo")
+    parser.add_argument("--sink", default="null", help="where frames go (default null = full speed): window, file:out.mp4, mjpeg")
+    parser.add_argument("--warmup", type=int, default=10, help="frames to run before measuring, at least (hand demos also wait until they are live)")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="save this run as the baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--allocations", action="store_true", help="also report new memory allocated per frame (tracemalloc)")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 slowdown (default 0.15 = 15%%)")
+    args = parser.parse_args()
+    unknown = [name for name in args.demos if name not in DEMOS]
+    if unknown:
+        parser.error(f"unknown demo(s): {', '.join(unknown)}")
+
+    results = {"source": args.source, "frames": args.frames, "demos": {}}
+    for name in args.demos or DEMOS:
+        try:
+            results["demos"][name] = benchmark_demo(name, args.source, args.frames, args.warmup, args.sink,
+                                                      args.allocations)
+        except ImportError as error:
+            results["demos"][name] = {"status": f"skipped: {error}"}
+        except RuntimeError as error:
+            results["demos"][name] = {"status": f"failed: {error}"}
+        print(f"{name}: {results['demos'][name]}", file=sys.stderr)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(report)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
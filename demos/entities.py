@@ -0,0 +1,164 @@
+import numpy as np
+
+# Entity kinds
+FRUIT = 0
+BOMB = 1
+SPLASH = 2
+
+
+class EntityStore:
+    """
+    Keeps every game entity in parallel NumPy arrays (a "struct of arrays").
+
+    Instead of a list of dicts updated one by one, each field is an array with
+    one slot per entity, so physics, culling and collision tests run for all
+    entities at once:
+
+        x, y     position (pixels)
+        px, py   position before the last step (for interpolated drawing)
+        vx, vy   velocity (pixels per unit of time)
+        kind     FRUIT, BOMB or SPLASH
+        timer    time left to live (used by splashes)
+
+    Time is measured in whatever unit `dt` uses: the default dt=1 means "one
+    frame", FixedTimestep passes seconds.
+
+    Only the first `count` slots are in use; the arrays grow when they fill up.
+    """
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.px = np.zeros(capacity, dtype=np.float64)
+        self.py = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.timer = np.zeros(capacity, dtype=np.float64)
+
+    FIELDS = ("x", "y", "px", "py", "vx", "vy", "kind", "timer")
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        capacity = len(self.x)
+        while capacity < needed:
+            capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, kind, x, y, vx=0.0, vy=0.0, timer=0):
+        """Adds entities. x, y, vx, vy and timer can be numbers or equal-length arrays."""
+        x, y, vx, vy, timer = np.broadcast_arrays(
+            np.atleast_1d(x), np.atleast_1d(y), np.atleast_1d(vx),
+            np.atleast_1d(vy), np.atleast_1d(timer),
+        )
+        n = len(x)
+        if n == 0:
+            return
+        if self.count + n > len(self.x):
+            self._grow(self.count + n)
+        s = slice(self.count, self.count + n)
+        self.x[s], self.y[s], self.vx[s], self.vy[s] = x, y, vx, vy
+        self.px[s], self.py[s] = x, y
+        self.kind[s] = kind
+        self.timer[s] = timer
+        self.count += n
+
+    def view(self, name):
+        """Returns the in-use part of a field array (a view, not a copy)."""
+        return getattr(self, name)[:self.count]
+
+    def mask(self, kind):
+        """Boolean mask of the live entities of one kind."""
+        return self.kind[:self.count] == kind
+
+    def integrate(self, gravity, dt=1.0, kinds=(FRUIT, BOMB)):
+        """Moves every entity of the given kinds by one step of length dt and applies gravity."""
+        n = self.count
+        self.px[:n] = self.x[:n]
+        self.py[:n] = self.y[:n]
+        moving = np.isin(self.kind[:n], kinds)
+        self.x[:n] += np.where(moving, self.vx[:n] * dt, 0.0)
+        self.y[:n] += np.where(moving, self.vy[:n] * dt, 0.0)
+        self.vy[:n] += np.where(moving, gravity * dt, 0.0)
+
+    def interpolated(self, alpha, kind):
+        """Positions of one kind blended between the last two steps (alpha 0 = previous, 1 = current)."""
+        m = self.mask(kind)
+        x = self.px[:self.count][m] + (self.x[:self.count][m] - self.px[:self.count][m]) * alpha
+        y = self.py[:self.count][m] + (self.y[:self.count][m] - self.py[:self.count][m]) * alpha
+        return x, y
+
+    def tick_timers(self, kind=SPLASH, dt=1.0):
+        """Counts down the timers of one kind; returns a mask of the ones that ran out."""
+        n = self.count
+        ticking = self.kind[:n] == kind
+        self.timer[:n] -= ticking * dt
+        return ticking & (self.timer[:n] <= 0)
+
+    def hits(self, pointers, radius, kind):
+        """
+        Mask of entities of `kind` within `radius` of any pointer.
+
+        pointers is an (k, 2) array of (x, y) positions, e.g. every fingertip
+        of every tracked hand; the distance test runs for all pairs at once.
+        """
+        n = self.count
+        pointers = np.asarray(pointers, dtype=np.float64).reshape(-1, 2)
+        if n == 0 or len(pointers) == 0:
+            return np.zeros(n, dtype=bool)
+        dx = self.x[:n, None] - pointers[None, :, 0]
+        dy = self.y[:n, None] - pointers[None, :, 1]
+        close = (dx * dx + dy * dy < radius * radius).any(axis=1)
+        return close & (self.kind[:n] == kind)
+
+    def swept_hits(self, starts, ends, radius, kind):
+        """
+        Mask of entities of `kind` within `radius` of any pointer segment.
+
+        starts and ends are (k, 2) arrays: pointer k moved from starts[k] to
+        ends[k] during this step. Testing the whole segment instead of only its
+        end point catches fast swipes that jump over a fruit between samples.
+        """
+        n = self.count
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        if n == 0 or len(starts) == 0:
+            return np.zeros(n, dtype=bool)
+
+        # Closest point on each segment to each entity: start + t * (end - start), t in [0, 1]
+        seg = ends - starts
+        seg_len2 = (seg * seg).sum(axis=1)
+        rel_x = self.x[:n, None] - starts[None, :, 0]
+        rel_y = self.y[:n, None] - starts[None, :, 1]
+        t = (rel_x * seg[None, :, 0] + rel_y * seg[None, :, 1]) / np.maximum(seg_len2, 1e-9)
+        t = np.clip(t, 0.0, 1.0)
+        dx = rel_x - t * seg[None, :, 0]
+        dy = rel_y - t * seg[None, :, 1]
+        close = (dx * dx + dy * dy < radius * radius).any(axis=1)
+        return close & (self.kind[:n] == kind)
+
+    def below(self, limit, kind):
+        """Mask of entities of `kind` that have fallen past y = limit."""
+        n = self.count
+        return (self.y[:n] >= limit) & (self.kind[:n] == kind)
+
+    def remove(self, mask):
+        """Removes the entities where mask is True, keeping the others in order."""
+        keep = ~mask
+        kept = int(keep.sum())
+        if kept == self.count:
+            return
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:kept] = arr[:self.count][keep]
+        self.count = kept
+
+    def clear(self):
+        self.count = 0
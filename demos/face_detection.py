@@ -1,52 +1,84 @@
 import cv2
+from quality import apply_face_quality
+from runner import run_demo
+from profiling import profiler
+from face_tracking import FaceTracker
+from face_detector import CascadeDetector
+from frame_pool import FramePool
 
-# Load the face cascade classifier for detecting faces
-face_cascade = cv2.CascadeClassifier(
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
-
-# Check if the cascade loaded correctly
-if face_cascade.empty():
-    print("Error loading cascade")
-    exit()
-
-# Open webcam (device 0)
-cap = cv2.VideoCapture(0)
-
-# Check if webcam opened successfully
-if not cap.isOpened():
-    print("Cannot open camera")
-    exit()
-
-while True:
-    # Read a frame from the webcam
-    ret, frame = cap.read()
-    if not ret:
-        print("Failed to grab frame")
-        break
-
-    # Convert frame to grayscale (Haar cascades require grayscale)
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # Detect faces in the frame
-    faces = face_cascade.detectMultiScale(
-        gray,
-        scaleFactor=1.1,
-        minNeighbors=5,
-        minSize=(30, 30)
-    )
-
-    # Draw rectangles around detected faces
-    for (x, y, w, h) in faces:
-        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-
-    # Display the frame with rectangles
-    cv2.imshow("Face Detection", frame)
-
-    # Press 'q' to quit
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-# Release webcam and close all OpenCV windows
-cap.release()
-cv2.destroyAllWindows()
+
+class FaceDetectionDemo:
+    WINDOW_NAME = "Face Detection"
+
+    def __init__(self, face_cascade=None):
+        # Load the face cascade classifier for detecting faces
+        if face_cascade is None:
+            face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+            )
+
+        # Check if the cascade loaded correctly
+        if face_cascade.empty():
+            raise RuntimeError("Error loading cascade")
+
+        # Detect faces in a grayscale frame
+        # The cascade runs on a shrunken copy of the frame: faces must be at least
+        # min_face pixels wide, so the frame only needs to be big enough for that.
+        # 30 px finds the same faces the original minSize=(30, 30) did; raising
+        # it (e.g. to 60) is much faster on HD cameras but misses smaller faces
+        self.detector = CascadeDetector(
+            face_cascade,
+            min_face=30,
+            scale_factor=1.1,
+            min_neighbors=5
+        )
+
+        # The full detector only runs every 10 frames; faces are tracked in between
+        # and keep the same ID from frame to frame
+        self.tracker = FaceTracker(self.detector.detect, detect_every=10, detect_near=self.detector.detect)
+
+        # The grayscale frame goes into the same buffer every frame
+        self.buffers = FramePool()
+
+    def process_frame(self, frame):
+        # Convert frame to grayscale (Haar cascades require grayscale)
+        with profiler.span("cvtColor"):
+            gray = self.buffers.get("gray", frame.shape[:2])
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+
+        # Detect (or track) faces in the frame
+        faces = self.tracker.update(gray)
+
+        # Draw rectangles and IDs around detected faces
+        for face in faces:
+            x, y, w, h = face.rect()
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+            cv2.putText(frame, f"#{face.face_id}", (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        return frame
+
+    def set_quality(self, settings):
+        # Called by run_demo to hold the target frame rate (see quality.py)
+        apply_face_quality(self.detector, self.tracker, settings)
+
+    def handle_key(self, key):
+        return True
+
+    def close(self):
+        pass
+
+
+def main():
+    try:
+        demo = FaceDetectionDemo()
+    except RuntimeError as error:
+        print(error)
+        return
+
+    # Read frames from the webcam (device 0, or whatever UTEACH_SOURCE points to),
+    # show them, and press 'q' to quit
+    run_demo(demo)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,104 @@
 import cv2 # OpenCV for computer vision
-import numpy as np # for array manipulations
-import os
-from utils import overlay_transparent
-
-# ---------------------
-# Load the overlay image
-# ---------------------
-# make sure the image has an alpha channel (transparency), e.g., PNG
-# this will be the overlay image
-script_dir = os.path.dirname(os.path.abspath(__file__))
-assets_path = os.path.join(script_dir, "..", "assets", "head_of_school.png")
-overlay_image = cv2.imread(assets_path, cv2.IMREAD_UNCHANGED)
-
-# ---------------------
-# Load Haar cascade for face detection
-# ---------------------
-# opencv comes with pre-trained models for face detection
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-
-# check if the cascade loaded correctly
-if face_cascade.empty():
-    print("Error loading Haar cascade. Make sure OpenCV is installed correctly.")
-    exit()
-
-# ---------------------
-# Open webcam
-# ---------------------
-cap = cv2.VideoCapture(0)
-
-if not cap.isOpened():
-    print("Cannot open camera")
-    exit()
-
-# -----------------------------
-# Main loop
-# -----------------------------  
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Failed to grab frame")
-        break
-    # Convert frame to grascale (needede for Haar cascades)
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # Detect faces
-    faces = face_cascade.detectMultiScale(
-        gray,
-        scaleFactor=1.1,  # How much the image size is reduced at each scale
-        minNeighbors=5,   # Higher = fewer false positives
-        minSize=(30, 30)  # Minimum face size
-    )
-
-    for (x, y, w, h) in faces:
-
-        # Make overlay slightly larger than face box
-        scale_factor = 1.3 # fuss with this number
-        new_w = int(w * scale_factor)
-        new_h = int(h * scale_factor)
-
-        # Center the overlay better
-        new_x = x - (new_w - w) // 2
-        new_y = y - (new_h - h) // 2
-
-        # Prevent going outside frame
-        new_x = max(0, new_x)
-        new_y = max(0, new_y)
-
-        overlay_transparent(frame, overlay_image, new_x, new_y, overlay_size=(new_w, new_h))
-
-    # Show the frame
-    cv2.imshow("Face Overlay Demo", frame)
-
-    # Press 'q' to quit
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-# -----------------------------
-# Cleanup
-# -----------------------------
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+from sprites import load_sprite
+from quality import apply_face_quality
+from runner import run_demo
+from profiling import profiler
+from face_tracking import FaceTracker
+from face_detector import CascadeDetector
+from frame_pool import FramePool
+
+
+class FaceOverlayDemo:
+    WINDOW_NAME = "Face Overlay Demo"
+
+    def __init__(self, face_cascade=None):
+        # ---------------------
+        # Load the overlay image
+        # ---------------------
+        # make sure the image has an alpha channel (transparency), e.g., PNG
+        # this will be the overlay image
+        # cache resized copies of the overlay so similar face sizes reuse them
+        # (loaded from the asset cache, so the PNG is only decoded once)
+        self.overlay_sprite = load_sprite("head_of_school.png")
+
+        # ---------------------
+        # Load Haar cascade for face detection
+        # ---------------------
+        # opencv comes with pre-trained models for face detection
+        if face_cascade is None:
+            face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+        # check if the cascade loaded correctly
+        if face_cascade.empty():
+            raise RuntimeError("Error loading Haar cascade. Make sure OpenCV is installed correctly.")
+
+        # Detect faces (on a shrunken copy of the frame, which is much faster)
+        self.detector = CascadeDetector(
+            face_cascade,
+            min_face=30,       # Minimum face size (bigger = faster, but misses small faces)
+            scale_factor=1.1,  # How much the image size is reduced at each scale
+            min_neighbors=5    # Higher = fewer false positives
+        )
+
+        # Run the detector every 10 frames and track faces in between,
+        # which is faster and keeps the overlay steady
+        self.tracker = FaceTracker(self.detector.detect, detect_every=10, detect_near=self.detector.detect)
+
+        # Reused buffer for the grayscale frame
+        self.buffers = FramePool()
+
+    def process_frame(self, frame):
+        # Convert frame to grascale (needede for Haar cascades)
+        with profiler.span("cvtColor"):
+            gray = self.buffers.get("gray", frame.shape[:2])
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+
+        # Detect (or track) faces
+        faces = self.tracker.update(gray)
+
+        for face in faces:
+            x, y, w, h = face.rect()
+
+            # Make overlay slightly larger than face box
+            scale_factor = 1.3 # fuss with this number
+            new_w = int(w * scale_factor)
+            new_h = int(h * scale_factor)
+
+            # Center the overlay better
+            new_x = x - (new_w - w) // 2
+            new_y = y - (new_h - h) // 2
+
+            # Prevent going outside frame
+            new_x = max(0, new_x)
+            new_y = max(0, new_y)
+
+            if self.overlay_sprite is not None:
+                self.overlay_sprite.draw(frame, new_x, new_y, size=(new_w, new_h))
+        return frame
+
+    def set_quality(self, settings):
+        # Called by run_demo to hold the target frame rate (see quality.py)
+        apply_face_quality(self.detector, self.tracker, settings)
+
+    def handle_key(self, key):
+        return True
+
+    def close(self):
+        pass
+
+
+def main():
+    try:
+        demo = FaceOverlayDemo()
+    except RuntimeError as error:
+        print(error)
+        return
+
+    # -----------------------------
+    # Main loop: webcam (or UTEACH_SOURCE) in, overlay out, 'q' to quit
+    # -----------------------------
+    run_demo(demo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import itertools
+import cv2
+import numpy as np
+from profiling import profiler
+
+# Faces are followed between detections by template matching at a small scale:
+# the face patch is shrunk to about this many pixels wide before matching.
+TEMPLATE_WIDTH = 32
+
+
+class TrackedFace:
+    """One face being followed across frames. `face_id` stays the same while it is tracked."""
+
+    def __init__(self, face_id, box):
+        self.face_id = face_id
+        self.box = tuple(float(v) for v in box)
+        self.confidence = 1.0
+        self.template = None
+        self.scale = 1.0
+
+    def rect(self):
+        """Returns the box as integer (x, y, w, h), ready for drawing."""
+        x, y, w, h = self.box
+        return int(round(x)), int(round(y)), int(round(w)), int(round(h))
+
+
+def box_iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0.0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0.0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """
+    Runs a face detector only every `detect_every` frames and tracks faces in between.
+
+    detect: a function that takes a grayscale frame and returns (x, y, w, h) boxes,
+        e.g. a wrapper around face_cascade.detectMultiScale.
+    detect_every: run the full detector at least this often (in frames).
+    min_confidence: if any face's template match score drops below this, the
+        detector runs again on the next frame.
+    smoothing: how much of the previous box to keep when a new detection arrives
+        (0 = jump straight to the new box, closer to 1 = steadier overlays).
+    search_margin: how far around the last box to search, as a fraction of its size.
+    detect_near: optional function (gray, rois) -> boxes that only searches inside
+        the given regions (e.g. CascadeDetector.detect). When a face is lost between
+        scheduled detections, only the areas around the known faces are searched.
+    """
+
+    def __init__(self, detect, detect_every=10, min_confidence=0.6,
+                 smoothing=0.5, search_margin=0.5, min_iou=0.3, detect_near=None):
+        self.detect = detect
+        self.detect_near = detect_near
+        self.detect_every = detect_every
+        self.min_confidence = min_confidence
+        self.smoothing = smoothing
+        self.search_margin = search_margin
+        self.min_iou = min_iou
+
+        self.faces = []
+        self.frames_since_detect = detect_every  # detect on the very first frame
+        self.force_detect = False
+        self.detections_run = 0
+        self._ids = itertools.count(1)
+
+    def update(self, gray):
+        """Processes one grayscale frame and returns the list of TrackedFace objects."""
+        if self.frames_since_detect >= self.detect_every:
+            self._run_detector(gray)
+        elif self.force_detect:
+            if self.detect_near is not None and self.faces:
+                self._run_detector(gray, rois=self._search_windows(gray))
+            else:
+                self._run_detector(gray)
+        else:
+            with profiler.span("face tracking"):
+                self._track(gray)
+        return self.faces
+
+    def _run_detector(self, gray, rois=None):
+        if rois is None:
+            boxes = self.detect(gray)
+            self.frames_since_detect = 0
+        else:
+            boxes = self.detect_near(gray, rois)
+            self.frames_since_detect += 1
+        boxes = [tuple(float(v) for v in b) for b in boxes]
+        self.detections_run += 1
+        self.force_detect = False
+
+        # Greedily match each detection to the existing face it overlaps most,
+        # so a face keeps its ID from one detection to the next
+        unmatched = list(self.faces)
+        kept = []
+        for box in boxes:
+            best, best_iou = None, self.min_iou
+            for face in unmatched:
+                iou = box_iou(face.box, box)
+                if iou >= best_iou:
+                    best, best_iou = face, iou
+            if best is None:
+                face = TrackedFace(next(self._ids), box)
+            else:
+                unmatched.remove(best)
+                face = best
+                k = self.smoothing
+                face.box = tuple(k * old + (1 - k) * new for old, new in zip(face.box, box))
+            face.confidence = 1.0
+            self._store_template(gray, face)
+            kept.append(face)
+        self.faces = kept
+
+    def _store_template(self, gray, face):
+        x, y, w, h = face.rect()
+        x, y = max(x, 0), max(y, 0)
+        patch = gray[y:y + h, x:x + w]
+        if patch.size == 0:
+            face.template = None
+            return
+        face.scale = min(1.0, TEMPLATE_WIDTH / max(w, 1))
+        face.template = cv2.resize(patch, None, fx=face.scale, fy=face.scale,
+                                   interpolation=cv2.INTER_AREA)
+
+    def _search_window(self, gray, face):
+        # A window around where the face was last seen, clipped to the frame
+        frame_h, frame_w = gray.shape[:2]
+        x, y, w, h = face.box
+        mx, my = w * self.search_margin, h * self.search_margin
+        sx1, sy1 = int(max(0, x - mx)), int(max(0, y - my))
+        sx2, sy2 = int(min(frame_w, x + w + mx)), int(min(frame_h, y + h + my))
+        return sx1, sy1, sx2, sy2
+
+    def _search_windows(self, gray):
+        windows = []
+        for face in self.faces:
+            sx1, sy1, sx2, sy2 = self._search_window(gray, face)
+            windows.append((sx1, sy1, sx2 - sx1, sy2 - sy1))
+        return windows
+
+    def _track(self, gray):
+        self.frames_since_detect += 1
+
+        for face in self.faces:
+            if face.template is None:
+                self.force_detect = True
+                continue
+
+            # Search only a small window around where the face was last seen
+            x, y, w, h = face.box
+            sx1, sy1, sx2, sy2 = self._search_window(gray, face)
+            window = gray[sy1:sy2, sx1:sx2]
+
+            s = face.scale
+            small = cv2.resize(window, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+            th, tw = face.template.shape[:2]
+            if small.shape[0] < th or small.shape[1] < tw:
+                face.confidence = 0.0
+                self.force_detect = True
+                continue
+
+            scores = cv2.matchTemplate(small, face.template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (best_x, best_y) = cv2.minMaxLoc(scores)
+            face.confidence = float(score) if np.isfinite(score) else 0.0
+            face.box = (sx1 + best_x / s, sy1 + best_y / s, w, h)
+
+            if face.confidence < self.min_confidence:
+                self.force_detect = True
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class FramePool:
+    """
+    Named image buffers that are reused from frame to frame.
+
+    Most OpenCV calls return a brand new array, which at 1080p is 2-6 MB per
+    call per frame. Passing a buffer from the pool as dst= writes the result
+    into memory that was allocated once instead:
+
+        gray = self.buffers.get("gray", frame.shape[:2])
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+
+    get() hands back a view of the same memory every time it's called with a
+    name, so a buffer is only valid until the next get() with that name. The
+    memory only grows, so a shape that changes from frame to frame (a face
+    region, say) doesn't allocate again once the biggest size has been seen.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.allocations = 0  # times a buffer had to be (re)allocated
+
+    def get(self, name, shape, dtype=np.uint8):
+        """Returns a (contents undefined) array of this shape and dtype, reusing memory."""
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize
+        buf = self.buffers.get(name)
+        if buf is None or buf.size < size:
+            buf = np.empty(size, dtype=np.uint8)
+            self.buffers[name] = buf
+            self.allocations += 1
+        return buf[:size].view(dtype).reshape(shape)
+
+    def like(self, name, image):
+        """A buffer with the same shape and dtype as `image`."""
+        return self.get(name, image.shape, image.dtype)
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self.buffers.values())
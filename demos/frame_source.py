@@ -0,0 +1,256 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+# Environment variable that picks the video source for every demo:
+#   UTEACH_SOURCE=0                 -> webcam 0 (the default)
+#   UTEACH_SOURCE=clip.mp4          -> a video file
+#   UTEACH_SOURCE=synthetic         -> a generated test pattern (no camera needed)
+#   UTEACH_SOURCE=synthetic:1280x720
+#   UTEACH_SOURCE=synthetic:1280x720:300  -> stop after 300 frames
+#   UTEACH_SOURCE=replay:session_dir      -> a recorded session, in real time
+#   UTEACH_SOURCE=replay:session_dir:fast -> a recorded session, as fast as possible
+SOURCE_ENV = "UTEACH_SOURCE"
+
+
+# -------------------------------
+# Backends: the things that actually produce frames.
+# read(out) fills `out` (a frame from an earlier read) when it can, so the
+# capture thread doesn't allocate a new image for every frame.
+# -------------------------------
+class WebcamBackend:
+    """Reads frames from a camera through cv2.VideoCapture."""
+
+    live = True
+
+    def __init__(self, index=0, width=None, height=None):
+        self.cap = cv2.VideoCapture(index)
+        if width is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Ask the driver not to queue old frames (not every backend supports it)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, out=None):
+        return self.cap.read(out)
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileBackend:
+    """Reads frames from a video file, optionally looping forever."""
+
+    live = False
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, out=None):
+        ret, frame = self.cap.read(out)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(out)
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class SyntheticBackend:
+    """
+    Generates a deterministic test pattern: a gradient with a bouncing ball.
+
+    frames: stop after this many frames (None = run forever).
+    fps: pace frames like a real camera (None = as fast as possible).
+    """
+
+    def __init__(self, width=640, height=480, frames=None, fps=None):
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.fps = fps
+        self.live = fps is not None
+        self.index = 0
+        self.next_time = time.monotonic()
+        gradient = np.linspace(40, 200, width, dtype=np.uint8)
+        self.background = np.dstack([
+            np.tile(gradient, (height, 1)),
+            np.full((height, width), 80, dtype=np.uint8),
+            np.tile(gradient[::-1], (height, 1)),
+        ])
+
+    def isOpened(self):
+        return True
+
+    def read(self, out=None):
+        if self.frames is not None and self.index >= self.frames:
+            return False, None
+        if self.fps is not None:
+            self.next_time += 1.0 / self.fps
+            delay = self.next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        if out is not None and out.shape == self.background.shape:
+            frame = out
+            np.copyto(frame, self.background)
+        else:
+            frame = self.background.copy()
+        # Ball bounces around the frame so motion/tracking demos have something to see
+        t = self.index
+        span_x, span_y = self.width - 80, self.height - 80
+        x = 40 + abs((t * 7) % (2 * span_x) - span_x)
+        y = 40 + abs((t * 5) % (2 * span_y) - span_y)
+        cv2.circle(frame, (x, y), 40, (255, 255, 255), -1)
+        cv2.putText(frame, str(t), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+# -------------------------------
+# Threaded source: grabs in the background, hands out the newest frame
+# -------------------------------
+class FrameSource:
+    """
+    Reads a backend on a background thread so camera I/O never blocks the demo.
+
+    With drop_frames=True (the default for live sources) only the newest frame
+    is kept; frames the demo was too slow to take are counted in dropped_frames.
+    With drop_frames=False every frame is delivered, which keeps file and
+    synthetic playback deterministic.
+
+    read(), isOpened() and release() match cv2.VideoCapture, so demos can use
+    a FrameSource anywhere they used a capture. Like cv2.VideoCapture.read()
+    with an image to fill, frames are captured into a few buffers that are
+    used over and over: a frame returned by read() is only valid until the
+    next read() (copy it to keep it longer).
+    """
+
+    def __init__(self, backend, drop_frames=None):
+        self.backend = backend
+        self.drop_frames = backend.live if drop_frames is None else drop_frames
+        self.frames_grabbed = 0
+        self.frames_read = 0
+        self.dropped_frames = 0
+
+        self._cond = threading.Condition()
+        # Three buffers take turns: the one the demo is using (from the last
+        # read()), the newest one waiting to be read, and one being captured into
+        self._buffers = [None, None, None]
+        self._held = None   # index of the buffer the demo has
+        self._ready = None  # index of the buffer waiting to be read
+        self._frame = None
+        self._fresh = False
+        self._ended = False
+        self._stopped = False
+        self._thread = None
+        if backend.isOpened():
+            self._thread = threading.Thread(target=self._grab_loop, daemon=True)
+            self._thread.start()
+
+    def _grab_loop(self):
+        while True:
+            with self._cond:
+                index = next(i for i in range(3) if i != self._held and i != self._ready)
+            ret, frame = self.backend.read(self._buffers[index])
+            with self._cond:
+                if not ret:
+                    self._ended = True
+                    self._cond.notify_all()
+                    return
+                if self._fresh:
+                    if self.drop_frames:
+                        self.dropped_frames += 1
+                    else:
+                        self._cond.wait_for(lambda: not self._fresh or self._stopped)
+                if self._stopped:
+                    return
+                self._buffers[index] = frame
+                self._frame = frame
+                self._ready = index
+                self._fresh = True
+                self.frames_grabbed += 1
+                self._cond.notify_all()
+
+    def isOpened(self):
+        return self._thread is not None and not self._stopped
+
+    @property
+    def ended(self):
+        """True once no more frames will come (end of the file, camera gone, or released)."""
+        with self._cond:
+            return self._thread is None or self._stopped or (self._ended and not self._fresh)
+
+    def read(self, timeout=None):
+        """
+        Returns (ret, frame) for the newest frame not yet returned, waiting for one if needed.
+
+        (False, None) means the source has ended, or that no frame came within
+        timeout seconds; check `ended` to tell the two apart.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._fresh or self._ended or self._stopped, timeout)
+            if not self._fresh:
+                return False, None
+            frame = self._frame
+            self._held = self._ready
+            self._fresh = False
+            self.frames_read += 1
+            self._cond.notify_all()
+            return True, frame
+
+    def release(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.backend.release()
+
+
+def open_source(spec=None, drop_frames=None):
+    """
+    Opens a FrameSource from a spec: a camera index, a video path, "synthetic[:WxH[:frames]]"
+    or "replay:session_dir[:fast]" (which returns a session.ReplaySource).
+
+    If spec is None the UTEACH_SOURCE environment variable is used, falling back to webcam 0.
+    """
+    if spec is None:
+        spec = os.environ.get(SOURCE_ENV, "0")
+    if isinstance(spec, int):
+        backend = WebcamBackend(spec)
+    elif str(spec).startswith("replay:"):
+        from session import ReplaySource
+
+        path = str(spec)[len("replay:"):]
+        fast = path.endswith(":fast")
+        if fast:
+            path = path[:-len(":fast")]
+        return ReplaySource(path, realtime=not fast)
+    elif str(spec).isdigit():
+        backend = WebcamBackend(int(spec))
+    elif str(spec).startswith("synthetic"):
+        options = str(spec).split(":")[1:]
+        width, height = 640, 480
+        if options:
+            width, height = (int(v) for v in options[0].lower().split("x"))
+        frames = int(options[1]) if len(options) > 1 else None
+        backend = SyntheticBackend(width, height, frames=frames)
+    else:
+        backend = VideoFileBackend(str(spec))
+    return FrameSource(backend, drop_frames=drop_frames)
@@ -1,205 +1,273 @@
 #!/usr/bin/env python3
 import cv2
-import mediapipe as mp
+import numpy as np
 import random
-import os
-from utils import overlay_transparent
+import time
+from sprites import load_sprite, SpriteBatch
+from hud import Hud
+from quality import apply_hands_quality
+from runner import run_demo
+from profiling import profiler
+from hand_service import HandInferenceService
+from entities import EntityStore, FRUIT, BOMB, SPLASH
+from sim_clock import FixedTimestep
+from perception import PerceptionScheduler, NONE, FULL
+from landmark_filter import LandmarkSmoother
 
 WINDOW_NAME = "Fruit Ninja"
 
 class FruitNinjaGame:
-    def __init__(self):
+    WINDOW_NAME = WINDOW_NAME
+    # How MediaPipe Hands is set up for this game (the launcher reuses a warm one)
+    HANDS_SERVICE = HandInferenceService
+    HANDS_OPTIONS = dict(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    # What each state needs to know about hands (see perception.py): fingertips
+    # on every frame while playing, nothing behind the pause and game over screens
+    PERCEPTION = {"PLAYING": FULL, "PAUSED": NONE, "GAME_OVER": NONE}
+    # Hands runs on every frame: the worker's result is already a frame late,
+    # and skipping frames would make it 2 late (see bench_landmark_filter.py).
+    # The fingertip is filtered and predicted to the current frame instead
+    INFERENCE_EVERY = 1
+
+    def __init__(self, source=None, seed=None, hands=None):
         # Game Constants
+        # Speeds are in pixels per second and durations in seconds, so the game
+        # plays the same no matter how fast the camera delivers frames
         self.FINGER_RADIUS = 25
         self.FRUIT_RADIUS = 40
         self.SLICE_DISTANCE = self.FINGER_RADIUS + self.FRUIT_RADIUS - 20
-        self.FRUIT_SPAWN_CHANCE = 0.05
-        self.BOMB_SPAWN_CHANCE = 0.01
-        self.GRAVITY = 0.4
-        self.MIN_VX, self.MAX_VX = -3, 3
-        self.MIN_VY, self.MAX_VY = -18, -12
-        self.SPLASH_DURATION = 15
+        self.FRUIT_SPAWN_RATE = 1.5 # fruits per second, on average
+        self.BOMB_SPAWN_RATE = 0.3 # bombs per second, on average
+        self.GRAVITY = 360.0
+        self.MIN_VX, self.MAX_VX = -90, 90
+        self.MIN_VY, self.MAX_VY = -540, -360
+        self.SPLASH_DURATION = 0.5
+        self.TICK_RATE = 60 # physics steps per second
+        self.POINTER_LANDMARKS = [8] # Fingertips that slice (8 = index); add 4, 12, 16, 20 for all
 
         # Game State
         self.score = 0
         self.lives = 3
         self.game_over = False
         self.paused = False
-        self.bombs = []
-        self.fruits = []
-        self.splashes = []
+        # Fruits, bombs and splashes all live in one array-backed store
+        self.entities = EntityStore()
+        self.last_pointers = None
+
+        # The simulation runs in fixed steps, independent of the camera frame rate
+        self.clock = FixedTimestep(self.TICK_RATE)
+        # The seed is kept so a recorded session replays the same fruits
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        # Set by the runner to the current frame's time (see run_demo)
+        self.frame_time = None
 
         # Assets
-        self.script_dir = os.path.dirname(os.path.abspath(__file__))
         self.watermelon_img, self.splash_img = self.load_assets()
+        self.sprite_batch = SpriteBatch()
+        # Score, lives and messages are only re-rendered when they change
+        self.hud = Hud()
 
         # MediaPipe & OpenCV Setup
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
-        self.cap = cv2.VideoCapture(0)
+        # Hands runs in a worker process so inference overlaps with game logic and drawing
+        # (a replay can pass in session.RecordedHands instead)
+        if hands is None:
+            hands = self.HANDS_SERVICE(**self.HANDS_OPTIONS)
+        self.hands = hands
+        self.hand_result = None
+        self.perception = PerceptionScheduler(self.hands, full_every=self.INFERENCE_EVERY,
+                                              smoother=LandmarkSmoother("one_euro"))
+        self.cap = source # None = open_source() when the game starts
 
     def load_assets(self):
-        watermelon_path = os.path.join(self.script_dir, "..", "assets", "watermelon.png")
-        watermelon_img = cv2.imread(watermelon_path, cv2.IMREAD_UNCHANGED)
-        if watermelon_img is not None:
-            watermelon_img = cv2.resize(watermelon_img, (80, 80))
-        else:
-            print(f"Warning: {watermelon_path} not found.")
-
-        splash_path = os.path.join(self.script_dir, "..", "assets", "splash.png")
-        splash_img = cv2.imread(splash_path, cv2.IMREAD_UNCHANGED)
-        if splash_img is not None:
-            splash_img = cv2.resize(splash_img, (100, 100))
-        else:
-            print(f"Warning: {splash_path} not found.")
+        # Loaded from the asset cache: no PNG decoding after the first run, and
+        # the 80x80 fruit is shrunk from a small mip level, not the 2500x2500 PNG.
+        # Both are always drawn at one fixed size, so sizes aren't rounded to a
+        # quantum (quantum=1): the 100x100 splash stays 100x100 and centered
+        watermelon_img = load_sprite("watermelon.png", quantum=1)
+        if watermelon_img is None:
+            print("Warning: assets/watermelon.png not found.")
+
+        splash_img = load_sprite("splash.png", quantum=1)
+        if splash_img is None:
+            print("Warning: assets/splash.png not found.")
         return watermelon_img, splash_img
 
+    def now(self):
+        """The current game time: the frame's time when the runner provides it."""
+        return time.monotonic() if self.frame_time is None else self.frame_time
+
     def reset_game(self):
         self.score = 0
         self.lives = 3
         self.game_over = False
-        self.fruits = []
-        self.bombs = []
-        self.splashes = []
-
-    def track_hand(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb)
-        tip_x, tip_y = -1, -1
+        self.entities.clear()
+        self.last_pointers = None
+        self.clock.reset(self.now())
+
+    def state(self):
+        if self.game_over:
+            return "GAME_OVER"
+        return "PAUSED" if self.paused else "PLAYING"
+
+    def track_hand(self, frame, need=FULL):
+        """Returns a (k, 2) array of fingertip positions (index finger of each hand found)."""
+        # Send this frame to the worker, then use the hand found in the previous
+        # frame (which was processed while the last frame was being drawn).
+        # The smoother then predicts where the fingertips are right now
+        self.hand_result = self.perception.step(frame, need, self.now())
+        landmarks = self.perception.landmarks
         h, w, _ = frame.shape
-        if results.multi_hand_landmarks:
-            hand_landmarks = results.multi_hand_landmarks[0]
-            index_tip = hand_landmarks.landmark[8]
-            tip_x = int(index_tip.x * w)
-            tip_y = int(index_tip.y * h)
-            cv2.circle(frame, (tip_x, tip_y), self.FINGER_RADIUS, (0, 255, 0), 8)
-        return tip_x, tip_y
-
-    def spawn_fruit(self, frame):
-        if random.random() < self.FRUIT_SPAWN_CHANCE:
-            x = random.randint(50, frame.shape[1] - 50)
-            y = frame.shape[0]
-            vx = random.uniform(self.MIN_VX, self.MAX_VX)
-            vy = random.uniform(self.MIN_VY, self.MAX_VY)
-            self.fruits.append({'x': x, 'y': y, 'vx': vx, 'vy': vy})
-        
-        if random.random() < self.BOMB_SPAWN_CHANCE:
-            x = random.randint(50, frame.shape[1] - 50)
-            y = frame.shape[0]
-            vx = random.uniform(self.MIN_VX, self.MAX_VX)
-            vy = random.uniform(self.MIN_VY, self.MAX_VY)
-            self.bombs.append({'x': x, 'y': y, 'vx': vx, 'vy': vy})
-
-    def process_fruits(self, frame, tip_x, tip_y, h):
-        fruits_to_keep = []
-        for fruit in self.fruits:
-            fruit['x'] += fruit['vx']
-            fruit['y'] += fruit['vy']
-            fruit['vy'] += self.GRAVITY
-            is_sliced = False
-            if tip_x != -1:
-                dist = ((tip_x - fruit['x'])**2 + (tip_y - fruit['y'])**2)**0.5
-                if dist < self.SLICE_DISTANCE:
-                    self.score += 1
-                    is_sliced = True
-                    self.splashes.append({'x': fruit['x'], 'y': fruit['y'], 'timer': self.SPLASH_DURATION})
-            if not is_sliced and fruit['y'] < h + 50:
-                fruits_to_keep.append(fruit)
-                if self.watermelon_img is not None:
-                    overlay_transparent(frame, self.watermelon_img, fruit['x'] - self.FRUIT_RADIUS, fruit['y'] - self.FRUIT_RADIUS)
-                else:
-                    cv2.circle(frame, (int(fruit['x']), int(fruit['y'])), self.FRUIT_RADIUS, (0, 0, 255), 10)
-            elif not is_sliced:
-                self.lives -= 1
-        self.fruits = fruits_to_keep
-
-    def process_bombs(self, frame, tip_x, tip_y, h):
-        bombs_to_keep = []
-        for bomb in self.bombs:
-            bomb['x'] += bomb['vx']
-            bomb['y'] += bomb['vy']
-            bomb['vy'] += self.GRAVITY
-            
-            # Check for collision with bomb
-            if tip_x != -1:
-                dist = ((tip_x - bomb['x'])**2 + (tip_y - bomb['y'])**2)**0.5
-                if dist < self.SLICE_DISTANCE:
-                    self.game_over = True # Instant game over!
-            
-            if bomb['y'] < h + 50:
-                bombs_to_keep.append(bomb)
-                cv2.circle(frame, (int(bomb['x']), int(bomb['y'])), self.FRUIT_RADIUS, (0, 0, 0), -1) # Black bomb
-        self.bombs = bombs_to_keep
-
-    def process_splashes(self, frame):
-        splashes_to_keep = []
-        for splash in self.splashes:
-            splash['timer'] -= 1
-            if splash['timer'] > 0:
-                if self.splash_img is not None:
-                    overlay_transparent(frame, self.splash_img, splash['x'] - 50, splash['y'] - 50)
-                else:
-                    cv2.circle(frame, (int(splash['x']), int(splash['y'])), 45, (0, 255, 255), -1)
-                splashes_to_keep.append(splash)
-        self.splashes = splashes_to_keep
+        if len(landmarks) == 0:
+            return np.empty((0, 2))
+        pointers = landmarks[:, self.POINTER_LANDMARKS, :2].reshape(-1, 2) * (w, h)
+        for tip_x, tip_y in pointers.astype(int):
+            cv2.circle(frame, (int(tip_x), int(tip_y)), self.FINGER_RADIUS, (0, 255, 0), 8)
+        return pointers
 
-    def draw_ui(self, frame):
-        cv2.rectangle(frame, (10, 20), (580, 90), (50, 50, 50), -1)
-        cv2.putText(frame, f"Score: {self.score}", (30, 75), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 4)
-        cv2.putText(frame, f"Lives: {self.lives}", (350, 75), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 4)
-        cv2.putText(frame, "P: Pause R: Restart Q: Quit", (30, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (200, 200, 200), 2)
+    def pointer_segments(self, pointers):
+        """
+        Pairs each pointer with where it was at the last simulation step, so
+        slicing can test the whole swipe instead of a single point.
+        """
+        if len(pointers) == 0:
+            self.last_pointers = None
+            return pointers, pointers
+        if self.last_pointers is None or self.last_pointers.shape != pointers.shape:
+            return pointers, pointers
+        return self.last_pointers, pointers
 
-    def run(self):
-        if not self.cap.isOpened():
-            print("Error: Could not open video source.")
-            return
+    def spawn_fruit(self, w, h):
+        # Spawn rates are per second, so scale them by the length of a step
+        dt = self.clock.dt
+        if self.rng.random() < self.FRUIT_SPAWN_RATE * dt:
+            x = self.rng.randint(50, w - 50)
+            vx = self.rng.uniform(self.MIN_VX, self.MAX_VX)
+            vy = self.rng.uniform(self.MIN_VY, self.MAX_VY)
+            self.entities.spawn(FRUIT, x, h, vx, vy)
 
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Error: Failed to capture frame.")
-                break
-            frame = cv2.flip(frame, 1)
-            h, w, _ = frame.shape
+        if self.rng.random() < self.BOMB_SPAWN_RATE * dt:
+            x = self.rng.randint(50, w - 50)
+            vx = self.rng.uniform(self.MIN_VX, self.MAX_VX)
+            vy = self.rng.uniform(self.MIN_VY, self.MAX_VY)
+            self.entities.spawn(BOMB, x, h, vx, vy)
 
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('p'):
-                self.paused = not self.paused
-            elif key == ord('r'):
-                self.reset_game()
+    def step(self, w, h, starts, ends):
+        """Advances the game by one fixed step; the pointers moved from starts to ends."""
+        store = self.entities
+        dt = self.clock.dt
+        self.spawn_fruit(w, h)
+        store.integrate(self.GRAVITY, dt)
+
+        # Fruits: sliced ones score and leave a splash, missed ones cost a life
+        sliced = store.swept_hits(starts, ends, self.SLICE_DISTANCE, FRUIT)
+        missed = store.below(h + 50, FRUIT) & ~sliced
+        cut_x, cut_y = store.view("x")[sliced], store.view("y")[sliced]
+        self.score += len(cut_x)
+        self.lives -= int(missed.sum())
+        store.remove(sliced | missed)
+        store.spawn(SPLASH, cut_x, cut_y, timer=self.SPLASH_DURATION)
 
+        # Bombs: touching one is an instant game over
+        if store.swept_hits(starts, ends, self.SLICE_DISTANCE, BOMB).any():
+            self.game_over = True
+        store.remove(store.below(h + 50, BOMB))
+
+        # Splashes fade out after SPLASH_DURATION seconds
+        store.remove(store.tick_timers(SPLASH, dt))
+
+        if self.lives <= 0:
+            self.game_over = True
+
+    def update(self, w, h, pointers, now=None):
+        """Runs as many fixed steps as the time since the last frame calls for."""
+        steps = self.clock.advance(now)
+        if steps == 0:
+            return
+        starts, ends = self.pointer_segments(pointers)
+        for i in range(steps):
+            # Split this frame's swipe evenly across the steps
+            a, b = i / steps, (i + 1) / steps
+            self.step(w, h, starts + (ends - starts) * a, starts + (ends - starts) * b)
             if self.game_over:
-                cv2.putText(frame, "Game Over!", (w//2 - 200, h//2), cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 0, 255), 8)
-                cv2.putText(frame, "R: Restart | Q: Quit", (w//2 - 250, h//2 + 140), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-                cv2.imshow(WINDOW_NAME, frame)
-                continue
-
-            if self.paused:
-                cv2.putText(frame, "Paused", (w//2 - 100, h//2), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 0), 4)
-                cv2.imshow(WINDOW_NAME, frame)
-                continue
-
-            tip_x, tip_y = self.track_hand(frame)
-            self.spawn_fruit(frame)
-            self.process_fruits(frame, tip_x, tip_y, h)
-            self.process_bombs(frame, tip_x, tip_y, h)
-            
-            if self.lives <= 0:
-                self.game_over = True
-
-            self.process_splashes(frame)
+                break
+        self.last_pointers = pointers if len(pointers) > 0 else None
+
+    def draw_entities(self, frame):
+        # Draw between the last two steps so motion looks smooth at any frame rate
+        # Fruit and splash sprites are queued and blended together in one flush,
+        # with splashes on top of fruits
+        store, alpha, batch = self.entities, self.clock.alpha, self.sprite_batch
+        for x, y in zip(*store.interpolated(alpha, FRUIT)):
+            if self.watermelon_img is not None:
+                batch.draw(self.watermelon_img, x - self.FRUIT_RADIUS, y - self.FRUIT_RADIUS, size=(80, 80), z=0)
+            else:
+                cv2.circle(frame, (int(x), int(y)), self.FRUIT_RADIUS, (0, 0, 255), 10)
+
+        for x, y in zip(*store.interpolated(alpha, SPLASH)):
+            if self.splash_img is not None:
+                batch.draw(self.splash_img, x - 50, y - 50, size=(100, 100), z=1)
+            else:
+                cv2.circle(frame, (int(x), int(y)), 45, (0, 255, 255), -1)
+        batch.flush(frame)
+
+        # Bombs go on top of everything so they're never hidden behind a fruit
+        for x, y in zip(*store.interpolated(alpha, BOMB)):
+            cv2.circle(frame, (int(x), int(y)), self.FRUIT_RADIUS, (0, 0, 0), -1) # Black bomb
+
+    def draw_ui(self, frame):
+        self.hud.panel("bar", (10, 20), (580, 90), (50, 50, 50))
+        self.hud.text("score", f"Score: {self.score}", (30, 75), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 4)
+        self.hud.text("lives", f"Lives: {self.lives}", (350, 75), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 4)
+        self.hud.text("help", "P: Pause R: Restart Q: Quit", (30, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (200, 200, 200), 2)
+        self.hud.draw(frame)
+
+    def process_frame(self, frame):
+        self.hand_result = None
+        # Mirrored in place: the frame is ours until the next one is read
+        cv2.flip(frame, 1, dst=frame)
+        h, w, _ = frame.shape
+        # Hands are only looked for in states that need them (see PERCEPTION)
+        state = self.state()
+        pointers = self.track_hand(frame, self.PERCEPTION[state])
+
+        if state == "GAME_OVER":
+            self.hud.text("game over", "Game Over!", (w//2 - 200, h//2), cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 0, 255), 8)
+            self.hud.text("game over help", "R: Restart | Q: Quit", (w//2 - 250, h//2 + 140), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            self.hud.draw(frame)
+            self.clock.reset(self.now())
+            return frame
+
+        if state == "PAUSED":
+            self.hud.text("paused", "Paused", (w//2 - 100, h//2), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 0), 4)
+            self.hud.draw(frame)
+            self.clock.reset(self.now())
+            return frame
+
+        with profiler.span("simulation"):
+            self.update(w, h, pointers, now=self.now())
+        with profiler.span("draw"):
+            self.draw_entities(frame)
             self.draw_ui(frame)
-            cv2.imshow(WINDOW_NAME, frame)
+        return frame
+
+    def set_quality(self, settings):
+        # Called by run_demo to hold the target frame rate (see quality.py)
+        apply_hands_quality(self.hands, settings)
 
-        self.cap.release()
-        cv2.destroyAllWindows()
+    def handle_key(self, key):
+        if key == ord('p'):
+            self.paused = not self.paused
+        elif key == ord('r'):
+            self.reset_game()
+        return True
+
+    def close(self):
+        self.hands.close()
+
+    def run(self):
+        run_demo(self, self.cap)
 
 if __name__ == "__main__":
     game = FruitNinjaGame()
-    game.run()
\ No newline at end of file
+    game.run()
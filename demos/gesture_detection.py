@@ -1,61 +1,64 @@
 import cv2
-import mediapipe as mp
+from quality import apply_hands_quality
+from runner import run_demo
+from hand_service import LocalHands, draw_landmarks
+from perception import PerceptionScheduler
+from gestures import count_fingers
 
-# Initialize MediaPipe Hands solution and drawing utilities
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands()
-mp_draw = mp.solutions.drawing_utils
 
-# Open the default webcam
-cap = cv2.VideoCapture(0)
+class GestureDetectionDemo:
+    WINDOW_NAME = "Hand Tracking"
+    # How MediaPipe Hands is set up for this demo (the launcher reuses a warm one)
+    HANDS_SERVICE = LocalHands
+    HANDS_OPTIONS = {}
 
-while True:
-    # Read a frame from the webcam
-    ret, frame = cap.read()
-    if not ret:
-        break
+    def __init__(self, hands=None):
+        # Initialize MediaPipe Hands (a replay can pass in session.RecordedHands instead)
+        self.hands = hands if hands is not None else self.HANDS_SERVICE(**self.HANDS_OPTIONS)
+        self.hand_result = None
+        # This demo always wants landmarks, on every frame
+        self.perception = PerceptionScheduler(self.hands)
 
-    # Convert the frame to RGB for MediaPipe processing
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
+    def process_frame(self, frame):
+        # Find hands (the frame is converted to RGB for MediaPipe inside submit);
+        # landmarks come back as a (hands, 21, 3) array of normalized x, y, z
+        self.hand_result = self.perception.step(frame)
 
-    # If hands are detected in the frame
-    if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
+        # If hands are detected in the frame
+        if self.hand_result is not None and len(self.hand_result.landmarks) > 0:
             # Draw hand landmarks on the frame
-            mp_draw.draw_landmarks(
-                frame, hand_landmarks, mp_hands.HAND_CONNECTIONS
-            )
-            # Count raised fingers
-            finger_tips = [8, 12, 16, 20]  # Indexes for finger tips
-            thumb_tip = 4  # Index for thumb tip
-
-            fingers_up = 0
-
-            # Check if thumb is up (based on x-axis position)
-            if hand_landmarks.landmark[thumb_tip].x < hand_landmarks.landmark[thumb_tip - 1].x:
-                fingers_up += 1
-
-            # Check if other fingers are up (based on y-axis position)
-            for tip in finger_tips:
-                if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y:
-                    fingers_up += 1
-
-            # Display gesture text based on number of fingers up
-            if fingers_up >= 4:
-                cv2.putText(frame, "OPEN HAND", (50, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            elif fingers_up == 0:
-                cv2.putText(frame, "FIST", (50, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-    # Show the frame with hand landmarks and gesture text
-    cv2.imshow("Hand Tracking", frame)
-
-    # Exit loop if 'q' is pressed
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-# Release webcam and close all OpenCV windows
-cap.release()
-cv2.destroyAllWindows()
+            draw_landmarks(frame, self.hand_result.landmarks)
+
+            # Count raised fingers on every hand in one go (the thumb test
+            # depends on whether it is a left or a right hand)
+            counts = count_fingers(self.hand_result.landmarks, self.hand_result.handedness)
+
+            for fingers_up in counts:
+                # Display gesture text based on number of fingers up
+                if fingers_up >= 4:
+                    cv2.putText(frame, "OPEN HAND", (50, 50),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                elif fingers_up == 0:
+                    cv2.putText(frame, "FIST", (50, 50),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        return frame
+
+    def set_quality(self, settings):
+        # Called by run_demo to hold the target frame rate (see quality.py)
+        apply_hands_quality(self.hands, settings)
+
+    def handle_key(self, key):
+        return True
+
+    def close(self):
+        self.hands.close()
+
+
+def main():
+    # Read from the default webcam (or the source in UTEACH_SOURCE),
+    # show the frame with hand landmarks and gesture text, exit if 'q' is pressed
+    run_demo(GestureDetectionDemo())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import numpy as np
+
+# -------------------------------
+# Hand gestures from (hands, 21, 3) landmark arrays
+#
+# Every function takes landmarks shaped (..., 21, 3): one hand (21, 3), one
+# frame (hands, 21, 3), or a whole recorded session (frames, hands, 21, 3),
+# and classifies every hand in one NumPy call. Missing hands (NaN landmarks,
+# as in recorded sessions) come out as 0 fingers and UNKNOWN.
+# -------------------------------
+
+# Landmark indexes (see MediaPipe's hand landmark diagram)
+WRIST = 0
+THUMB_TIP = 4
+FINGER_TIPS = [8, 12, 16, 20]  # index, middle, ring, pinky
+
+# Handedness codes used in arrays ("Left"/"Right" labels are converted to these)
+LEFT, RIGHT = 0, 1
+HANDEDNESS = ["Left", "Right"]
+
+# Rock paper scissors gestures, returned as small integer codes
+UNKNOWN, ROCK, PAPER, SCISSORS = 0, 1, 2, 3
+GESTURE_NAMES = ["UNKNOWN", "ROCK", "PAPER", "SCISSORS"]
+
+
+def handedness_codes(handedness):
+    """Turns a list like ["Left", "Right"] into an int8 array of LEFT/RIGHT codes (arrays pass through)."""
+    if isinstance(handedness, np.ndarray):
+        return handedness.astype(np.int8, copy=False)
+    return np.array([HANDEDNESS.index(label) for label in handedness], dtype=np.int8)
+
+
+def fingers_up(landmarks, handedness=None):
+    """
+    Returns a bool array (..., 5): is each finger (thumb first) extended?
+
+    A finger is up when its tip is above the joint two below it (y grows
+    downwards). The thumb sticks out sideways, so it is tested on x instead,
+    and which way is "out" depends on the hand: pass handedness (labels or
+    LEFT/RIGHT codes, one per hand) to flip the test for left hands. Without
+    it every hand uses the right-hand rule.
+    """
+    landmarks = np.asarray(landmarks)
+    up = np.empty(landmarks.shape[:-2] + (5,), dtype=bool)
+
+    # Thumb: tip left of the joint below it (right hand) or right of it (left hand)
+    thumb_out = landmarks[..., THUMB_TIP, 0] - landmarks[..., THUMB_TIP - 1, 0]
+    if handedness is not None:
+        codes = handedness_codes(handedness)
+        thumb_out = np.where(codes == LEFT, -thumb_out, thumb_out)
+    up[..., 0] = thumb_out < 0
+
+    # Other fingers: tip above the middle joint
+    up[..., 1:] = landmarks[..., FINGER_TIPS, 1] < landmarks[..., [tip - 2 for tip in FINGER_TIPS], 1]
+    return up
+
+
+def count_fingers(landmarks, handedness=None):
+    """Number of extended fingers (0-5) for every hand, as an int array (...)."""
+    return fingers_up(landmarks, handedness).sum(axis=-1)
+
+
+def classify_rps(landmarks, handedness=None):
+    """
+    Classifies every hand as ROCK (no fingers up), SCISSORS (two), PAPER (four
+    or more) or UNKNOWN. Returns an int8 array of codes; GESTURE_NAMES[code]
+    gives the name.
+    """
+    landmarks = np.asarray(landmarks)
+    count = count_fingers(landmarks, handedness)
+    gestures = np.full(count.shape, UNKNOWN, dtype=np.int8)
+    gestures[count == 0] = ROCK
+    gestures[count == 2] = SCISSORS
+    gestures[count >= 4] = PAPER
+    # Hands that are not there (NaN padding in recordings) stay UNKNOWN
+    gestures[np.isnan(landmarks[..., WRIST, 0])] = UNKNOWN
+    return gestures
@@ -0,0 +1,312 @@
+import multiprocessing as mp
+import queue
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from profiling import profiler
+from frame_pool import FramePool
+
+# What the service hands back for each processed frame:
+#   frame_id:       the ID passed to submit()
+#   landmarks:      float32 array (hands, 21, 3) of normalized x, y, z
+#   handedness:     list of "Left"/"Right", one per hand
+#   latency:        seconds from submit() until the result was received
+#   inference_time: seconds spent inside hands.process() in the worker
+#   measured_at:    the time the frame was captured, on the game's clock; filled
+#                   in by PerceptionScheduler (and saved in recorded sessions)
+HandResult = namedtuple("HandResult", ["frame_id", "landmarks", "handedness", "latency", "inference_time",
+                                       "measured_at"], defaults=(None,))
+
+# MediaPipe's defaults for the Hands() options, so set_options() can tell
+# whether a change really differs from what the demo passed in
+HANDS_DEFAULTS = dict(max_num_hands=2, model_complexity=1,
+                      min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+# Same pairs as mediapipe's HAND_CONNECTIONS, so landmarks can be drawn
+# without importing mediapipe in the main process
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+]
+
+
+def results_to_arrays(output):
+    """Converts a MediaPipe Hands result into a (hands, 21, 3) float32 array and a list of "Left"/"Right"."""
+    landmarks = np.zeros((0, 21, 3), dtype=np.float32)
+    handedness = []
+    if output.multi_hand_landmarks:
+        landmarks = np.array(
+            [[(p.x, p.y, p.z) for p in hand.landmark] for hand in output.multi_hand_landmarks],
+            dtype=np.float32,
+        )
+        handedness = [h.classification[0].label for h in output.multi_handedness]
+    return landmarks, handedness
+
+
+def _worker(hands_kwargs, requests, results):
+    """Runs in the worker process: reads RGB frames from shared memory and runs MediaPipe Hands."""
+    import mediapipe
+
+    hands = mediapipe.solutions.hands.Hands(**hands_kwargs)
+    # Tell the service the model is loaded
+    results.put(None)
+    blocks = []
+    frames = []
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        if request[0] == "options":
+            # Frames queued before this were processed with the old model
+            hands.close()
+            hands = mediapipe.solutions.hands.Hands(**request[1])
+            continue
+        if request[0] == "frames":
+            # The shared memory slots, sent once the frame size is known
+            _, shm_names, frame_shape = request
+            blocks = [shared_memory.SharedMemory(name=name) for name in shm_names]
+            frames = [np.ndarray(frame_shape, dtype=np.uint8, buffer=b.buf) for b in blocks]
+            continue
+        slot, frame_id = request
+
+        start = time.perf_counter()
+        output = hands.process(frames[slot])
+        inference_time = time.perf_counter() - start
+
+        landmarks, handedness = results_to_arrays(output)
+        results.put((slot, frame_id, landmarks, handedness, inference_time))
+
+    hands.close()
+    for b in blocks:
+        b.close()
+
+
+class HandInferenceService:
+    """
+    Runs MediaPipe Hands in a worker process so inference overlaps with the game loop.
+
+    Frames are written into shared memory slots (no pickling of images), and the
+    worker sends back small landmark arrays. Keep a few slots so frame N+1 can be
+    submitted while frame N is still being processed:
+
+        service.submit(frame, frame_id)
+        result = service.result(min_frame_id=frame_id - 1)   # previous frame's hands
+
+    The worker starts loading MediaPipe (about a second) as soon as the service
+    is created. Until it is ready, submit() drops frames and result() returns
+    right away, so the game loop never waits on a model that isn't loaded.
+
+    hands_kwargs are passed straight to mediapipe.solutions.hands.Hands().
+    """
+
+    def __init__(self, slots=2, **hands_kwargs):
+        self.slots = slots
+        self.hands_kwargs = hands_kwargs
+        self.frame_shape = None
+        self.latest = None
+        self.ready = False  # True once the worker has loaded MediaPipe
+        self.dropped_frames = 0
+        self._blocks = []
+        self._frames = []
+        self._free = []
+        self._submit_times = {}
+
+        # "spawn" gives the worker a clean interpreter (safe with OpenCV and MediaPipe threads)
+        ctx = mp.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker,
+            args=(self.hands_kwargs, self._requests, self._results),
+            daemon=True,
+        )
+        self.process.start()
+
+    def _allocate(self, frame_shape):
+        # The slots need the frame size, so they are made on the first submit()
+        self.frame_shape = frame_shape
+        size = int(np.prod(frame_shape))
+        self._blocks = [shared_memory.SharedMemory(create=True, size=size) for _ in range(self.slots)]
+        self._frames = [np.ndarray(frame_shape, dtype=np.uint8, buffer=b.buf) for b in self._blocks]
+        self._free = list(range(self.slots))
+        self._requests.put(("frames", [b.name for b in self._blocks], frame_shape))
+
+    def submit(self, frame, frame_id):
+        """
+        Queues a BGR frame for inference. Returns False (and counts a dropped frame)
+        if the worker is still loading MediaPipe or every slot is still busy with
+        earlier frames.
+        """
+        if self.process is None or not self.process.is_alive():
+            raise RuntimeError("The hand inference worker stopped unexpectedly.")
+        if self.frame_shape is None:
+            self._allocate(frame.shape)
+        elif frame.shape != self.frame_shape:
+            raise ValueError(f"Frame shape changed from {self.frame_shape} to {frame.shape}")
+
+        self._collect(block=False)
+        if not self.ready or not self._free:
+            self.dropped_frames += 1
+            return False
+
+        slot = self._free.pop()
+        # Converting to RGB writes the frame straight into shared memory
+        with profiler.span("cvtColor"):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._frames[slot])
+        self._submit_times[frame_id] = time.perf_counter()
+        self._requests.put((slot, frame_id))
+        return True
+
+    def set_options(self, **changes):
+        """
+        Changes Hands() options, e.g. set_options(model_complexity=0). The worker
+        loads the new model before the next frame. Returns False if nothing changed.
+        """
+        if not _options_change(self.hands_kwargs, changes):
+            return False
+        self.hands_kwargs = {**self.hands_kwargs, **changes}
+        self._requests.put(("options", self.hands_kwargs))
+        return True
+
+    def result(self, min_frame_id=None, timeout=0.5):
+        """
+        Returns the newest HandResult received so far.
+
+        If min_frame_id is given, waits (up to timeout seconds) for a result at
+        least that new, as long as such a frame is still being processed.
+        Returns right away while the worker is still loading MediaPipe.
+        """
+        self._collect(block=False)
+        if not self.ready:
+            return self.latest
+        deadline = time.perf_counter() + timeout
+        with profiler.span("hands.process (wait)"):
+            while (min_frame_id is not None and self._waiting_for(min_frame_id)
+                   and time.perf_counter() < deadline):
+                self._collect(block=True, timeout=deadline - time.perf_counter())
+        return self.latest
+
+    def _waiting_for(self, min_frame_id):
+        if self.latest is not None and self.latest.frame_id >= min_frame_id:
+            return False
+        return any(frame_id >= min_frame_id for frame_id in self._submit_times)
+
+    def _collect(self, block, timeout=None):
+        while True:
+            try:
+                if block:
+                    item = self._results.get(timeout=max(timeout, 0))
+                    block = False
+                else:
+                    item = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                # The worker has loaded MediaPipe
+                self.ready = True
+                continue
+            slot, frame_id, landmarks, handedness, inference_time = item
+            self._free.append(slot)
+            latency = time.perf_counter() - self._submit_times.pop(frame_id)
+            if self.latest is None or frame_id > self.latest.frame_id:
+                self.latest = HandResult(frame_id, landmarks, handedness, latency, inference_time)
+
+    def reset(self, timeout=2.0):
+        """
+        Forgets every result, for a new user whose frame IDs start over (the
+        launcher hands a warm service to the next demo). Waits up to timeout
+        seconds for frames still being processed, so their results can't turn
+        up afterwards and hide the new ones.
+        """
+        deadline = time.perf_counter() + timeout
+        while self._submit_times and time.perf_counter() < deadline:
+            self._collect(block=True, timeout=deadline - time.perf_counter())
+        self.latest = None
+
+    def close(self):
+        if self.process is not None:
+            self._requests.put(None)
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        for b in self._blocks:
+            b.close()
+            b.unlink()
+        self._blocks = []
+        self._frames = []
+
+
+class LocalHands:
+    """
+    Runs MediaPipe Hands in this process, with the same submit()/result() calls
+    as HandInferenceService. Simpler and without the one-frame delay, for demos
+    that need the hands of the frame they are drawing.
+
+        hands.submit(frame, frame_id)
+        result = hands.result()   # this frame's hands
+    """
+
+    def __init__(self, **hands_kwargs):
+        import mediapipe
+
+        self.hands_kwargs = hands_kwargs
+        self.hands = mediapipe.solutions.hands.Hands(**hands_kwargs)
+        self.latest = None
+        self.buffers = FramePool()  # the RGB copy is made in the same buffer every frame
+        self.dropped_frames = 0
+
+    def set_options(self, **changes):
+        """Changes Hands() options (reloads the model); returns False if nothing changed."""
+        import mediapipe
+
+        if not _options_change(self.hands_kwargs, changes):
+            return False
+        self.hands_kwargs = {**self.hands_kwargs, **changes}
+        self.hands.close()
+        self.hands = mediapipe.solutions.hands.Hands(**self.hands_kwargs)
+        return True
+
+    def submit(self, frame, frame_id):
+        with profiler.span("cvtColor"):
+            rgb = self.buffers.like("rgb", frame)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        start = time.perf_counter()
+        with profiler.span("hands.process"):
+            output = self.hands.process(rgb)
+        inference_time = time.perf_counter() - start
+        landmarks, handedness = results_to_arrays(output)
+        self.latest = HandResult(frame_id, landmarks, handedness, inference_time, inference_time)
+        return True
+
+    def result(self, min_frame_id=None, timeout=None):
+        return self.latest
+
+    def reset(self, timeout=None):
+        self.latest = None
+
+    def close(self):
+        self.hands.close()
+
+
+def _options_change(hands_kwargs, changes):
+    """True if applying `changes` would give Hands() different options than now."""
+    current = {**HANDS_DEFAULTS, **hands_kwargs}
+    return any(current.get(key) != value for key, value in changes.items())
+
+
+def draw_landmarks(frame, landmarks, color=(0, 255, 0), radius=4):
+    """Draws (hands, 21, 3) normalized landmarks and their connections onto a BGR frame."""
+    h, w = frame.shape[:2]
+    for hand in landmarks:
+        points = [(int(x * w), int(y * h)) for x, y, _ in hand]
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(frame, points[a], points[b], (255, 255, 255), 2)
+        for point in points:
+            cv2.circle(frame, point, radius, color, -1)
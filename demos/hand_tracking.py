@@ -1,39 +1,57 @@
 import cv2
-import mediapipe as mp
-
-# Initialize MediaPipe Hands solution and drawing utilities
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands()
-mp_draw = mp.solutions.drawing_utils
+from quality import apply_hands_quality
+from runner import run_demo
+from hand_service import HandInferenceService, draw_landmarks
+from perception import PerceptionScheduler
+
+
+class HandTrackingDemo:
+    WINDOW_NAME = "Hand Tracking"
+    # How MediaPipe Hands is set up for this demo (the launcher reuses a warm one)
+    HANDS_SERVICE = HandInferenceService
+    HANDS_OPTIONS = {}
+
+    def __init__(self, hands=None):
+        # Start MediaPipe Hands in a worker process: while it looks for hands in
+        # one frame, this process keeps drawing and showing the previous one
+        # (a replay can pass in session.RecordedHands instead)
+        self.hands = hands if hands is not None else self.HANDS_SERVICE(**self.HANDS_OPTIONS)
+        self.hand_result = None
+        # This demo always wants landmarks, on every frame
+        self.perception = PerceptionScheduler(self.hands)
+
+    def process_frame(self, frame):
+        # Send the frame to the worker (it converts it to RGB for MediaPipe)
+        # and pick up the landmarks found in the previous frame
+        result = self.perception.step(frame)
+        self.hand_result = result
+
+        # If hands are detected in the frame
+        if result is not None and len(result.landmarks) > 0:
+            # Draw hand landmarks on the frame
+            draw_landmarks(frame, result.landmarks)
+            cv2.putText(frame, f"Inference latency: {result.latency * 1000:.0f} ms", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        return frame
 
-# Open the default webcam
-cap = cv2.VideoCapture(0)
+    def set_quality(self, settings):
+        # Called by run_demo to hold the target frame rate (see quality.py)
+        apply_hands_quality(self.hands, settings)
 
-while True:
-    # Read a frame from the webcam
-    ret, frame = cap.read()
-    if not ret:
-        break
+    def handle_key(self, key):
+        return True
 
-    # Convert the frame to RGB for MediaPipe processing
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
+    def close(self):
+        # Stop the worker process
+        self.hands.close()
 
-    # If hands are detected in the frame
-    if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
-            # Draw hand landmarks on the frame
-            mp_draw.draw_landmarks(
-                frame, hand_landmarks, mp_hands.HAND_CONNECTIONS
-            )
 
-    # Show the frame with hand landmarks
-    cv2.imshow("Hand Tracking", frame)
+def main():
+    # Read from the default webcam (or the source in UTEACH_SOURCE),
+    # show the frame with hand landmarks, exit if 'q' is pressed
+    run_demo(HandTrackingDemo())
 
-    # Exit loop if 'q' is pressed
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
 
-# Release webcam and close all OpenCV windows
-cap.release()
-cv2.destroyAllWindows()
+# The guard is needed because the worker process re-imports this file
+if __name__ == "__main__":
+    main()
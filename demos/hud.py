@@ -0,0 +1,190 @@
+import cv2
+import numpy as np
+from collections import namedtuple
+from profiling import profiler
+from utils import PreparedOverlay, blend_prepared
+
+# One thing on the HUD:
+#   kind: "text" or "panel"
+#   args: everything needed to draw it (compared to spot changes)
+#   rect: (x1, y1, x2, y2) it covers, end exclusive
+_Element = namedtuple("_Element", ["kind", "args", "rect"])
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+class Hud:
+    """
+    Heads-up display text and panels, drawn once and reused between frames.
+
+    Every frame, say what should be on screen with text() and panel() (the same
+    arguments as cv2.putText and a filled cv2.rectangle, after a name for the
+    element), then call draw(frame):
+
+        hud.panel("bar", (10, 20), (580, 90), (50, 50, 50))
+        hud.text("score", f"Score: {score}", (30, 75), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 4)
+        hud.draw(frame)
+
+    Elements are rendered into a cached BGRA layer the size of the frame, and
+    only re-rendered when they change (a new score, a different countdown
+    digit) or appear or disappear; elements that weren't declared since the last
+    draw() are left out. draw() then copies the layer into the frame, only
+    where it has something on it: overlapping elements (text on a panel) are
+    composited together, with a masked copy where everything is opaque and an
+    alpha blend where a panel is see-through.
+    """
+
+    def __init__(self):
+        self.elements = {}   # declared since the last draw(), in order
+        self.shown = {}      # what the layer holds now
+        self.color = None    # layer color, premultiplied by alpha
+        self.alpha = None
+        self.regions = []    # (x1, y1, x2, y2, PreparedOverlay or None if opaque)
+        self.renders = 0     # elements drawn into the layer so far
+
+    # -------------------------------
+    # Declaring elements
+    # -------------------------------
+
+    def text(self, name, text, org, font_face, font_scale, color, thickness=1):
+        """Shows a line of text with its bottom-left corner at org (like cv2.putText)."""
+        args = (str(text), tuple(org), font_face, font_scale, tuple(color), thickness)
+        element = self.shown.get(name)
+        if element is None or element.args != args:
+            (w, h), baseline = cv2.getTextSize(args[0], font_face, font_scale, thickness)
+            x, y = args[1]
+            # Thick strokes reach past the box getTextSize measures
+            pad = thickness
+            element = _Element("text", args, (x - pad, y - h - pad, x + w + pad, y + baseline + pad))
+        self.elements[name] = element
+
+    def panel(self, name, pt1, pt2, color, opacity=1.0):
+        """Shows a filled rectangle between two corners (like cv2.rectangle), optionally see-through."""
+        args = (tuple(pt1), tuple(pt2), tuple(color), opacity)
+        element = self.shown.get(name)
+        if element is None or element.args != args:
+            rect = (min(pt1[0], pt2[0]), min(pt1[1], pt2[1]),
+                    max(pt1[0], pt2[0]) + 1, max(pt1[1], pt2[1]) + 1)
+            element = _Element("panel", args, rect)
+        self.elements[name] = element
+
+    # -------------------------------
+    # Drawing
+    # -------------------------------
+
+    def draw(self, frame):
+        """Brings the layer up to date and composites it into the frame, in place."""
+        with profiler.span("hud"):
+            h, w = frame.shape[:2]
+            if self.alpha is None or self.alpha.shape != (h, w):
+                self.color = np.zeros((h, w, 3), dtype=np.uint8)
+                self.alpha = np.zeros((h, w), dtype=np.uint8)
+                self.shown = {}
+
+            dirty = self._dirty_rects()
+            if dirty:
+                self.shown = self.elements
+                for rect in dirty:
+                    self._render(self._clip(rect, w, h))
+                self._find_regions(w, h)
+            self.elements = {}
+
+            for x1, y1, x2, y2, prepared in self.regions:
+                if prepared is None:
+                    # Every pixel is either fully covered or empty: a masked copy
+                    cv2.copyTo(self.color[y1:y2, x1:x2], self.alpha[y1:y2, x1:x2], frame[y1:y2, x1:x2])
+                else:
+                    blend_prepared(frame, prepared, x1, y1)
+
+    def clear(self):
+        """Removes every element (the next draw() shows nothing unless they are declared again)."""
+        self.elements = {}
+
+    def _dirty_rects(self):
+        # Where the layer no longer matches what was declared this frame
+        old, new = self.shown, self.elements
+        if [n for n in old if n in new] != [n for n in new if n in old]:
+            # Same elements in a different order: what's on top may have changed
+            return [element.rect for element in list(old.values()) + list(new.values())]
+        dirty = []
+        for name, element in new.items():
+            previous = old.get(name)
+            if previous is not element:
+                dirty.append(element.rect)
+                if previous is not None:
+                    dirty.append(previous.rect)
+        dirty.extend(element.rect for name, element in old.items() if name not in new)
+        return dirty
+
+    @staticmethod
+    def _clip(rect, w, h):
+        return (max(rect[0], 0), max(rect[1], 0), min(rect[2], w), min(rect[3], h))
+
+    def _render(self, rect):
+        """Clears a rectangle of the layer and redraws every element that touches it, in order."""
+        x1, y1, x2, y2 = rect
+        if x1 >= x2 or y1 >= y2:
+            return
+        color = self.color[y1:y2, x1:x2]
+        alpha = self.alpha[y1:y2, x1:x2]
+        color[:] = 0
+        alpha[:] = 0
+        for element in self.shown.values():
+            if not _overlaps(element.rect, rect):
+                continue
+            self.renders += 1
+            # Drawing on views of the rectangle clips everything else for free
+            if element.kind == "text":
+                text, (x, y), font_face, font_scale, bgr, thickness = element.args
+                org = (x - x1, y - y1)
+                cv2.putText(color, text, org, font_face, font_scale, bgr, thickness)
+                cv2.putText(alpha, text, org, font_face, font_scale, 255, thickness)
+            else:
+                pt1, pt2, bgr, opacity = element.args
+                a = int(round(255 * opacity))
+                premultiplied = tuple(int(round(c * a / 255)) for c in bgr)
+                p1, p2 = (pt1[0] - x1, pt1[1] - y1), (pt2[0] - x1, pt2[1] - y1)
+                if a == 255:
+                    cv2.rectangle(color, p1, p2, premultiplied, -1)
+                    cv2.rectangle(alpha, p1, p2, a, -1)
+                else:
+                    # See-through: composite over what is already on the layer
+                    ex1, ey1 = max(element.rect[0], x1) - x1, max(element.rect[1], y1) - y1
+                    ex2, ey2 = min(element.rect[2], x2) - x1, min(element.rect[3], y2) - y1
+                    sub_c = color[ey1:ey2, ex1:ex2]
+                    sub_a = alpha[ey1:ey2, ex1:ex2]
+                    keep = (255 - a) / 255
+                    sub_c[:] = np.round(sub_c * keep + premultiplied).astype(np.uint8)
+                    sub_a[:] = np.round(sub_a * keep + a).astype(np.uint8)
+
+    def _find_regions(self, w, h):
+        # Merge overlapping elements into regions, so each pixel is copied once
+        rects = [self._clip(element.rect, w, h) for element in self.shown.values()]
+        rects = [r for r in rects if r[0] < r[2] and r[1] < r[3]]
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    if _overlaps(rects[i], rects[j]):
+                        rects[i] = _union(rects[i], rects.pop(j))
+                        merged = True
+                        break
+                if merged:
+                    break
+
+        self.regions = []
+        for x1, y1, x2, y2 in rects:
+            alpha = self.alpha[y1:y2, x1:x2]
+            if np.any((alpha > 0) & (alpha < 255)):
+                inv_alpha = np.repeat(255 - alpha[:, :, None], 3, axis=2)
+                prepared = PreparedOverlay(self.color[y1:y2, x1:x2], inv_alpha)
+            else:
+                prepared = None
+            self.regions.append((x1, y1, x2, y2, prepared))
@@ -0,0 +1,201 @@
+import math
+import numpy as np
+
+# -------------------------------
+# Filters for hand landmarks.
+#
+# Raw MediaPipe landmarks jitter by a pixel or two from frame to frame, and if
+# inference only runs every other frame they also stand still in between.
+# These filters smooth the positions they are given and can predict where the
+# landmarks are at any later time, so a game can draw (and slice with) a
+# steady fingertip on every frame. Both work on whole arrays at once, e.g. all
+# (hands, 21, 3) landmarks, with times in seconds.
+# -------------------------------
+
+
+def _smoothing_factor(dt, cutoff):
+    """Weight of a new sample in a low-pass filter with this cutoff frequency (Hz)."""
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class OneEuroFilter:
+    """
+    The 1-euro filter (Casiez et al., 2012): a low-pass filter whose cutoff
+    rises with speed, so a hand held still is steady and a fast swipe has
+    little lag.
+
+    min_cutoff: cutoff (Hz) when not moving; lower = steadier but laggier
+    beta:       how much the cutoff rises per unit of speed (units per second)
+    d_cutoff:   cutoff (Hz) for the speed estimate itself
+
+    The defaults suit normalized landmarks (0..1 across the frame) at 30 FPS;
+    they were picked with demos/bench_landmark_filter.py.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=300.0, d_cutoff=30.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None   # filtered position
+        self.dx = None  # filtered speed (units per second)
+        self.t = None
+
+    def update(self, x, t):
+        """Adds a measurement taken at time t and returns the filtered value."""
+        x = np.asarray(x, dtype=np.float64)
+        if self.x is None or x.shape != self.x.shape:
+            self.x, self.dx, self.t = x.copy(), np.zeros_like(x), t
+            return self.x.copy()
+        dt = t - self.t
+        if dt <= 0:
+            return self.x.copy()
+
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        self.dx += a_d * ((x - self.x) / dt - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        a = _smoothing_factor(dt, cutoff)
+        self.x += a * (x - self.x)
+        self.t = t
+        return self.x.copy()
+
+    def predict(self, t):
+        """Where the value is expected to be at time t, carrying on at the filtered speed."""
+        if self.x is None:
+            return None
+        return self.x + self.dx * max(t - self.t, 0.0)
+
+
+class KalmanFilter:
+    """
+    A constant-velocity Kalman filter for each value: the state is a position
+    and a speed, the speed changes by random accelerations, and every
+    measurement is the position plus noise.
+
+    process_noise:     how much the speed may change (units / s^2, as a variance
+                       density); higher follows quick turns, lower is smoother
+    measurement_noise: variance of a measurement (units^2)
+
+    The defaults suit normalized landmarks, like OneEuroFilter's.
+    """
+
+    def __init__(self, process_noise=3.0, measurement_noise=1e-5):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.v = None
+        self.t = None
+        # Covariance of (position, speed) for every value: [[p00, p01], [p01, p11]]
+        self.p00 = self.p01 = self.p11 = None
+
+    def _predict_state(self, dt):
+        q = self.process_noise
+        x = self.x + self.v * dt
+        p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+        p01 = self.p01 + dt * self.p11 + q * dt ** 2 / 2
+        p11 = self.p11 + q * dt
+        return x, p00, p01, p11
+
+    def update(self, x, t):
+        """Adds a measurement taken at time t and returns the filtered value."""
+        z = np.asarray(x, dtype=np.float64)
+        if self.x is None or z.shape != self.x.shape:
+            self.x, self.v, self.t = z.copy(), np.zeros_like(z), t
+            self.p00 = np.full_like(z, self.measurement_noise)
+            self.p01 = np.zeros_like(z)
+            self.p11 = np.full_like(z, 1.0)  # speed unknown at first
+            return self.x.copy()
+        dt = max(t - self.t, 0.0)
+
+        # Predict to the time of the measurement ...
+        x, p00, p01, p11 = self._predict_state(dt)
+        # ... then correct it by how far off the measurement was
+        gain_x = p00 / (p00 + self.measurement_noise)
+        gain_v = p01 / (p00 + self.measurement_noise)
+        error = z - x
+        self.x = x + gain_x * error
+        self.v = self.v + gain_v * error
+        self.p00 = (1 - gain_x) * p00
+        self.p01 = (1 - gain_x) * p01
+        self.p11 = p11 - gain_v * p01
+        self.t = t
+        return self.x.copy()
+
+    def predict(self, t):
+        """Where the value is expected to be at time t, carrying on at the estimated speed."""
+        if self.x is None:
+            return None
+        return self.x + self.v * max(t - self.t, 0.0)
+
+
+FILTERS = {"one_euro": OneEuroFilter, "kalman": KalmanFilter}
+
+
+class LandmarkSmoother:
+    """
+    Smooths the landmarks of every hand in a stream of HandResults and predicts
+    them on frames without a new result.
+
+    Call track(result, measured_at, now) every frame with the newest result (the
+    same one again on frames where inference was skipped), the time its frame
+    was captured and the current time. It returns a (hands, 21, 3) array of
+    landmarks for `now`. Each hand keeps its own filter, matched by handedness
+    ("Left"/"Right"), and is forgotten when a result no longer contains it.
+    Predictions never reach more than max_ahead seconds past the last result,
+    so a stalled camera or worker doesn't send the fingertip flying off.
+    """
+
+    def __init__(self, kind="one_euro", max_ahead=0.1, **filter_kwargs):
+        if kind not in FILTERS:
+            raise ValueError(f"Unknown filter: {kind} (expected one of {', '.join(FILTERS)})")
+        self.kind = kind
+        self.max_ahead = max_ahead
+        self.filter_kwargs = filter_kwargs
+        self.filters = {}
+        self._last_frame_id = None
+        self._measured_at = None
+        self._keys = []
+
+    def reset(self):
+        self.filters = {}
+        self._last_frame_id = None
+        self._keys = []
+
+    def track(self, result, measured_at, now):
+        if result is None:
+            self.reset()
+            return np.zeros((0, 21, 3), dtype=np.float32)
+
+        if result.frame_id != self._last_frame_id:
+            self._last_frame_id = result.frame_id
+            self._measured_at = measured_at
+            self._keys = self._hand_keys(result.handedness, len(result.landmarks))
+            for key in list(self.filters):
+                if key not in self._keys:
+                    del self.filters[key]
+            for key, hand in zip(self._keys, result.landmarks):
+                if key not in self.filters:
+                    self.filters[key] = FILTERS[self.kind](**self.filter_kwargs)
+                self.filters[key].update(hand, measured_at)
+
+        if not self._keys:
+            return np.zeros((0, 21, 3), dtype=np.float32)
+        t = min(now, self._measured_at + self.max_ahead)
+        return np.array([self.filters[key].predict(t) for key in self._keys], dtype=np.float32)
+
+    @staticmethod
+    def _hand_keys(handedness, count):
+        # Two hands with the same label (it happens) become "Right", "Right#1"
+        keys, seen = [], {}
+        for i in range(count):
+            label = handedness[i] if i < len(handedness) else "?"
+            n = seen.get(label, 0)
+            seen[label] = n + 1
+            keys.append(label if n == 0 else f"{label}#{n}")
+        return keys
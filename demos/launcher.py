@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+One entry point for every demo, with fast switching between them.
+
+Demo modules are only imported when they are started, so mediapipe is only
+loaded for the hand demos. Models (the face cascade, MediaPipe Hands) and the
+camera stay open when you switch to another demo, so switching back is warm:
+
+    python3 demos/launcher.py                  # list the demos
+    python3 demos/launcher.py fruit_ninja      # start one; press 1-9 to switch
+
+Each start prints how long it took from choosing the demo until it is live
+(first frame processed and, for hand demos, the first landmarks back) and
+whether models had to be loaded (cold) or were reused (warm). To measure both
+without a window:
+
+    python3 demos/launcher.py --startup-report face_detection fruit_ninja
+"""
+import argparse
+import inspect
+import time
+from benchmark import DEMOS, load_demo
+from frame_source import open_source
+from runner import run_demo
+from sinks import open_sink
+
+# The demos in the order they are listed; press 1-9 in the window to switch
+DEMO_NAMES = list(DEMOS)
+
+
+class _SharedHands:
+    """A hands service shared between demos: close() from a demo leaves it running."""
+
+    def __init__(self, hands):
+        self._hands = hands
+
+    def __getattr__(self, name):
+        return getattr(self._hands, name)
+
+    def close(self):
+        pass
+
+
+class ModelCache:
+    """
+    Keeps loaded models so the next demo that needs the same one gets it warm.
+
+    Hands services are keyed by their class and options, since each demo asks
+    for its own settings (e.g. max_num_hands=1).
+    """
+
+    def __init__(self):
+        self._cascade = None
+        self._hands = {}
+        self.loads = 0  # models loaded from scratch so far
+
+    def cascade(self):
+        if self._cascade is None:
+            import cv2
+
+            self._cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+            )
+            self.loads += 1
+        return self._cascade
+
+    def hands(self, service, options):
+        key = (service, tuple(sorted(options.items())))
+        if key not in self._hands:
+            self._hands[key] = service(**options)
+            self.loads += 1
+        else:
+            # The next demo numbers its frames from 1 again: results from the
+            # last one (newer by frame ID) would otherwise win over its own
+            self._hands[key].reset()
+        return _SharedHands(self._hands[key])
+
+    def close(self):
+        for hands in self._hands.values():
+            hands.close()
+        self._hands = {}
+        self._cascade = None
+
+
+def build_demo(name, cache):
+    """Imports and creates a demo, handing it cached models where it takes them."""
+    demo_class = load_demo(name)
+    parameters = inspect.signature(demo_class).parameters
+    kwargs = {}
+    if "face_cascade" in parameters:
+        kwargs["face_cascade"] = cache.cascade()
+    if "hands" in parameters and hasattr(demo_class, "HANDS_SERVICE"):
+        kwargs["hands"] = cache.hands(demo_class.HANDS_SERVICE, demo_class.HANDS_OPTIONS)
+    return demo_class(**kwargs)
+
+
+def start_demo(name, cache, source):
+    """Builds the demo and runs it until it is live; returns (demo, seconds, "cold"/"warm")."""
+    loads_before = cache.loads
+    start = time.perf_counter()
+    demo = build_demo(name, cache)
+    # Run frames until the demo is really live: for hand demos that means the
+    # first landmarks are back (which includes loading MediaPipe in a new worker),
+    # unless the demo starts in a state that doesn't look for hands
+    perception = getattr(demo, "perception", None)
+    deadline = start + 30.0
+    while time.perf_counter() < deadline:
+        ret, frame = source.read()
+        if not ret:
+            break
+        demo.process_frame(frame)
+        if perception is None or not perception.waiting:
+            break
+    seconds = time.perf_counter() - start
+    kind = "cold" if cache.loads > loads_before else "warm"
+    return demo, seconds, kind
+
+
+def print_demo_list():
+    print("Demos:")
+    for number, name in enumerate(DEMO_NAMES, start=1):
+        print(f"  {number}. {name}")
+
+
+def run_launcher(name):
+    cache = ModelCache()
+    source = open_source()
+    if not source.isOpened():
+        print("Error: Could not open video source.")
+        return
+    sink = open_sink(window_name="Uteach")
+    switch_to = []
+
+    def on_key(key):
+        # Digits switch demos; everything else goes to the demo
+        if ord('1') <= key <= ord('9') and key - ord('1') < len(DEMO_NAMES):
+            switch_to.append(DEMO_NAMES[key - ord('1')])
+            return False
+        return True
+
+    try:
+        while name is not None:
+            try:
+                demo, seconds, kind = start_demo(name, cache, source)
+            except (ImportError, RuntimeError) as error:
+                print(f"{name}: {error}")
+                break
+            print(f"{name}: live after {seconds:.2f} s ({kind})")
+            switch_to.clear()
+            run_demo(demo, source, sink, keep_open=True, on_key=on_key)
+            name = switch_to[0] if switch_to else None
+    finally:
+        cache.close()
+        source.release()
+        sink.close()
+
+
+def startup_report(names):
+    """Starts each demo cold (empty cache) and then warm, without a window."""
+    cache = ModelCache()
+    source = open_source("synthetic:1280x720", drop_frames=False)
+    try:
+        for name in names:
+            for _ in range(2):
+                try:
+                    demo, seconds, kind = start_demo(name, cache, source)
+                except (ImportError, RuntimeError) as error:
+                    print(f"{name}: {error}")
+                    break
+                demo.close()
+                print(f"{name:<20} {kind}: {seconds:.3f} s")
+    finally:
+        cache.close()
+        source.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("demo", nargs="?", help="demo to start")
+    parser.add_argument("--startup-report", nargs="+", metavar="DEMO", help="measure cold and warm startup")
+    args = parser.parse_args()
+
+    names = args.startup_report or ([args.demo] if args.demo else [])
+    unknown = [name for name in names if name not in DEMOS]
+    if unknown:
+        parser.error(f"unknown demo(s): {', '.join(unknown)}")
+
+    if args.startup_report:
+        startup_report(args.startup_report)
+    elif args.demo:
+        run_launcher(args.demo)
+    else:
+        print_demo_list()
+        print("\nStart one with: python3 demos/launcher.py <name>")
+
+
+# The guard is needed because the hands worker process re-imports this file
+if __name__ == "__main__":
+    main()
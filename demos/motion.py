@@ -0,0 +1,268 @@
+import itertools
+import cv2
+import numpy as np
+from profiling import profiler
+from frame_pool import FramePool
+
+
+class MotionDetector:
+    """
+    Finds moving areas by comparing each frame with a background model.
+
+    The frame is shrunk by `downscale` in each direction before any work is
+    done (4x = 16x fewer pixels), so blurring, differencing and thresholding
+    are cheap even on HD cameras. Boxes are mapped back to full resolution.
+
+    method="average" keeps a running average of past frames:
+        background = (1 - learning_rate) * background + learning_rate * frame
+    Anything that differs from it by more than `threshold` counts as motion, so
+    slow objects still show up (comparing with only the previous frame misses
+    them). method="mog2" uses OpenCV's Gaussian-mixture background subtractor
+    instead, which copes better with flicker but costs more.
+
+    The background is updated every `update_every` frames; a larger value is
+    cheaper and lets stationary things stay "moving" for longer.
+    """
+
+    def __init__(self, downscale=4, method="average", learning_rate=0.05,
+                 update_every=1, threshold=25, blur=5):
+        if method not in ("average", "mog2"):
+            raise ValueError(f"Unknown background method: {method}")
+        self.downscale = max(1, int(downscale))
+        self.method = method
+        self.learning_rate = learning_rate
+        self.update_every = max(1, int(update_every))
+        self.threshold = threshold
+        self.blur = blur
+        self.frames = 0
+        self.mask = None
+        self._background = None
+        self._mog2 = None
+        # The shrunk frame, the difference image and the mask reuse these buffers
+        self.buffers = FramePool()
+
+    def reset(self):
+        """Forgets the background; the next frame becomes the new one."""
+        self.frames = 0
+        self.mask = None
+        self._background = None
+        self._mog2 = None
+
+    def apply(self, frame):
+        """Updates the model with a BGR frame and returns the downscaled motion mask (0 or 255)."""
+        with profiler.span("motion mask"):
+            small = self._shrink(frame)
+            update = self.frames % self.update_every == 0
+            self.frames += 1
+
+            if self.method == "mog2":
+                if self._mog2 is None:
+                    self._mog2 = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+                rate = self.learning_rate if update else 0.0
+                self.mask = self._mog2.apply(small, learningRate=rate)
+                return self.mask
+
+            if self._background is None or self._background.shape != small.shape:
+                # The first frame is the background, so it has no motion yet
+                self._background = small.astype(np.float32)
+                self.mask = np.zeros_like(small)
+                return self.mask
+
+            background = self.buffers.like("background", small)
+            cv2.convertScaleAbs(self._background, dst=background)
+            diff = self.buffers.like("diff", small)
+            cv2.absdiff(small, background, dst=diff)
+            self.mask = self.buffers.like("mask", small)
+            cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self.mask)
+            if update:
+                cv2.accumulateWeighted(small, self._background, self.learning_rate)
+            return self.mask
+
+    def boxes(self, min_area=500, mask=None, merge_gap=0):
+        """Returns [x, y, w, h] boxes of the moving areas in full-resolution coordinates.
+
+        min_area is in full-resolution pixels. Boxes that overlap, or are closer
+        than merge_gap pixels, are merged into one.
+        """
+        if mask is None:
+            mask = self.mask
+        if mask is None:
+            return []
+        with profiler.span("motion regions"):
+            labels = self.buffers.get("labels", mask.shape, np.int32)
+            boxes = extract_regions(mask, min_area, scale=self.downscale, labels=labels)
+            if merge_gap > 0 and len(boxes) > 1:
+                boxes = merge_regions(boxes, merge_gap)
+        return boxes.tolist()
+
+    def full_mask(self, size):
+        """The last motion mask scaled up to `size` = (width, height)."""
+        return cv2.resize(self.mask, size, interpolation=cv2.INTER_NEAREST)
+
+    def _shrink(self, frame):
+        h, w = frame.shape[:2]
+        size = (max(1, w // self.downscale), max(1, h // self.downscale))
+        # INTER_LINEAR is much cheaper than INTER_AREA here, and the blur below
+        # smooths out the noise it lets through
+        small = self.buffers.get("small color", (size[1], size[0]) + frame.shape[2:])
+        cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_LINEAR)
+        # Reuse one buffer for the grayscale image instead of allocating every frame
+        gray = self.buffers.get("small", (size[1], size[0]))
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
+        if self.blur > 1:
+            cv2.GaussianBlur(gray, (self.blur, self.blur), 0, dst=gray)
+        return gray
+
+
+def extract_regions(mask, min_area=0, scale=1, labels=None):
+    """
+    Returns an (N, 4) int array of (x, y, w, h) boxes around the blobs in a 0/255 mask.
+
+    One connectedComponentsWithStats call labels every blob and measures its
+    box and pixel count, so there is no Python loop over contours. Boxes and
+    min_area are multiplied by `scale` (for masks computed on a shrunk frame).
+    `labels` is an optional int32 array the size of the mask to write the
+    label image into (it isn't needed afterwards, so it can be reused).
+    """
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask, labels=labels, connectivity=8)
+    stats = stats[1:]  # label 0 is the background
+    keep = stats[:, cv2.CC_STAT_AREA] * (scale * scale) >= min_area
+    return stats[keep, :4].astype(np.int32) * scale
+
+
+def merge_regions(boxes, gap=0):
+    """
+    Merges (x, y, w, h) boxes that overlap or are within `gap` pixels of each other.
+
+    Noisy masks split one moving person into many fragments; merging them gives
+    game logic a few big regions instead. Repeats until no two boxes touch, since
+    a merged box can reach boxes that neither part touched.
+    """
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    while len(boxes) > 1:
+        x1, y1 = boxes[:, 0] - gap, boxes[:, 1] - gap
+        x2, y2 = boxes[:, 0] + boxes[:, 2] + gap, boxes[:, 1] + boxes[:, 3] + gap
+        # touching[i, j] is True when box i (grown by gap) overlaps box j
+        touching = ((x1[:, None] <= x2[None, :]) & (x1[None, :] <= x2[:, None]) &
+                    (y1[:, None] <= y2[None, :]) & (y1[None, :] <= y2[:, None]))
+        if touching.sum() == len(boxes):  # only the diagonal: nothing to merge
+            break
+
+        # Give every group of touching boxes the same label
+        labels = np.arange(len(boxes))
+        while True:
+            merged = np.where(touching, labels[None, :], len(boxes)).min(axis=1)
+            if np.array_equal(merged, labels):
+                break
+            labels = merged[merged]
+
+        groups = np.unique(labels)
+        left = np.full(len(groups), np.iinfo(np.int32).max)
+        top = left.copy()
+        right = np.full(len(groups), np.iinfo(np.int32).min)
+        bottom = right.copy()
+        index = np.searchsorted(groups, labels)
+        np.minimum.at(left, index, boxes[:, 0])
+        np.minimum.at(top, index, boxes[:, 1])
+        np.maximum.at(right, index, boxes[:, 0] + boxes[:, 2])
+        np.maximum.at(bottom, index, boxes[:, 1] + boxes[:, 3])
+        boxes = np.stack([left, top, right - left, bottom - top], axis=1).astype(np.int32)
+    return boxes
+
+
+class Blob:
+    """One moving region followed across frames. `blob_id` stays the same while it is tracked."""
+
+    def __init__(self, blob_id, box):
+        self.blob_id = blob_id
+        self.box = tuple(box)
+        self.age = 1      # frames since it first appeared
+        self.missed = 0   # frames in a row it was not seen
+
+    def rect(self):
+        x, y, w, h = self.box
+        return int(x), int(y), int(w), int(h)
+
+    def center(self):
+        x, y, w, h = self.box
+        return x + w / 2, y + h / 2
+
+
+class BlobTracker:
+    """
+    Gives motion regions IDs that persist from frame to frame.
+
+    Each new box is matched to the existing blob it overlaps most (IoU of at
+    least min_iou), or failing that the blob whose center is within
+    max_distance pixels. Blobs not seen for more than max_missed frames are
+    dropped, so a region that flickers off for a frame keeps its ID.
+    """
+
+    def __init__(self, min_iou=0.1, max_distance=80, max_missed=5):
+        self.min_iou = min_iou
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.blobs = []
+        self._ids = itertools.count(1)
+
+    def update(self, boxes):
+        """Takes this frame's (x, y, w, h) boxes and returns the blobs seen in it."""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        old = np.array([blob.box for blob in self.blobs], dtype=np.float32).reshape(-1, 4)
+        score = _match_scores(old, boxes, self.min_iou, self.max_distance)
+
+        # Greedily take the best remaining (blob, box) pair until none are left
+        matched_blobs, matched_boxes = set(), set()
+        seen = []
+        for flat in np.argsort(score, axis=None)[::-1]:
+            i, j = divmod(int(flat), score.shape[1])
+            if score[i, j] <= 0:
+                break
+            if i in matched_blobs or j in matched_boxes:
+                continue
+            matched_blobs.add(i)
+            matched_boxes.add(j)
+            blob = self.blobs[i]
+            blob.box = tuple(int(v) for v in boxes[j])
+            blob.age += 1
+            blob.missed = 0
+            seen.append(blob)
+
+        # Boxes nobody claimed are new blobs
+        for j in range(len(boxes)):
+            if j not in matched_boxes:
+                seen.append(Blob(next(self._ids), (int(v) for v in boxes[j])))
+
+        # Blobs missing this frame are kept for a while in case they come back
+        lost = []
+        for i, blob in enumerate(self.blobs):
+            if i not in matched_blobs:
+                blob.missed += 1
+                if blob.missed <= self.max_missed:
+                    lost.append(blob)
+        self.blobs = seen + lost
+        return sorted(seen, key=lambda blob: blob.blob_id)
+
+    def reset(self):
+        self.blobs = []
+
+
+def _match_scores(old, new, min_iou, max_distance):
+    """
+    Scores every (old blob, new box) pair: IoU plus 1 when it is at least min_iou,
+    otherwise how close the centers are (0..1), otherwise 0 (no match).
+    """
+    if len(old) == 0 or len(new) == 0:
+        return np.zeros((len(old), len(new)), dtype=np.float32)
+    ox1, oy1 = old[:, 0, None], old[:, 1, None]
+    ox2, oy2 = ox1 + old[:, 2, None], oy1 + old[:, 3, None]
+    nx1, ny1 = new[None, :, 0], new[None, :, 1]
+    nx2, ny2 = nx1 + new[None, :, 2], ny1 + new[None, :, 3]
+    inter = (np.clip(np.minimum(ox2, nx2) - np.maximum(ox1, nx1), 0, None) *
+             np.clip(np.minimum(oy2, ny2) - np.maximum(oy1, ny1), 0, None))
+    union = old[:, 2, None] * old[:, 3, None] + new[None, :, 2] * new[None, :, 3] - inter
+    iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+    distance = np.hypot((ox1 + ox2) / 2 - (nx1 + nx2) / 2, (oy1 + oy2) / 2 - (ny1 + ny2) / 2)
+    closeness = np.clip(1 - distance / max_distance, 0, None)
+    return np.where(iou >= min_iou, 1 + iou, closeness)
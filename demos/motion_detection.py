@@ -1,51 +1,48 @@
 import cv2
+from runner import run_demo
+from motion import MotionDetector, BlobTracker
 
-# Open the default webcam
-cap = cv2.VideoCapture(0)
-
-# Read the first frame and preprocess it
-ret, prev_frame = cap.read()
-prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-prev_gray = cv2.GaussianBlur(prev_gray, (21, 21), 0)
-
-while True:
-    # Read a new frame from the webcam
-    ret, frame = cap.read()
-    if not ret:
-        break
-    # Convert to grayscale and blur to reduce noise
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (21, 21), 0)
-
-    # Compute the absolute difference between current and previous frame
-    diff = cv2.absdiff(prev_gray, gray)
-
-    # Threshold the difference to get binary image of motion areas
-    _, thresh = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
-
-    # Find contours of the motion areas
-    contours, _= cv2.findContours(
-        thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-    )
-
-    for contour in contours:
-        # Ignore small contours to reduce noise
-        if cv2.contourArea(contour) < 500:
-            continue
-
-        # Draw a rectangle around detected motion
-        x, y, w, h = cv2.boundingRect(contour)
-        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
-
-    # Show the frame with motion rectangles
-    cv2.imshow("Motion Detection", frame)
-    
-    # Update previous frame
-    prev_gray = gray
-    # Exit loop if 'q' is pressed
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-# Release webcam and close all OpenCV windows
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+
+class MotionDetectionDemo:
+    WINDOW_NAME = "Motion Detection"
+
+    def __init__(self):
+        # Compare each frame with a slowly updated background, on a copy of the
+        # frame shrunk 4x in each direction (16x fewer pixels to process).
+        # Pixels that differ from the background by more than 25 count as motion.
+        self.motion = MotionDetector(downscale=4, threshold=25)
+
+        # Gives each moving area a number that stays the same while it moves
+        self.blobs = BlobTracker()
+
+    def process_frame(self, frame):
+        # Update the background model and get the motion mask
+        self.motion.apply(frame)
+
+        # Find the moving areas, ignoring small ones (under 500 pixels) to reduce
+        # noise and joining pieces less than 20 pixels apart into one box
+        boxes = self.motion.boxes(min_area=500, merge_gap=20)
+
+        # Draw a rectangle and its ID around each moving area
+        for blob in self.blobs.update(boxes):
+            x, y, w, h = blob.rect()
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
+            cv2.putText(frame, f"#{blob.blob_id}", (x, y - 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+        return frame
+
+    def handle_key(self, key):
+        return True
+
+    def close(self):
+        pass
+
+
+def main():
+    # Read from the default webcam (or the source in UTEACH_SOURCE),
+    # show the frame with motion rectangles, exit if 'q' is pressed
+    run_demo(MotionDetectionDemo())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,63 @@
 import cv2
-import numpy as np
-
-cap = cv2.VideoCapture(0)
-
-# Let camera warm up
-for _ in range(10):
-    ret, frame = cap.read()
-
-ret, prev_frame = cap.read()
-prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-prev_gray = cv2.GaussianBlur(prev_gray, (21, 21), 0)
-
-canvas = np.zeros_like(prev_frame)
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (21, 21), 0)
-
-    # Compute absolute difference
-    diff = cv2.absdiff(prev_gray, gray)
-
-    # Increase threshold to reduce noise
-    _, thresh = cv2.threshold(diff, 40, 255, cv2.THRESH_BINARY)
+from frame_source import open_source
+from runner import run_demo
+from motion import MotionDetector
+from paint_canvas import PaintCanvas
+from frame_pool import FramePool
+
+
+class MotionPaintDemo:
+    WINDOW_NAME = "Motion Paint"
+
+    def __init__(self):
+        # Motion is found against a background model on a 4x smaller frame;
+        # a higher threshold (40) reduces noise
+        self.motion = MotionDetector(downscale=4, threshold=40)
+        self.canvas = None
+        # The cleaned-up mask goes into the same buffer every frame
+        self.buffers = FramePool()
+
+    def process_frame(self, frame):
+        mask = self.motion.apply(frame)
+
+        # The first frame starts an empty canvas to paint on.
+        # It remembers which 32x32 tiles have paint, so only those get blended.
+        if self.canvas is None:
+            h, w = frame.shape[:2]
+            self.canvas = PaintCanvas(w, h, frame_weight=0.8, canvas_weight=0.2)
+            return frame
+
+        # Clean small noise
+        clean = self.buffers.like("clean mask", mask)
+        cv2.erode(mask, None, dst=clean, iterations=1)
+        mask = cv2.dilate(clean, None, dst=clean, iterations=2)
+
+        # Pieces closer than 20 pixels are painted as one box
+        for (x, y, w, h) in self.motion.boxes(min_area=2000, mask=mask, merge_gap=20):  # Increase minimum area
+            # Draw only outline instead of filled box
+            self.canvas.rectangle((x, y), (x + w, y + h), (0, 255, 0), 3)
 
-    # Clean small noise
-    thresh = cv2.erode(thresh, None, iterations=1)
-    thresh = cv2.dilate(thresh, None, iterations=2)
+        # Blend the painted pixels into the frame (80% frame, 20% paint)
+        return self.canvas.compose(frame)
 
-    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    def handle_key(self, key):
+        if key == ord('c') and self.canvas is not None:
+            self.canvas.clear()
+        return True
 
-    for contour in contours:
-        if cv2.contourArea(contour) > 2000:  # Increase minimum area
-            x, y, w, h = cv2.boundingRect(contour)
+    def close(self):
+        pass
 
-            # Draw only outline instead of filled box
-            cv2.rectangle(canvas, (x, y), (x + w, y + h), (0, 255, 0), 3)
 
-    combined = cv2.addWeighted(frame, 0.8, canvas, 0.2, 0)
+def main():
+    cap = open_source()
 
-    cv2.imshow("Motion Paint", combined)
+    # Let camera warm up
+    for _ in range(10):
+        ret, frame = cap.read()
 
-    prev_gray = gray
+    run_demo(MotionPaintDemo(), source=cap)
 
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('c'):
-        canvas = np.zeros_like(frame)
-    elif key == ord('q'):
-        break
 
-cap.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
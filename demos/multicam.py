@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Classroom mode: one demo pipeline per camera, each in its own process.
+
+Every stream (camera index, video file or synthetic pattern) gets a worker
+process pinned to its own CPU core. The worker loads its own model, runs the
+demo and writes a shrunk copy of each output frame into shared memory; the
+parent shows all streams tiled in one window with each stream's FPS.
+
+    python3 demos/multicam.py 0 1 2                          # face_detection on webcams 0-2
+    python3 demos/multicam.py --demo ar_sunglasses 0 1
+    python3 demos/multicam.py hand_tracking@0 face_detection@clip.mp4
+    python3 demos/multicam.py synthetic synthetic --headless --seconds 10
+
+Press 'q' in the window to stop every stream.
+"""
+import argparse
+import math
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+# Demos that can run as a stream
+STREAM_DEMOS = ["face_detection", "ar_sunglasses", "hand_tracking"]
+
+
+def pin_to_core(core):
+    """Pins this process to one CPU core where the OS allows it (Linux); returns True on success."""
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, {core})
+        return True
+    except OSError:
+        return False
+
+
+def build_stream_demo(name):
+    from benchmark import load_demo
+
+    if name == "hand_tracking":
+        # The stream already has its own process, so MediaPipe runs right here
+        # instead of starting yet another worker
+        from hand_service import LocalHands
+
+        return load_demo(name)(hands=LocalHands())
+    return load_demo(name)()
+
+
+def _stream_worker(index, demo_name, source_spec, core, shm_name, tile_size, lock, stop, stats):
+    """Runs in each stream's process: read, process, shrink into shared memory, report FPS."""
+    pinned = pin_to_core(core)
+    from frame_source import open_source
+
+    width, height = tile_size
+    block = shared_memory.SharedMemory(name=shm_name)
+    tile = np.ndarray((height, width, 3), dtype=np.uint8, buffer=block.buf)
+    try:
+        demo = build_stream_demo(demo_name)
+    except (ImportError, RuntimeError) as error:
+        stats.put((index, "error", str(error)))
+        block.close()
+        return
+
+    source = open_source(source_spec)
+    if not source.isOpened():
+        stats.put((index, "error", f"could not open {source_spec}"))
+        demo.close()
+        block.close()
+        return
+    stats.put((index, "started", core if pinned else None))
+
+    frames, window_start = 0, time.perf_counter()
+    try:
+        while not stop.is_set():
+            # The timeout keeps `stop` checked while a camera is slow to
+            # deliver (some USB cameras take seconds to send their first frame)
+            ret, frame = source.read(timeout=1.0)
+            if not ret:
+                if source.ended:
+                    break
+                continue
+            frame = demo.process_frame(frame)
+            with lock:
+                cv2.resize(frame, tile_size, dst=tile, interpolation=cv2.INTER_AREA)
+            frames += 1
+            elapsed = time.perf_counter() - window_start
+            if elapsed >= 1.0:
+                stats.put((index, "fps", frames / elapsed))
+                frames, window_start = 0, time.perf_counter()
+    finally:
+        stats.put((index, "stopped", None))
+        demo.close()
+        source.release()
+        block.close()
+
+
+class MultiStreamRunner:
+    """
+    Starts one worker process per (demo name, source) stream and collects their output.
+
+    tile_size: (width, height) each stream is shown at in the tiled window.
+    """
+
+    def __init__(self, streams, tile_size=(640, 360)):
+        self.streams = streams
+        self.tile_size = tile_size
+        self.fps = [0.0] * len(streams)
+        self.status = ["starting"] * len(streams)
+        self.cores = [None] * len(streams)
+        self.fps_history = [[] for _ in streams]
+        self._blocks = []
+        self._tiles = []
+        self._locks = []
+        self._processes = []
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self._stop = ctx.Event()
+        self._stats = ctx.Queue()
+        width, height = self.tile_size
+        cores = os.cpu_count() or 1
+        for index, (demo_name, source_spec) in enumerate(self.streams):
+            block = shared_memory.SharedMemory(create=True, size=width * height * 3)
+            tile = np.ndarray((height, width, 3), dtype=np.uint8, buffer=block.buf)
+            tile[:] = 0
+            lock = ctx.Lock()
+            process = ctx.Process(
+                target=_stream_worker,
+                args=(index, demo_name, source_spec, index % cores, block.name,
+                      self.tile_size, lock, self._stop, self._stats),
+                daemon=True,
+            )
+            process.start()
+            self._blocks.append(block)
+            self._tiles.append(tile)
+            self._locks.append(lock)
+            self._processes.append(process)
+
+    def poll(self):
+        """Picks up FPS and status messages from the workers."""
+        while True:
+            try:
+                index, kind, value = self._stats.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "fps":
+                self.fps[index] = value
+                self.fps_history[index].append(value)
+            elif kind == "started":
+                self.status[index] = "running"
+                self.cores[index] = value
+            elif kind == "error":
+                self.status[index] = value
+                print(f"Stream {index}: {value}")
+            elif kind == "stopped":
+                self.status[index] = "stopped"
+
+    def running(self):
+        return any(status in ("starting", "running") for status in self.status)
+
+    def mosaic(self):
+        """All stream tiles in one image, with each stream's name and FPS."""
+        width, height = self.tile_size
+        count = len(self.streams)
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+        canvas = np.zeros((rows * height, cols * width, 3), dtype=np.uint8)
+        for index, (demo_name, source_spec) in enumerate(self.streams):
+            r, c = divmod(index, cols)
+            cell = canvas[r * height:(r + 1) * height, c * width:(c + 1) * width]
+            with self._locks[index]:
+                cell[:] = self._tiles[index]
+            label = f"{demo_name} @ {source_spec}: {self.fps[index]:.1f} FPS"
+            if self.status[index] != "running":
+                label += f" ({self.status[index]})"
+            cv2.putText(cell, label, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        return canvas
+
+    def stop(self):
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=3.0)
+            if process.is_alive():
+                process.terminate()
+        self.poll()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def summary(self):
+        lines = []
+        for index, (demo_name, source_spec) in enumerate(self.streams):
+            history = self.fps_history[index]
+            average = sum(history) / len(history) if history else 0.0
+            core = self.cores[index]
+            pinned = f"core {core}" if core is not None else "not pinned"
+            lines.append(f"stream {index} {demo_name} @ {source_spec} ({pinned}): {average:.1f} FPS")
+        total = sum(sum(h) / len(h) for h in self.fps_history if h)
+        lines.append(f"total: {total:.1f} FPS across {len(self.streams)} streams")
+        return "\n".join(lines)
+
+
+def parse_stream(spec, default_demo):
+    """ "1" -> (default_demo, "1"); "hand_tracking@1" -> ("hand_tracking", "1") """
+    if "@" in spec:
+        demo_name, source_spec = spec.split("@", 1)
+    else:
+        demo_name, source_spec = default_demo, spec
+    return demo_name, source_spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("streams", nargs="+", help="camera index, video file or synthetic, optionally as demo@source")
+    parser.add_argument("--demo", default="face_detection", help=f"demo for streams without one: {', '.join(STREAM_DEMOS)}")
+    parser.add_argument("--tile", default="640x360", help="size of each stream in the window (default 640x360)")
+    parser.add_argument("--headless", action="store_true", help="no window; print FPS while running")
+    parser.add_argument("--seconds", type=float, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    streams = [parse_stream(spec, args.demo) for spec in args.streams]
+    unknown = sorted({name for name, _ in streams if name not in STREAM_DEMOS})
+    if unknown:
+        parser.error(f"unknown stream demo(s): {', '.join(unknown)}")
+    tile_size = tuple(int(v) for v in args.tile.lower().split("x"))
+
+    runner = MultiStreamRunner(streams, tile_size)
+    runner.start()
+    start = time.monotonic()
+    last_print = start
+    try:
+        while runner.running():
+            runner.poll()
+            if args.seconds is not None and time.monotonic() - start >= args.seconds:
+                break
+            if args.headless:
+                time.sleep(0.05)
+                if time.monotonic() - last_print >= 1.0:
+                    last_print = time.monotonic()
+                    print("  ".join(f"[{i}] {fps:.1f}" for i, fps in enumerate(runner.fps)))
+                continue
+            cv2.imshow("Uteach Classroom", runner.mosaic())
+            if cv2.waitKey(30) & 0xFF == ord('q'):
+                break
+    finally:
+        runner.stop()
+        if not args.headless:
+            cv2.destroyAllWindows()
+    print(runner.summary())
+
+
+# The guard is needed because every stream's worker process re-imports this file
+if __name__ == "__main__":
+    main()
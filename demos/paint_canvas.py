@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+from profiling import profiler
+
+
+class PaintCanvas:
+    """
+    A layer to paint on that is blended over the video frame.
+
+    The canvas is split into tiles (32x32 px by default). Drawing marks the
+    tiles it touches as dirty, and compose() blends only those tiles into the
+    frame, and only the painted pixels inside them:
+
+        frame = frame_weight * frame + canvas_weight * canvas   (painted pixels)
+
+    Unpainted pixels are left alone, so an empty canvas costs nothing, and
+    clear() only wipes the dirty tiles instead of allocating a new image.
+    """
+
+    def __init__(self, width, height, tile=32, frame_weight=0.8, canvas_weight=0.2):
+        self.width = width
+        self.height = height
+        self.tile = tile
+        self.frame_weight = frame_weight
+        self.canvas_weight = canvas_weight
+        self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        self.painted = np.zeros((height, width), dtype=np.uint8)
+        self.dirty = np.zeros((-(-height // tile), -(-width // tile)), dtype=bool)
+        # Scratch space for blending, reused every frame
+        self._blend = np.empty_like(self.image)
+
+    def rectangle(self, pt1, pt2, color, thickness=1):
+        """Draws a rectangle on the canvas (same arguments as cv2.rectangle)."""
+        cv2.rectangle(self.image, pt1, pt2, color, thickness)
+        cv2.rectangle(self.painted, pt1, pt2, 255, thickness)
+        pad = max(thickness, 1)
+        self.mark_dirty(min(pt1[0], pt2[0]) - pad, min(pt1[1], pt2[1]) - pad,
+                        max(pt1[0], pt2[0]) + pad, max(pt1[1], pt2[1]) + pad)
+
+    def mark_dirty(self, x1, y1, x2, y2):
+        """Marks the tiles covering the pixel box (x1, y1)-(x2, y2) as painted."""
+        t = self.tile
+        tx1, ty1 = max(int(x1) // t, 0), max(int(y1) // t, 0)
+        tx2, ty2 = min(int(x2) // t + 1, self.dirty.shape[1]), min(int(y2) // t + 1, self.dirty.shape[0])
+        if tx1 < tx2 and ty1 < ty2:
+            self.dirty[ty1:ty2, tx1:tx2] = True
+
+    def compose(self, frame):
+        """Blends the painted parts of the canvas into `frame` in place and returns it."""
+        with profiler.span("canvas compose"):
+            for y1, y2, x1, x2 in self._dirty_runs():
+                src = frame[y1:y2, x1:x2]
+                blend = self._blend[y1:y2, x1:x2]
+                cv2.addWeighted(src, self.frame_weight, self.image[y1:y2, x1:x2],
+                                self.canvas_weight, 0, dst=blend)
+                cv2.copyTo(blend, self.painted[y1:y2, x1:x2], src)
+        return frame
+
+    def clear(self):
+        """Wipes the canvas without allocating anything."""
+        for y1, y2, x1, x2 in self._dirty_runs():
+            self.image[y1:y2, x1:x2] = 0
+            self.painted[y1:y2, x1:x2] = 0
+        self.dirty[:] = False
+
+    def dirty_fraction(self):
+        """How much of the canvas is in dirty tiles (0..1)."""
+        return float(self.dirty.mean())
+
+    def _dirty_runs(self):
+        # Each row of tiles becomes one (y1, y2, x1, x2) pixel box from its first
+        # to its last dirty tile, and rows with the same span are joined into one
+        # band. A few large blend calls are much cheaper than many tiny ones.
+        t = self.tile
+        rows = np.flatnonzero(self.dirty.any(axis=1))
+        if len(rows) == 0:
+            return
+        first = self.dirty[rows].argmax(axis=1)
+        last = self.dirty.shape[1] - self.dirty[rows, ::-1].argmax(axis=1)
+        start = 0
+        for i in range(1, len(rows) + 1):
+            if (i < len(rows) and rows[i] == rows[i - 1] + 1
+                    and first[i] == first[start] and last[i] == last[start]):
+                continue
+            y1, y2 = rows[start] * t, min((rows[i - 1] + 1) * t, self.height)
+            yield y1, y2, first[start] * t, min(last[start] * t, self.width)
+            start = i
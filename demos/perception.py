@@ -0,0 +1,109 @@
+import time
+import numpy as np
+
+# -------------------------------
+# What a game state needs to know about hands:
+#   NONE      nothing: no inference at all (title screens, results, game over)
+#   PRESENCE  whether a hand is in view: inference a few times per second
+#   FULL      landmarks on every frame (while the player's hand is the controller)
+# -------------------------------
+NONE = "none"
+PRESENCE = "presence"
+FULL = "full"
+
+
+class PerceptionScheduler:
+    """
+    Runs hand inference only as often as the current game state needs it.
+
+    Each frame, call step(frame, need, now) with the need of the state the game
+    is in (now is the game's clock, which keeps replays exact); it submits the
+    frame to the hands service (HandInferenceService, LocalHands or a replay's
+    RecordedHands) when that need calls for it and returns the HandResult to
+    use, or None. Results from before a stretch without inference are never
+    returned, so a game coming back from a pause doesn't act on where the hand
+    was before it.
+
+    full_every=2 or 3 runs FULL inference only on every 2nd or 3rd frame. Pass a
+    landmark_filter.LandmarkSmoother as `smoother` to get smoothed landmarks,
+    predicted for the current frame, in `landmarks` after every step().
+    """
+
+    def __init__(self, hands, presence_hz=4.0, full_every=1, smoother=None):
+        self.hands = hands
+        self.presence_hz = presence_hz
+        self.full_every = full_every
+        self.smoother = smoother
+        self.landmarks = np.zeros((0, 21, 3), dtype=np.float32)
+        self.need = NONE
+        self.frame_id = 0
+        self.frames_run = 0
+        self.frames_skipped = 0
+        self._last_run = None
+        self._last_run_id = 0
+        self._fresh_from = None  # oldest frame ID whose result may still be used
+        self._submitted_at = {}  # frame ID -> time, for frames still waiting for a result
+
+    def step(self, frame, need=FULL, now=None):
+        """Runs inference on this frame if `need` calls for it; returns the HandResult to use."""
+        if now is None:
+            now = time.monotonic()
+        self.frame_id += 1
+        self.need = need
+        result = self._run(frame, need, now)
+        if result is not None and result.measured_at is None:
+            # Stamp the result with when its frame was captured (replays bring their own)
+            result = result._replace(measured_at=self._submitted_at.get(result.frame_id, now))
+        if self.smoother is not None:
+            self.landmarks = self.smoother.track(result, None if result is None else result.measured_at, now)
+        return result
+
+    def _run(self, frame, need, now):
+        if need == NONE:
+            self.frames_skipped += 1
+            self._last_run = None
+            self._fresh_from = None
+            self._submitted_at.clear()
+            return None
+
+        due = self._last_run is None
+        if need == PRESENCE and not due:
+            due = now - self._last_run >= 1.0 / self.presence_hz
+        elif need == FULL and not due:
+            due = self.frame_id - self._last_run_id >= self.full_every
+        if not due:
+            # Not due yet: keep using the last result
+            self.frames_skipped += 1
+            return self._fresh(self.hands.result())
+
+        if self._fresh_from is None:
+            self._fresh_from = self.frame_id
+        if not self.hands.submit(frame, self.frame_id):
+            # The worker is still loading or every slot is busy: try again next frame
+            self.frames_skipped += 1
+            return self._fresh(self.hands.result())
+
+        # A worker process hands back the result of the frame submitted before
+        # this one (see HandInferenceService), so wait for that one, not this
+        # one; LocalHands and replays return this frame's result right away
+        previous = None if self._last_run is None else self._last_run_id
+        self._last_run = now
+        self._last_run_id = self.frame_id
+        self.frames_run += 1
+        self._submitted_at[self.frame_id] = now
+        result = self._fresh(self.hands.result(min_frame_id=previous))
+        if result is not None:
+            # Older frames will never be needed again
+            for frame_id in [f for f in self._submitted_at if f < result.frame_id]:
+                del self._submitted_at[frame_id]
+        return result
+
+    @property
+    def waiting(self):
+        """True while inference is wanted but no result from it has arrived yet."""
+        return self._fresh_from is not None and self._fresh(self.hands.latest) is None
+
+    def _fresh(self, result):
+        if result is None or self._fresh_from is None or result.frame_id < self._fresh_from:
+            return None
+        return result
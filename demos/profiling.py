@@ -0,0 +1,158 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+import cv2
+
+# UTEACH_PROFILE=1 turns timing on from the start (the 't' or 'T' key toggles it in any demo).
+# UTEACH_TRACE=trace.json (or .csv) writes every recorded span to a file on exit;
+# open .json files in chrome://tracing or https://ui.perfetto.dev
+PROFILE_ENV = "UTEACH_PROFILE"
+TRACE_ENV = "UTEACH_TRACE"
+
+
+class _NullSpan:
+    """What span() returns while profiling is off: entering and leaving it does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Profiler:
+    """
+    Times named stages of the frame loop.
+
+        with profiler.span("detectMultiScale"):
+            faces = cascade.detectMultiScale(gray)
+
+    While disabled, span() hands back a shared do-nothing object, so leaving the
+    calls in the code costs next to nothing. While enabled it keeps:
+      - a rolling per-stage average over the last `window` frames (for the HUD)
+      - up to `max_events` raw spans for export as a Chrome trace or CSV
+    """
+
+    def __init__(self, enabled=False, window=60, max_events=200_000):
+        self.enabled = enabled
+        self.window = window
+        self.events = deque(maxlen=max_events)
+        self.frame_times = deque(maxlen=window)
+        self.stage_history = deque(maxlen=window)
+        self._current = {}
+        self._frame_start = None
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, end):
+        duration = end - start
+        with self._lock:
+            self._current[name] = self._current.get(name, 0.0) + duration
+            self.events.append((name, start, duration, threading.get_ident()))
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        self.frame_times.append(time.perf_counter() - self._frame_start)
+        with self._lock:
+            self.stage_history.append(self._current)
+            self._current = {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_times.clear()
+        self.stage_history.clear()
+        self._current = {}
+        self._frame_start = None
+
+    def fps(self):
+        if not self.frame_times:
+            return 0.0
+        return len(self.frame_times) / sum(self.frame_times)
+
+    def stage_averages(self):
+        """Average milliseconds per frame for each stage, slowest first."""
+        frames = len(self.stage_history)
+        if frames == 0:
+            return []
+        totals = {}
+        for stages in self.stage_history:
+            for name, seconds in stages.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        averages = [(name, total * 1000 / frames) for name, total in totals.items()]
+        return sorted(averages, key=lambda item: item[1], reverse=True)
+
+    def draw_hud(self, frame, x=10, y=110):
+        """Draws the rolling FPS and stage breakdown onto the frame (only while enabled)."""
+        if not self.enabled:
+            return
+        lines = [f"FPS: {self.fps():.1f}"]
+        lines += [f"{name}: {ms:.1f} ms" for name, ms in self.stage_averages()]
+        height = 22 * len(lines) + 10
+        cv2.rectangle(frame, (x, y), (x + 300, y + height), (0, 0, 0), -1)
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (x + 8, y + 24 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 255, 255), 1)
+
+    def export_chrome_trace(self, path):
+        """Writes the recorded spans in Chrome trace-event format."""
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": tid,
+            }
+            for name, start, duration, tid in list(self.events)
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_csv(self, path):
+        """Writes the recorded spans as CSV: stage, start_ms, duration_ms, thread."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "start_ms", "duration_ms", "thread"])
+            for name, start, duration, tid in list(self.events):
+                writer.writerow([name, f"{(start - self._origin) * 1000:.3f}", f"{duration * 1000:.3f}", tid])
+
+    def export(self, path):
+        """Exports to CSV if the path ends in .csv, otherwise to a Chrome trace."""
+        if path.lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_chrome_trace(path)
+
+
+# The profiler shared by all demos and helpers
+profiler = Profiler(enabled=os.environ.get(PROFILE_ENV, "") not in ("", "0"))
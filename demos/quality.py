@@ -0,0 +1,148 @@
+import os
+import cv2
+
+# Environment variable with the frame rate every demo tries to hold, e.g.
+#   UTEACH_TARGET_FPS=15 python3 demos/ar_sunglasses.py
+#   UTEACH_TARGET_FPS=on python3 demos/ar_sunglasses.py   (DEFAULT_TARGET_FPS)
+# Without it the quality controller is off and demos always run at full quality.
+TARGET_FPS_ENV = "UTEACH_TARGET_FPS"
+DEFAULT_TARGET_FPS = 20
+
+# -------------------------------
+# Quality levels, best first. Level 0 matches the settings the demos were
+# written with; each level after it is cheaper:
+#   resolution:       size of the image the face detector searches, relative
+#                     to its normal size (smaller = faster, misses small faces)
+#   scale_step:       the cascade's scaleFactor (bigger steps try fewer face sizes)
+#   detect_every:     frames between full face detections (tracked in between)
+#   model_complexity: MediaPipe Hands model (1 = full, 0 = lite)
+# -------------------------------
+QUALITY_LEVELS = [
+    dict(name="high", resolution=1.0, scale_step=1.1, detect_every=10, model_complexity=1),
+    dict(name="medium", resolution=0.8, scale_step=1.15, detect_every=15, model_complexity=1),
+    dict(name="low", resolution=0.8, scale_step=1.2, detect_every=20, model_complexity=0),
+    dict(name="lowest", resolution=0.6, scale_step=1.3, detect_every=30, model_complexity=0),
+]
+
+
+def target_fps_from_env():
+    """The target from UTEACH_TARGET_FPS ("on" = 20); None when it isn't set or is switched off."""
+    value = os.environ.get(TARGET_FPS_ENV, "").strip().lower()
+    if value in ("", "0", "off"):
+        return None
+    if value == "on":
+        return DEFAULT_TARGET_FPS
+    try:
+        fps = float(value)
+    except ValueError:
+        print(f"Warning: ignoring {TARGET_FPS_ENV}={value!r} (expected a number or on/off)")
+        return None
+    return fps if fps > 0 else None
+
+
+class QualityController:
+    """
+    Holds a target frame rate by trading detection quality for speed.
+
+    Call update(seconds) with how long each frame took to process. Every
+    `window` frames the average is compared with the budget (1 / target_fps):
+        slower than the budget               -> one level cheaper
+        faster than `headroom` x the budget  -> one level better
+    The gap between the two is the hysteresis: a level that only just fits is
+    kept. After every change one window is skipped while the change settles
+    (e.g. MediaPipe loading another model), and each time a better level turns
+    out to be too slow again, it waits twice as long before trying it again.
+    """
+
+    def __init__(self, target_fps=DEFAULT_TARGET_FPS, levels=QUALITY_LEVELS,
+                 window=30, headroom=0.6, max_patience=32):
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps
+        self.levels = levels
+        self.window = window
+        self.headroom = headroom
+        self.max_patience = max_patience
+        self.level = 0
+        self.changes = []  # (old level, new level, average seconds per frame)
+
+        self._total = 0.0
+        self._count = 0
+        self._skip = window  # the first frames include loading models
+        self._patience = 2   # fast windows in a row needed before going up
+        self._fast_windows = 0
+        self._just_upgraded = False
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def update(self, frame_seconds):
+        """Adds one frame's processing time; returns True if the level changed."""
+        if self._skip > 0:
+            self._skip -= 1
+            return False
+        self._total += frame_seconds
+        self._count += 1
+        if self._count < self.window:
+            return False
+
+        average = self._total / self._count
+        self._total, self._count = 0.0, 0
+        if average > self.budget:
+            if self._just_upgraded:
+                # The better level was too slow after all: back off before retrying
+                self._patience = min(self._patience * 2, self.max_patience)
+            self._just_upgraded = False
+            self._fast_windows = 0
+            if self.level < len(self.levels) - 1:
+                return self._change(self.level + 1, average)
+            return False
+
+        self._just_upgraded = False
+        if average < self.budget * self.headroom and self.level > 0:
+            self._fast_windows += 1
+            if self._fast_windows >= self._patience:
+                self._fast_windows = 0
+                self._just_upgraded = True
+                return self._change(self.level - 1, average)
+        else:
+            self._fast_windows = 0
+        return False
+
+    def _change(self, level, average):
+        old = self.level
+        self.level = level
+        self.changes.append((old, level, average))
+        self._skip = self.window
+        s = self.settings
+        print(f"Quality: {self.levels[old]['name']} -> {s['name']} "
+              f"({average * 1000:.0f} ms per frame, budget {self.budget * 1000:.0f} ms): "
+              f"detection at {s['resolution']:.0%}, scaleFactor {s['scale_step']}, "
+              f"detect every {s['detect_every']} frames, model_complexity {s['model_complexity']}")
+        return True
+
+    def draw_hud(self, frame):
+        """Shows the current level in the top-right corner."""
+        text = f"Quality: {self.settings['name']} ({self.target_fps:g} FPS target)"
+        color = (0, 255, 0) if self.level == 0 else (0, 200, 255)
+        (w, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.putText(frame, text, (frame.shape[1] - w - 10, 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+
+# -------------------------------
+# Applying a level to the parts the demos are built from
+# -------------------------------
+
+def apply_face_quality(detector, tracker, settings):
+    """Sets a CascadeDetector's resolution and scale step and a FaceTracker's detection interval."""
+    detector.resolution = settings["resolution"]
+    detector.scale_factor = settings["scale_step"]
+    tracker.detect_every = settings["detect_every"]
+
+
+def apply_hands_quality(hands, settings):
+    """Switches the MediaPipe Hands model; hands without set_options (e.g. a replay) are left alone."""
+    set_options = getattr(hands, "set_options", None)
+    if set_options is not None:
+        set_options(model_complexity=settings["model_complexity"])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Replays a recorded session through a demo.
+
+Record a session by running any demo with UTEACH_RECORD set:
+
+    UTEACH_RECORD=sessions/slice python3 demos/fruit_ninja.py
+
+then replay it, in a window or headless, in real time or as fast as possible:
+
+    python3 demos/replay.py sessions/slice                     # window, real time
+    python3 demos/replay.py sessions/slice --fast --headless   # no window, full speed
+    python3 demos/replay.py sessions/slice --skip-inference    # use the recorded hands
+
+The demo gets the recorded frames, frame times, key presses and random seed,
+so it plays out the same way every time. With --skip-inference MediaPipe is
+not run at all and the demo uses the landmarks saved in the session. With
+--headless the script prints a checksum of every output frame: two replays
+of the same session give the same checksum.
+"""
+import argparse
+import hashlib
+import inspect
+import time
+from benchmark import DEMOS, load_demo
+from runner import run_demo
+from session import Session, ReplaySource, RecordedHands
+from sinks import NO_KEY
+
+
+def build_demo(name, session, source, skip_inference):
+    demo_class = load_demo(name)
+    parameters = inspect.signature(demo_class).parameters
+    kwargs = {}
+    if "seed" in parameters and session.meta.get("seed") is not None:
+        kwargs["seed"] = session.meta["seed"]
+    if skip_inference:
+        if "hands" not in parameters:
+            raise RuntimeError(f"Error: {name} does not use hand landmarks")
+        kwargs["hands"] = RecordedHands(source)
+    return demo_class(**kwargs)
+
+
+def replay_headless(demo, source):
+    """Runs every frame through the demo without a window and returns (frames, seconds, checksum)."""
+    checksum = hashlib.sha1()
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            if hasattr(demo, "frame_time"):
+                demo.frame_time = source.timestamp
+            frame = demo.process_frame(frame)
+            checksum.update(frame.tobytes())
+            frames += 1
+            if source.key != NO_KEY and (source.key == ord('q') or demo.handle_key(source.key) is False):
+                break
+    finally:
+        demo.close()
+        source.release()
+    return frames, time.perf_counter() - start, checksum.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("session", help="directory written by UTEACH_RECORD")
+    parser.add_argument("--demo", help=f"demo to replay into (default: the recorded one): {', '.join(DEMOS)}")
+    parser.add_argument("--fast", action="store_true", help="don't wait for the recorded frame times")
+    parser.add_argument("--skip-inference", action="store_true", help="use the recorded hand landmarks")
+    parser.add_argument("--headless", action="store_true", help="no window; print a checksum of the output")
+    args = parser.parse_args()
+
+    try:
+        session = Session(args.session)
+        name = args.demo or session.meta.get("demo")
+        if name not in DEMOS:
+            parser.error(f"unknown demo: {name}")
+        source = ReplaySource(session, realtime=not args.fast)
+        demo = build_demo(name, session, source, args.skip_inference)
+    except RuntimeError as error:
+        print(error)
+        return
+
+    if not args.headless:
+        run_demo(demo, source)
+        return
+
+    frames, seconds, checksum = replay_headless(demo, source)
+    print(f"{name}: {frames} frames in {seconds:.2f} s ({frames / max(seconds, 1e-9):.1f} FPS)")
+    print(f"checksum: {checksum}")
+
+
+# The guard is needed because hand demos start worker processes that re-import this file
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,12 @@
 import cv2
-import mediapipe as mp
 import random
 import time
-
-# -----------------------------
-# MediaPipe setup
-# -----------------------------
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1)
-mp_draw = mp.solutions.drawing_utils
-
-# -----------------------------
-# Webcam
-# -----------------------------
-cap = cv2.VideoCapture(0)
-
-# -----------------------------
-# Game state
-# -----------------------------
-choices = ["ROCK", "PAPER", "SCISSORS"]
-player_choice: str = "NONE"
-computer_choice: str = "NONE"
-result: str = "Press 'S' to Start"
-player_score: int = 0
-computer_score: int = 0
-game_state: str = "TITLE" # Possible values: TITLE, COUNTDOWN, PLAYING, RESULT
-state_start_time: float = time.monotonic()  # Use monotonic for timing
-
-# -----------------------------
-# Gesture detection
-# -----------------------------
-def get_gesture(hand_landmarks) -> str:
-    """Detects hand gesture and returns one of ROCK, PAPER, SCISSORS, or UNKNOWN."""
-    finger_tips = [8, 12, 16, 20]
-    thumb_tip = 4
-    fingers_up = 0
-
-    # Thumb (x-axis): Check if thumb is extended
-    if hand_landmarks.landmark[thumb_tip].x < hand_landmarks.landmark[thumb_tip - 1].x:
-        fingers_up += 1
-
-    # Other fingers (y-axis): Check if fingers are extended
-    for tip in finger_tips:
-        if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y:
-            fingers_up += 1
-
-    if fingers_up == 0:
-        return "ROCK"
-    elif fingers_up == 2:
-        return "SCISSORS"
-    elif fingers_up >= 4:
-        return "PAPER"
-    else:
-        return "UNKNOWN"
+from quality import apply_hands_quality
+from runner import run_demo
+from hand_service import LocalHands, draw_landmarks
+from gestures import classify_rps, GESTURE_NAMES
+from hud import Hud
+from perception import PerceptionScheduler, NONE, PRESENCE, FULL
 
 # -----------------------------
 def decide_winner(player: str, computer: str) -> str:
@@ -68,99 +22,155 @@ def decide_winner(player: str, computer: str) -> str:
     else:
         return "YOU LOSE"
 
-# -----------------------------
-# Main loop
-# -----------------------------
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    h, w, c = frame.shape
-    center_x, center_y = w // 2, h // 2
 
-    # Convert frame to RGB for MediaPipe
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
-
-    detected_gesture = "UNKNOWN"
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-            detected_gesture = get_gesture(hand_landmarks)
+class RockPaperScissorsGame:
+    WINDOW_NAME = "Rock Paper Scissors - CV Edition"
+    # How MediaPipe Hands is set up for this game (the launcher reuses a warm one)
+    HANDS_SERVICE = LocalHands
+    HANDS_OPTIONS = dict(max_num_hands=1)
+    # What each game state needs to know about hands (see perception.py): the
+    # gesture is only read while PLAYING, and the countdown just checks a few
+    # times per second that a hand is in view. Everything else runs no inference.
+    PERCEPTION = {"TITLE": NONE, "COUNTDOWN": PRESENCE, "PLAYING": FULL, "RESULT": NONE}
+
+    def __init__(self, seed=None, hands=None):
+        # -----------------------------
+        # MediaPipe setup
+        # (a replay can pass in session.RecordedHands instead)
+        # -----------------------------
+        self.hands = hands if hands is not None else self.HANDS_SERVICE(**self.HANDS_OPTIONS)
+        self.hand_result = None
+        self.perception = PerceptionScheduler(self.hands)
+        # All text goes through the HUD, which only re-renders what changed
+        self.hud = Hud()
+
+        # -----------------------------
+        # Game state
+        # -----------------------------
+        self.choices = ["ROCK", "PAPER", "SCISSORS"]
+        self.player_choice: str = "NONE"
+        self.computer_choice: str = "NONE"
+        self.result: str = "Press 'S' to Start"
+        self.player_score: int = 0
+        self.computer_score: int = 0
+        self.game_state: str = "TITLE" # Possible values: TITLE, COUNTDOWN, PLAYING, RESULT
+        # Set by the runner to the current frame's time, so replays are exact
+        self.frame_time = None
+        self.state_start_time: float = self.now()
+        # The computer's choices come from a seeded generator (kept for replays)
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+    def now(self) -> float:
+        """The frame's time when the runner provides it, otherwise the monotonic clock."""
+        return time.monotonic() if self.frame_time is None else self.frame_time
+
+    def process_frame(self, frame):
+        h, w, c = frame.shape
+        center_x, center_y = w // 2, h // 2
+
+        # Find the hand, but only as often as the current state needs it
+        # (converted to RGB for MediaPipe inside the hands service)
+        need = self.PERCEPTION[self.game_state]
+        self.hand_result = self.perception.step(frame, need, self.now())
+        hand_seen = self.hand_result is not None and len(self.hand_result.landmarks) > 0
+
+        # Classify every hand found at once: ROCK (fist), SCISSORS (two fingers),
+        # PAPER (open hand) or UNKNOWN
+        detected_gesture = "UNKNOWN"
+        if hand_seen and need == FULL:
+            draw_landmarks(frame, self.hand_result.landmarks)
+            gestures = classify_rps(self.hand_result.landmarks, self.hand_result.handedness)
+            detected_gesture = GESTURE_NAMES[gestures[-1]]
+
+        # -----------------------------
+        # State Machine
+        # -----------------------------
+        if self.game_state == "TITLE":
+            # Display title screen
+            self.hud.text("title", "Rock Paper Scissors", (center_x - 200, center_y - 50),
+                          cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 0), 3)
+            self.hud.text("start", "Press 'S' to Start", (center_x - 150, center_y + 50),
+                          cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+
+        elif self.game_state == "COUNTDOWN":
+            # Countdown before each round
+            elapsed = self.now() - self.state_start_time
+            if elapsed < 3:
+                digit = str(3 - int(elapsed))
+                self.hud.text("countdown", digit, (center_x - 50, center_y), cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 255), 5)
+            else:
+                self.game_state = "PLAYING"
+
+            # Let the player know whether their hand is in view before it counts
+            if hand_seen:
+                self.hud.text("hand", "Hand ready!", (center_x - 90, center_y + 80),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            else:
+                self.hud.text("hand", "Show your hand", (center_x - 120, center_y + 80),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 165, 255), 2)
+
+        elif self.game_state == "PLAYING":
+            # Prompt user to show gesture
+            self.hud.text("go", "GO!", (center_x - 80, center_y), cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 0), 4)
+
+            if detected_gesture in self.choices:
+                self.player_choice = detected_gesture
+                self.computer_choice = self.rng.choice(self.choices)
+                self.result = decide_winner(self.player_choice, self.computer_choice)
+
+                if self.result == "YOU WIN":
+                    self.player_score += 1
+                elif self.result == "YOU LOSE":
+                    self.computer_score += 1
+
+                self.game_state = "RESULT"
+                self.state_start_time = self.now()
+
+        elif self.game_state == "RESULT":
+            # Show round result
+            self.hud.text("you", f"You: {self.player_choice}", (50, center_y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            self.hud.text("cpu", f"CPU: {self.computer_choice}", (w - 250, center_y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            self.hud.text("result", self.result, (center_x - 100, center_y - 100), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 0, 255), 3)
+
+            # After 3 seconds, start new round
+            if self.now() - self.state_start_time > 3:
+                self.game_state = "COUNTDOWN"
+                self.state_start_time = self.now()
+
+        # -----------------------------
+        # Heads Up Display (HUD)
+        # -----------------------------
+        self.hud.text("player score", f"Player: {self.player_score}", (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.hud.text("cpu score", f"CPU: {self.computer_score}", (w - 200, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.hud.text("help", "Q: Quit | R: Restart | A: Reset Score", (30, h - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+        self.hud.draw(frame)
+        return frame
+
+    def set_quality(self, settings):
+        # Called by run_demo to hold the target frame rate (see quality.py)
+        apply_hands_quality(self.hands, settings)
 
     # -----------------------------
-    # State Machine
+    # Keyboard controls
     # -----------------------------
-    if game_state == "TITLE":
-        # Display title screen
-        cv2.putText(frame, "Rock Paper Scissors", (center_x - 200, center_y - 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 0), 3)
-        cv2.putText(frame, "Press 'S' to Start", (center_x - 150, center_y + 50), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-
-    elif game_state == "COUNTDOWN":
-        # Countdown before each round
-        elapsed = time.monotonic() - state_start_time
-        if elapsed < 1:
-            cv2.putText(frame, "3", (center_x - 50, center_y), cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 255), 5)
-        elif elapsed < 2:
-            cv2.putText(frame, "2", (center_x - 50, center_y), cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 255), 5)
-        elif elapsed < 3:
-            cv2.putText(frame, "1", (center_x - 50, center_y), cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 255), 5)
-        else:
-            game_state = "PLAYING"
-
-    elif game_state == "PLAYING":
-        # Prompt user to show gesture
-        cv2.putText(frame, "GO!", (center_x - 80, center_y), cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 0), 4)
-
-        if detected_gesture in choices:
-            player_choice = detected_gesture
-            computer_choice = random.choice(choices)
-            result = decide_winner(player_choice, computer_choice)
-
-            if result == "YOU WIN":
-                player_score += 1
-            elif result == "YOU LOSE":
-                computer_score += 1
-            
-            game_state = "RESULT"
-            state_start_time = time.monotonic()
-
-    elif game_state == "RESULT":
-        # Show round result
-        cv2.putText(frame, f"You: {player_choice}", (50, center_y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"CPU: {computer_choice}", (w - 250, center_y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-        cv2.putText(frame, result, (center_x - 100, center_y - 100), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 0, 255), 3)
-
-        # After 3 seconds, start new round
-        if time.monotonic() - state_start_time > 3:
-            game_state = "COUNTDOWN"
-            state_start_time = time.monotonic()
+    def handle_key(self, key):
+        if (key == ord('r')) or (key == ord('s') and self.game_state == "TITLE"):
+            self.game_state = "COUNTDOWN"
+            self.state_start_time = self.now()
+        elif key == ord('a'):
+            self.player_score = 0
+            self.computer_score = 0
+        return True
 
-    # -----------------------------
-    # Heads Up Display (HUD)
-    # -----------------------------
-    cv2.putText(frame, f"Player: {player_score}", (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-    cv2.putText(frame, f"CPU: {computer_score}", (w - 200, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-    cv2.putText(frame, "Q: Quit | R: Restart | A: Reset Score", (30, h - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+    def close(self):
+        self.hands.close()
 
-    cv2.imshow("Rock Paper Scissors - CV Edition", frame)
 
-    # -----------------------------
-    # Keyboard controls
-    # -----------------------------
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('q'):
-        break
-    elif (key == ord('r')) or (key == ord('s') and game_state == "TITLE"):
-        game_state = "COUNTDOWN"
-        state_start_time = time.monotonic()
-    elif key == ord('a'):
-        player_score = 0
-        computer_score = 0
-
-# Release resources
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+def main():
+    # Webcam (or UTEACH_SOURCE) in, game out; 'q' quits
+    run_demo(RockPaperScissorsGame())
+
+
+if __name__ == "__main__":
+    main()
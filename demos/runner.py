@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+from frame_source import open_source
+from profiling import profiler, TRACE_ENV
+from quality import QualityController, target_fps_from_env, TARGET_FPS_ENV
+from session import SessionRecorder, RECORD_ENV
+from sinks import open_sink, NO_KEY
+
+
+def demo_name(demo):
+    """The file name of the demo's module, e.g. "fruit_ninja" (also when run as a script)."""
+    module = sys.modules.get(type(demo).__module__)
+    path = getattr(module, "__file__", None)
+    if path is None:
+        return type(demo).__module__
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def run_demo(demo, source=None, sink=None, keep_open=False, on_key=None):
+    """
+    The main loop shared by every demo.
+
+    A demo is any object with:
+        WINDOW_NAME            the title of its window
+        process_frame(frame)   draws on (or replaces) the frame and returns it
+        handle_key(key)        reacts to a key press; returns False to quit
+        close()                releases models and worker processes
+    and optionally:
+        frame_time             set before each process_frame() to the frame's time
+                               in seconds; demos that use it replay exactly
+        hand_result            the HandResult the demo used for the last frame,
+                               saved when recording a session
+        set_quality(settings)  applies a quality level (see quality.py); demos
+                               that have it are kept at UTEACH_TARGET_FPS, if set
+
+    Frames come from `source` (default: open_source(), i.e. UTEACH_SOURCE or webcam 0)
+    and go to `sink` (default: open_sink(), i.e. UTEACH_SINK or a window).
+    Pressing 'q' always quits and 't' (or 'T') toggles the timing overlay. on_key(key) is
+    called before the demo's handle_key and can return False to stop the loop.
+    With keep_open=True the source and sink are left open for the next demo.
+    Set UTEACH_RECORD=some_dir to record the session (see session.py).
+    """
+    cap = source if source is not None else open_source()
+    if not cap.isOpened():
+        print("Error: Could not open video source.")
+        demo.close()
+        return
+    output = sink if sink is not None else open_sink(window_name=demo.WINDOW_NAME)
+
+    trace_path = os.environ.get(TRACE_ENV)
+    if trace_path:
+        # Exporting a trace only makes sense with timing switched on
+        profiler.enabled = True
+
+    recorder = None
+    record_path = os.environ.get(RECORD_ENV)
+    if record_path:
+        recorder = SessionRecorder(record_path, meta={
+            "demo": demo_name(demo),
+            "seed": getattr(demo, "seed", None),
+        })
+
+    quality = None
+    target_fps = target_fps_from_env()
+    # Replays (sources with recorded timestamps) keep their settings so they stay deterministic
+    if target_fps is not None and hasattr(demo, "set_quality") and not hasattr(cap, "timestamp"):
+        quality = QualityController(target_fps)
+        demo.set_quality(quality.settings)
+        print(f"Adaptive quality: holding {target_fps:g} FPS, starting at {quality.settings['name']} "
+              f"(unset {TARGET_FPS_ENV} for full quality always)")
+
+    start = time.monotonic()
+    try:
+        _frame_loop(demo, cap, output, recorder, start, on_key, quality)
+    except KeyboardInterrupt:
+        pass  # Ctrl+C stops headless runs; still close everything below
+    finally:
+        demo.close()
+        if not keep_open:
+            cap.release()
+            output.close()
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {len(recorder)} frames to {record_path}")
+        if trace_path:
+            profiler.export(trace_path)
+            print(f"Wrote timing trace to {trace_path}")
+
+
+def _frame_loop(demo, cap, output, recorder, start, on_key, quality):
+    while True:
+        profiler.begin_frame()
+        with profiler.span("capture"):
+            ret, frame = cap.read()
+        if not ret:
+            print("Failed to grab frame")
+            break
+        work_start = time.perf_counter()
+
+        # A replayed session brings its own timestamps; live frames are timed here
+        timestamp = getattr(cap, "timestamp", None)
+        if timestamp is None:
+            timestamp = time.monotonic() - start
+        if hasattr(demo, "frame_time"):
+            demo.frame_time = timestamp
+        if recorder is not None:
+            # Encode before the demo draws on the frame
+            encoded = recorder.encode(frame)
+
+        with profiler.span("process"):
+            frame = demo.process_frame(frame)
+        if quality is not None:
+            quality.draw_hud(frame)
+        profiler.draw_hud(frame)
+        with profiler.span("output"):
+            output.write(frame)
+
+        with profiler.span("waitKey"):
+            key = output.poll_key()
+        profiler.end_frame()
+        # Waiting for the camera doesn't count: only the time spent on the frame
+        if quality is not None and quality.update(time.perf_counter() - work_start):
+            demo.set_quality(quality.settings)
+        if key == NO_KEY:
+            # Replays press the keys that were pressed when the session was recorded
+            key = getattr(cap, "key", NO_KEY)
+        if recorder is not None:
+            recorder.write(encoded, timestamp, key, getattr(demo, "hand_result", None))
+
+        if key in (ord('t'), ord('T')):
+            profiler.toggle()
+        elif key == ord('q'):
+            break
+        elif on_key is not None and on_key(key) is False:
+            break
+        elif demo.handle_key(key) is False:
+            break
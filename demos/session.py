@@ -0,0 +1,252 @@
+import json
+import os
+import time
+import cv2
+import numpy as np
+from hand_service import HandResult
+from sinks import NO_KEY
+
+# UTEACH_RECORD=some_dir records a session while any demo runs
+# (see runner.py); replay it with UTEACH_SOURCE=replay:some_dir or replay.py
+RECORD_ENV = "UTEACH_RECORD"
+SESSION_VERSION = 2
+HANDEDNESS = ["Left", "Right"]
+
+# -------------------------------
+# A session is a directory of plain files, all readable with np.load(mmap_mode="r"):
+#   meta.json         version, demo name, seed, frame size, number of frames
+#   frames.bin        the frames, JPEG-encoded back to back
+#   offsets.npy       int64 (frames + 1,): frame i is frames.bin[offsets[i]:offsets[i + 1]]
+#   timestamps.npy    float64 (frames,): seconds since the first frame
+#   keys.npy          uint8 (frames,): key pressed after each frame (255 = none)
+#   hand_counts.npy   uint8 (frames,): hands the demo used on each frame
+#   landmarks.npy     float32 (frames, max_hands, 21, 3), NaN where there is no hand
+#   handedness.npy    int8 (frames, max_hands): 0 = Left, 1 = Right, -1 = no hand
+#   hand_frame_ids.npy int64 (frames,): frame ID of the HandResult the demo used
+#                     (it can be an earlier frame's), -1 = none
+#   hand_times.npy    float64 (frames,): when that result's frame was captured, NaN = unknown
+# Version 1 sessions have no hand_frame_ids/hand_times; they still replay.
+# -------------------------------
+
+
+class SessionRecorder:
+    """
+    Saves what a demo saw: frames, their timestamps, key presses and the hand
+    landmarks the demo used. Frames are JPEG-encoded as they arrive; everything
+    else is kept in memory and written on close().
+
+        encoded = recorder.encode(frame)        # before the demo draws on it
+        ...
+        recorder.write(encoded, timestamp, key, hands)
+    """
+
+    def __init__(self, path, quality=90, max_hands=2, meta=None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.quality = quality
+        self.max_hands = max_hands
+        self.meta = dict(meta or {})
+        self.frame_size = None
+        self._frames = open(os.path.join(path, "frames.bin"), "wb")
+        self._offsets = [0]
+        self._timestamps = []
+        self._keys = []
+        self._landmarks = []
+        self._handedness = []
+        self._hand_frame_ids = []
+        self._hand_times = []
+
+    def encode(self, frame):
+        if self.frame_size is None:
+            self.frame_size = frame.shape[1], frame.shape[0]
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise RuntimeError("Could not encode frame for recording")
+        return encoded
+
+    def write(self, encoded, timestamp, key=NO_KEY, hands=None):
+        """Adds one frame. `hands` is the HandResult the demo used for it (or None)."""
+        self._frames.write(encoded.tobytes())
+        self._offsets.append(self._offsets[-1] + encoded.size)
+        self._timestamps.append(timestamp)
+        self._keys.append(key & 0xFF)
+
+        landmarks = np.full((self.max_hands, 21, 3), np.nan, dtype=np.float32)
+        handedness = np.full(self.max_hands, -1, dtype=np.int8)
+        if hands is not None:
+            count = min(len(hands.landmarks), self.max_hands)
+            landmarks[:count] = hands.landmarks[:count]
+            handedness[:count] = [HANDEDNESS.index(label) for label in hands.handedness[:count]]
+        self._landmarks.append(landmarks)
+        self._handedness.append(handedness)
+        # Which frame (and when) the hands were measured on, so a replay hands
+        # them to the demo with the same lag as the live run
+        self._hand_frame_ids.append(-1 if hands is None else hands.frame_id)
+        measured_at = None if hands is None else hands.measured_at
+        self._hand_times.append(np.nan if measured_at is None else measured_at)
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def close(self):
+        self._frames.close()
+        count = len(self)
+        landmarks = np.array(self._landmarks, dtype=np.float32).reshape(count, self.max_hands, 21, 3)
+        handedness = np.array(self._handedness, dtype=np.int8).reshape(count, self.max_hands)
+        arrays = {
+            "offsets": np.array(self._offsets, dtype=np.int64),
+            "timestamps": np.array(self._timestamps, dtype=np.float64),
+            "keys": np.array(self._keys, dtype=np.uint8),
+            "hand_counts": (handedness >= 0).sum(axis=1).astype(np.uint8),
+            "landmarks": landmarks,
+            "handedness": handedness,
+            "hand_frame_ids": np.array(self._hand_frame_ids, dtype=np.int64),
+            "hand_times": np.array(self._hand_times, dtype=np.float64),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(self.path, f"{name}.npy"), array)
+
+        meta = dict(self.meta)
+        meta.update(version=SESSION_VERSION, frames=count, frame_size=self.frame_size,
+                    max_hands=self.max_hands, encoding="jpg")
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+
+class Session:
+    """A recorded session opened for reading. All arrays are memory-mapped, so opening is instant."""
+
+    def __init__(self, path):
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            raise RuntimeError(f"Error: no recorded session at {path}")
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") not in (1, SESSION_VERSION):
+            raise RuntimeError(f"Error: unsupported session version {self.meta.get('version')}")
+
+        self.path = path
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.offsets = load("offsets")
+        self.timestamps = load("timestamps")
+        self.keys = load("keys")
+        self.hand_counts = load("hand_counts")
+        self.landmarks = load("landmarks")
+        self.handedness = load("handedness")
+        # Not in version 1 sessions
+        self.hand_frame_ids = load("hand_frame_ids") if self.meta["version"] >= 2 else None
+        self.hand_times = load("hand_times") if self.meta["version"] >= 2 else None
+        frames_path = os.path.join(path, "frames.bin")
+        if os.path.getsize(frames_path) > 0:
+            self._frames = np.memmap(frames_path, dtype=np.uint8, mode="r")
+        else:
+            self._frames = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def frame(self, i):
+        """Decodes frame i (BGR)."""
+        return cv2.imdecode(self._frames[self.offsets[i]:self.offsets[i + 1]], cv2.IMREAD_COLOR)
+
+    def hands(self, i, frame_id=None):
+        """
+        The HandResult the demo used on frame i, with the frame ID and time it
+        was measured at (None if the demo had no hands on that frame). Version 1
+        sessions don't know either, so the result gets `frame_id` (default i).
+        """
+        measured_at = None
+        if self.hand_frame_ids is not None:
+            if self.hand_frame_ids[i] < 0:
+                return None
+            frame_id = int(self.hand_frame_ids[i])
+            t = float(self.hand_times[i])
+            measured_at = None if np.isnan(t) else t
+        count = int(self.hand_counts[i])
+        landmarks = np.array(self.landmarks[i, :count])
+        handedness = [HANDEDNESS[h] for h in self.handedness[i, :count]]
+        return HandResult(i if frame_id is None else frame_id, landmarks, handedness, 0.0, 0.0, measured_at)
+
+
+class ReplaySource:
+    """
+    Plays a recorded session back with the same read()/isOpened()/release()
+    calls as FrameSource.
+
+    realtime=True waits until each frame's recorded time; realtime=False
+    delivers frames as fast as the demo takes them. Either way every frame is
+    delivered in order, and `timestamp` and `key` are the recorded values for
+    the frame last read, so a demo replays exactly as it ran.
+    """
+
+    def __init__(self, session, realtime=True):
+        self.session = session if isinstance(session, Session) else Session(session)
+        self.realtime = realtime
+        self.index = -1
+        self.timestamp = None
+        self.key = NO_KEY
+        self._start = None
+        self._released = False
+
+    def isOpened(self):
+        return not self._released
+
+    @property
+    def ended(self):
+        return self._released or self.index + 1 >= len(self.session)
+
+    def read(self, timeout=None):
+        if self._released or self.index + 1 >= len(self.session):
+            return False, None
+        self.index += 1
+        self.timestamp = float(self.session.timestamps[self.index])
+        self.key = int(self.session.keys[self.index])
+        if self.realtime:
+            if self._start is None:
+                self._start = time.monotonic() - self.timestamp
+            delay = self._start + self.timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return True, self.session.frame(self.index)
+
+    def release(self):
+        self._released = True
+
+
+class RecordedHands:
+    """
+    Stands in for HandInferenceService or LocalHands during a replay: instead of
+    running MediaPipe it returns the hands recorded for the frame being replayed.
+
+    On every frame, whether or not a frame was submitted, the result is the
+    one the demo used when the session was recorded, with its original frame ID
+    and capture time. A result that lagged behind the live frame (from the
+    worker process, or on frames where inference was skipped) lags the same
+    way in the replay.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.dropped_frames = 0
+        self._frame_id = None  # the last submitted ID, for version 1 sessions
+
+    @property
+    def latest(self):
+        if self.source.index < 0:
+            return None
+        if self.source.session.hand_frame_ids is None and self._frame_id is None:
+            return None  # version 1: nothing until the first submit()
+        return self.source.session.hands(self.source.index, self._frame_id)
+
+    def submit(self, frame, frame_id):
+        self._frame_id = frame_id
+        return True
+
+    def result(self, min_frame_id=None, timeout=None):
+        return self.latest
+
+    def close(self):
+        pass
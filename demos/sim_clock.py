@@ -0,0 +1,54 @@
+import time
+
+
+class FixedTimestep:
+    """
+    A simulation clock that ticks at a fixed rate, no matter how fast frames arrive.
+
+    Each frame, call advance() to find out how many fixed steps to run. Leftover
+    time carries over to the next frame, and `alpha` (0..1) says how far we are
+    between the last two steps, for smooth interpolated drawing:
+
+        for _ in range(clock.advance()):
+            simulate(clock.dt)
+        draw(alpha=clock.alpha)
+
+    At 60 ticks per second a 15 FPS camera runs 4 steps per frame and a 120 FPS
+    camera runs one step every other frame, so the game plays at the same speed.
+    """
+
+    def __init__(self, tick_rate=60, max_ticks_per_frame=8):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.ticks = 0
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def reset(self, now=None):
+        """Forgets elapsed time (e.g. after a pause) so the game does not jump ahead."""
+        self.last_time = time.monotonic() if now is None else now
+        self.accumulator = 0.0
+
+    def advance(self, now=None):
+        """Returns how many fixed steps to simulate for the time since the last call."""
+        now = time.monotonic() if now is None else now
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+        if steps > self.max_ticks_per_frame:
+            # A long stall (window dragged, debugger...) - drop the time instead of
+            # running hundreds of steps at once
+            steps = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the current time is between the previous and the next step (0..1)."""
+        return min(1.0, self.accumulator / self.dt)
@@ -0,0 +1,295 @@
+import os
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+from profiling import profiler
+
+# Environment variable that picks where every demo's output goes:
+#   UTEACH_SINK=window                -> an OpenCV window (the default)
+#   UTEACH_SINK=null                  -> nowhere (headless runs and benchmarks)
+#   UTEACH_SINK=file:out.mp4          -> a video file (.mp4 or .avi)
+#   UTEACH_SINK=mjpeg                 -> http://localhost:8080/ in any browser
+#   UTEACH_SINK=mjpeg:9000            -> the same on another port
+#   UTEACH_SINK=window+file:out.mp4   -> several at once
+SINK_ENV = "UTEACH_SINK"
+NO_KEY = 255  # what cv2.waitKey(1) & 0xFF returns when nothing was pressed
+
+
+class NullSink:
+    """Throws every frame away. Lets headless runs and benchmarks go at full speed."""
+
+    def __init__(self):
+        self.frames_written = 0
+        self.dropped_frames = 0
+
+    def write(self, frame):
+        self.frames_written += 1
+
+    def poll_key(self):
+        return NO_KEY
+
+    def close(self):
+        pass
+
+
+class WindowSink:
+    """
+    Shows frames in an OpenCV window; poll_key() returns the key pressed.
+
+    This one runs on the calling thread: GUI toolkits (Cocoa on macOS in
+    particular) only allow windows on the main thread.
+    """
+
+    def __init__(self, name="Uteach"):
+        self.name = name
+        self.frames_written = 0
+        self.dropped_frames = 0
+
+    def write(self, frame):
+        cv2.imshow(self.name, frame)
+        self.frames_written += 1
+
+    def poll_key(self):
+        return cv2.waitKey(1) & 0xFF
+
+    def close(self):
+        if self.frames_written > 0:
+            cv2.destroyWindow(self.name)
+
+
+class ThreadedSink:
+    """
+    Base class for sinks that encode on a background thread.
+
+    write() only copies the frame into a bounded queue, so encoding and I/O
+    never hold up the frame loop. When the queue is full:
+        drop="oldest"  throw away the oldest queued frame (always show the newest)
+        drop="newest"  throw away the frame being written
+        drop="block"   wait for room (every frame is kept, e.g. for recordings)
+    Dropped frames are counted in dropped_frames.
+
+    Subclasses implement consume(frame) (runs on the thread) and finish().
+    """
+
+    def __init__(self, max_queue=4, drop="oldest"):
+        if drop not in ("oldest", "newest", "block"):
+            raise ValueError(f"Unknown drop policy: {drop}")
+        self.drop = drop
+        self.frames_written = 0
+        self.dropped_frames = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, frame):
+        if self.error is not None:
+            raise RuntimeError(f"{type(self).__name__} stopped: {self.error}")
+        # Copy, because the demo may draw on (or reuse) the frame after this returns
+        frame = frame.copy()
+        if self.drop == "block":
+            if not self._put(frame):
+                raise RuntimeError(f"{type(self).__name__} stopped: {self.error}")
+            return
+        while True:
+            try:
+                self._queue.put_nowait(frame)
+                return
+            except queue.Full:
+                if self.drop == "newest":
+                    self.dropped_frames += 1
+                    return
+            try:
+                self._queue.get_nowait()
+                self.dropped_frames += 1
+            except queue.Empty:
+                pass
+
+    def poll_key(self):
+        return NO_KEY
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            try:
+                with profiler.span(f"{type(self).__name__} encode"):
+                    self.consume(frame)
+                self.frames_written += 1
+            except Exception as error:  # reported on the next write()
+                self.error = error
+                break
+        self.finish()
+
+    def _put(self, item):
+        # Waits for room in the queue, but only while the thread is still there
+        # to make room: after consume() fails nothing takes frames off it any more
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self.error is not None or not self._thread.is_alive():
+                    return False
+
+    def close(self):
+        self._put(None)
+        self._thread.join(timeout=5.0)
+
+    def consume(self, frame):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class VideoFileSink(ThreadedSink):
+    """Writes frames to a video file with cv2.VideoWriter (opened on the first frame)."""
+
+    # Codecs that ship with OpenCV's own builds
+    FOURCC = {".mp4": "mp4v", ".avi": "MJPG"}
+
+    def __init__(self, path, fps=30.0, max_queue=8, drop="block"):
+        self.path = path
+        self.fps = fps
+        self.writer = None
+        super().__init__(max_queue=max_queue, drop=drop)
+
+    def consume(self, frame):
+        if self.writer is None:
+            h, w = frame.shape[:2]
+            extension = os.path.splitext(self.path)[1].lower()
+            fourcc = cv2.VideoWriter_fourcc(*self.FOURCC.get(extension, "mp4v"))
+            self.writer = cv2.VideoWriter(self.path, fourcc, self.fps, (w, h))
+            if not self.writer.isOpened():
+                raise RuntimeError(f"could not open {self.path} for writing")
+        self.writer.write(frame)
+
+    def finish(self):
+        if self.writer is not None:
+            self.writer.release()
+
+
+class MJPEGSink(ThreadedSink):
+    """
+    Serves the frames as an MJPEG stream over HTTP: open http://localhost:<port>/
+    in a browser. Only the newest frame matters, so the queue is one frame deep.
+    Listens on localhost only unless host is changed.
+    """
+
+    def __init__(self, port=8080, host="127.0.0.1", quality=80):
+        self.quality = quality
+        self._jpeg = None
+        self._sequence = 0
+        self._new_jpeg = threading.Condition()
+        self._closed = False
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                sink._serve(self)
+
+            def log_message(self, *args):
+                pass  # keep the terminal quiet
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._server_thread.start()
+        super().__init__(max_queue=1, drop="oldest")
+
+    def consume(self, frame):
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if ok:
+            with self._new_jpeg:
+                self._jpeg = jpeg.tobytes()
+                self._sequence += 1
+                self._new_jpeg.notify_all()
+
+    def _serve(self, request):
+        request.send_response(200)
+        request.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+        request.send_header("Cache-Control", "no-cache")
+        request.end_headers()
+        seen = 0
+        try:
+            while True:
+                with self._new_jpeg:
+                    self._new_jpeg.wait_for(lambda: self._sequence != seen or self._closed, timeout=1.0)
+                    if self._closed:
+                        return
+                    if self._sequence == seen:
+                        continue
+                    jpeg, seen = self._jpeg, self._sequence
+                request.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                request.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                request.wfile.write(jpeg + b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the browser went away
+
+    def finish(self):
+        with self._new_jpeg:
+            self._closed = True
+            self._new_jpeg.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MultiSink:
+    """Sends every frame to several sinks; keys come from the first one that has any."""
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+    @property
+    def frames_written(self):
+        return min(sink.frames_written for sink in self.sinks)
+
+    @property
+    def dropped_frames(self):
+        return sum(sink.dropped_frames for sink in self.sinks)
+
+    def write(self, frame):
+        for sink in self.sinks:
+            sink.write(frame)
+
+    def poll_key(self):
+        key = NO_KEY
+        for sink in self.sinks:
+            pressed = sink.poll_key()
+            if key == NO_KEY:
+                key = pressed
+        return key
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def open_sink(spec=None, window_name="Uteach"):
+    """
+    Opens a sink from a spec: "window", "null", "file:path", "mjpeg[:port]",
+    or several joined with "+". If spec is None the UTEACH_SINK environment
+    variable is used, falling back to a window.
+    """
+    if spec is None:
+        spec = os.environ.get(SINK_ENV, "window")
+    parts = [part for part in str(spec).split("+") if part]
+    if len(parts) > 1:
+        return MultiSink([open_sink(part, window_name) for part in parts])
+
+    kind, _, option = spec.partition(":")
+    if kind == "window":
+        return WindowSink(window_name)
+    if kind == "null":
+        return NullSink()
+    if kind == "file":
+        if not option:
+            raise ValueError("file sink needs a path, e.g. file:out.mp4")
+        return VideoFileSink(option)
+    if kind == "mjpeg":
+        return MJPEGSink(int(option) if option else 8080)
+    raise ValueError(f"Unknown sink: {spec}")
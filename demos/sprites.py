@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from profiling import profiler
+from utils import blend_prepared, blend_many
+from asset_store import MipChain, load_mips
+
+
+class Sprite:
+    """
+    Wraps a loaded RGBA asset and caches resized, premultiplied copies of it.
+
+    `image` is a BGR/BGRA array or a MipChain (see load_sprite()); each size is
+    resized from the nearest mip level instead of the full-size image.
+
+    Face boxes change size by a few pixels from frame to frame, so requested sizes
+    are rounded to a multiple of `quantum` before looking them up. The cache is a
+    least-recently-used (LRU) map bounded by `max_bytes`.
+    """
+
+    def __init__(self, image, quantum=8, max_bytes=16 * 1024 * 1024):
+        self.mips = image if isinstance(image, MipChain) else MipChain.from_image(image)
+        self.quantum = quantum
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize(self, size):
+        """Rounds (width, height) to the nearest multiple of the quantum (at least one quantum)."""
+        q = self.quantum
+        w, h = size
+        return (max(q, int(round(w / q)) * q), max(q, int(round(h / q)) * q))
+
+    def get(self, size=None):
+        """Returns the PreparedOverlay for a size, resizing only on a cache miss."""
+        if size is None:
+            key = self.mips.size
+        else:
+            key = self.quantize(size)
+
+        prepared = self.cache.get(key)
+        if prepared is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return prepared
+
+        self.misses += 1
+        prepared = self.mips.prepare(key)
+        self.cache[key] = prepared
+        self.cache_bytes += self._nbytes(prepared)
+        self._evict()
+        return prepared
+
+    def draw(self, frame, x, y, size=None):
+        """Draws the sprite with its top-left corner at (x, y), scaled to size=(width, height)."""
+        blend_prepared(frame, self.get(size), x, y)
+
+    def stats(self):
+        """Returns the cache counters as a dict (handy for printing or a HUD)."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.cache),
+            "bytes": self.cache_bytes,
+        }
+
+    def _evict(self):
+        # Drop the least recently used sizes, but always keep the newest one
+        while self.cache_bytes > self.max_bytes and len(self.cache) > 1:
+            _, old = self.cache.popitem(last=False)
+            self.cache_bytes -= self._nbytes(old)
+            self.evictions += 1
+
+    @staticmethod
+    def _nbytes(prepared):
+        return prepared.premultiplied.nbytes + prepared.inv_alpha.nbytes
+
+
+class SpriteBatch:
+    """
+    Collects the sprites drawn during a frame and blends them all in one flush().
+
+    Sprites are drawn lowest z first; sprites with the same z are drawn in the
+    order they were added. Each (sprite, size) is looked up in the sprite's
+    cache once per flush, no matter how many times it's drawn, and sprites
+    that are entirely off screen are skipped before any pixel work.
+    """
+
+    def __init__(self):
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def draw(self, sprite, x, y, size=None, scale=None, z=0):
+        """
+        Queues a sprite with its top-left corner at (x, y). Scale it with
+        size=(width, height) or with scale (a factor of its full size).
+        """
+        if scale is not None:
+            w, h = sprite.mips.size
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        self.commands.append((z, len(self.commands), sprite, size, x, y))
+
+    def flush(self, frame):
+        """Blends every queued sprite into the frame, in place, and empties the batch."""
+        if not self.commands:
+            return
+        with profiler.span("sprite batch"):
+            self.commands.sort(key=lambda command: command[:2])
+            prepared = {}
+            overlays = []
+            for _, _, sprite, size, _, _ in self.commands:
+                key = (id(sprite), size)
+                if key not in prepared:
+                    prepared[key] = sprite.get(size)
+                overlays.append(prepared[key])
+            xs = [command[4] for command in self.commands]
+            ys = [command[5] for command in self.commands]
+            blend_many(frame, overlays, xs, ys)
+        self.commands.clear()
+
+
+def load_sprite(name, **kwargs):
+    """Loads an asset from assets/ (through the asset cache) as a Sprite; None if it's missing."""
+    mips = load_mips(name)
+    return Sprite(mips, **kwargs) if mips is not None else None
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from bench_landmark_filter import FRAME_SIZE, INDEX_TIP, synthetic_track
+from hand_service import HandResult
+from landmark_filter import LandmarkSmoother
+from perception import PerceptionScheduler, FULL
+from session import SessionRecorder, Session, ReplaySource, RecordedHands
+
+SECONDS = 20
+
+# (inference every Nth frame, frames of worker delay, most mean error allowed
+# in pixels on a 1280x720 frame for the smoothed fingertip); measured on the
+# synthetic track (1.5 px noise) with some headroom
+BOUNDS = [
+    (1, 0, 2.2),   # LocalHands, every frame
+    (2, 0, 4.5),   # LocalHands, every 2nd frame
+    (1, 1, 6.5),   # HandInferenceService, every frame (what Fruit Ninja runs)
+]
+
+
+def record_session(path, t, measured, every, delay):
+    """Records a session as a live run would have: each frame saves the newest result that had arrived."""
+    recorder = SessionRecorder(path, max_hands=1, meta={"demo": "test"})
+    frame = np.zeros((24, 32, 3), dtype=np.uint8)
+    encoded = recorder.encode(frame)
+    result = None
+    for i in range(len(t)):
+        j = i - delay
+        if j >= 0 and j % every == 0:
+            hand = np.zeros((1, 21, 3), dtype=np.float32)
+            hand[0, :, :2] = measured[j]
+            # Scheduler frame IDs start at 1
+            result = HandResult(j + 1, hand, ["Right"], 0.0, 0.0, float(t[j]))
+        recorder.write(encoded, float(t[i]), hands=result)
+    recorder.close()
+
+
+def replay_errors(path, truth, every):
+    """Replays the session through PerceptionScheduler with a smoother; returns (raw, smoothed) errors in px."""
+    session = Session(path)
+    source = ReplaySource(session, realtime=False)
+    perception = PerceptionScheduler(RecordedHands(source), full_every=every,
+                                     smoother=LandmarkSmoother("one_euro"))
+    raw, smoothed = [], []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        result = perception.step(frame, FULL, now=source.timestamp)
+        if result is None or len(perception.landmarks) == 0:
+            continue
+        true_tip = truth[source.index]
+        raw.append(np.linalg.norm((result.landmarks[0, INDEX_TIP, :2] - true_tip) * FRAME_SIZE))
+        smoothed.append(np.linalg.norm((perception.landmarks[0, INDEX_TIP, :2] - true_tip) * FRAME_SIZE))
+    return np.array(raw), np.array(smoothed)
+
+
+@pytest.mark.parametrize("every, delay, bound", BOUNDS)
+def test_smoothed_fingertip_error_on_replay(tmp_path, every, delay, bound):
+    t, truth, measured = synthetic_track(np.random.default_rng(0))
+    keep = t < SECONDS
+    t, truth, measured = t[keep], truth[keep], measured[keep]
+    record_session(str(tmp_path), t, measured, every, delay)
+
+    raw, smoothed = replay_errors(str(tmp_path), truth, every)
+    assert len(smoothed) >= len(t) - every - delay
+    assert smoothed.mean() <= bound
+    # Filtering and predicting must beat holding the newest raw result
+    assert smoothed.mean() < raw.mean()
@@ -0,0 +1,36 @@
+from frame_source import open_source
+from launcher import ModelCache, start_demo
+
+
+def _check_fresh(demo, source, frames=10):
+    # Every result must belong to this demo's own frames: from the previous
+    # frame (the worker's delay) or this one, never a left-over from before
+    for _ in range(frames):
+        ret, frame = source.read()
+        assert ret
+        demo.process_frame(frame)
+        result = demo.hand_result
+        assert result is not None
+        assert demo.perception.frame_id - 1 <= result.frame_id <= demo.perception.frame_id
+
+
+def test_switching_demos_on_a_warm_cache():
+    cache = ModelCache()
+    source = open_source("synthetic:640x480", drop_frames=False)
+    try:
+        demo, _, kind = start_demo("hand_tracking", cache, source)
+        assert kind == "cold"
+        # Run the first demo well past the frame IDs the next ones will use
+        _check_fresh(demo, source, frames=60)
+        demo.close()
+
+        for _ in range(2):
+            other, _, _ = start_demo("face_detection", cache, source)
+            other.close()
+            demo, _, kind = start_demo("hand_tracking", cache, source)
+            assert kind == "warm"
+            _check_fresh(demo, source)
+            demo.close()
+    finally:
+        cache.close()
+        source.release()
@@ -1,43 +1,114 @@
 import cv2
 import numpy as np
+from collections import namedtuple
+from profiling import profiler
+from frame_pool import FramePool
 
-def overlay_transparent(background_img, overlay_img, x, y, overlay_size=None):
+# A sprite that has been prepared once for fast blending:
+#   premultiplied: BGR color already multiplied by alpha / 255 (uint8)
+#   inv_alpha:     255 - alpha, repeated for B, G and R (uint8)
+# Both are computed a single time per sprite instead of on every frame.
+PreparedOverlay = namedtuple("PreparedOverlay", ["premultiplied", "inv_alpha"])
+
+# Scratch buffer reused between calls so blending does not allocate
+# a new array for every sprite on every frame.
+_scratch = FramePool()
+
+
+def prepare_overlay(overlay_img, overlay_size=None):
     """
-    Overlays a transparent PNG image on top of a backroung image.
+    Precomputes the premultiplied color and inverse alpha of a transparent PNG.
 
     Args:
-    background_img: The background image.
     overlay_img: The transparent overlay image (4 channels).
-    x, y: The top-left coordinates to place the overlay.
     overlay_size: A tuple (width, height) to resize the overlay. If None, original size is used.
-    """
-
-    if overlay_img is None:
-        return
-    
-    bg_h, bg_w, _ = background_img.shape
 
+    Returns a PreparedOverlay that can be passed to overlay_transparent() many times.
+    """
     if overlay_size is not None:
         overlay_img = cv2.resize(overlay_img, overlay_size)
 
-    h, w, _ = overlay_img.shape
-    alpha = overlay_img[:, :, 3] / 255.0
-    overlay_rgb = overlay_img[:, :, :3]
+    alpha = overlay_img[:, :, 3:4]
+    premultiplied = ((overlay_img[:, :, :3] * alpha.astype(np.uint16) + 127) // 255).astype(np.uint8)
+    inv_alpha = np.repeat(255 - alpha, 3, axis=2)
+    return PreparedOverlay(premultiplied, inv_alpha)
+
+
+def blend_prepared(background_img, prepared, x, y):
+    """
+    Blends a PreparedOverlay into the background in place.
+
+    Every pixel is computed as bg * (255 - alpha) / 255 + color * alpha / 255
+    with two OpenCV calls (multiply, then a saturating add), which are
+    vectorized and never leave 8 bits. Rounding both terms separately puts
+    a pixel at most one level off the exact blend.
+    """
+    with profiler.span("overlay_transparent"):
+        _blend_roi(background_img, prepared, x, y)
+
+
+def blend_many(background_img, overlays, xs, ys):
+    """
+    Blends several PreparedOverlays in place, in the order given (later ones on top).
+
+    Same result as calling blend_prepared() for each one, without the
+    per-call overhead (e.g. one profiler span for all of them).
+    """
+    for prepared, x, y in zip(overlays, xs, ys):
+        _blend_roi(background_img, prepared, x, y)
+
+
+def _blend_roi(background_img, prepared, x, y):
+    bg_h, bg_w = background_img.shape[:2]
+    h, w = prepared.inv_alpha.shape[:2]
 
     x, y = int(x), int(y)
 
     # Define the region of interest (ROI) on the background, handling edge cases
     x1, y1 = max(x, 0), max(y, 0)
     x2, y2 = min(x + w, bg_w), min(y + h, bg_h)
+    if x1 >= x2 or y1 >= y2:
+        return
+    _blend_clipped(background_img, prepared, x1, y1, x2, y2, x1 - x, y1 - y)
 
-    # Define the corresponding region on the overlay
-    overlay_x1, overlay_y1 = max(0, -x), max(0, -y)
+
+def _blend_clipped(background_img, prepared, x1, y1, x2, y2, overlay_x1, overlay_y1):
+    # The corresponding region on the overlay
     overlay_x2, overlay_y2 = overlay_x1 + (x2 - x1), overlay_y1 + (y2 - y1)
 
-    # If the ROI is valid, blend the images
-    if x1 < x2 and y1 < y2:
-        bg_roi = background_img[y1:y2, x1:x2]
-        overlay_roi = overlay_rgb[overlay_y1:overlay_y2, overlay_x1:overlay_x2]
-        alpha_roi = alpha[overlay_y1:overlay_y2, overlay_x1:overlay_x2, np.newaxis]
-        composite_roi = (1.0 - alpha_roi) * bg_roi + alpha_roi * overlay_roi
-        background_img[y1:y2, x1:x2] = composite_roi
\ No newline at end of file
+    bg_roi = background_img[y1:y2, x1:x2]
+    premultiplied = prepared.premultiplied[overlay_y1:overlay_y2, overlay_x1:overlay_x2]
+    inv_alpha = prepared.inv_alpha[overlay_y1:overlay_y2, overlay_x1:overlay_x2]
+
+    # tmp = bg * (255 - alpha) / 255, then bg = tmp + color * alpha / 255,
+    # written straight back into the background
+    tmp = _scratch.get("tmp", bg_roi.shape)
+    cv2.multiply(bg_roi, inv_alpha, dst=tmp, scale=1 / 255)
+    cv2.add(tmp, premultiplied, dst=bg_roi)
+
+
+def overlay_transparent(background_img, overlay_img, x, y, overlay_size=None):
+    """
+    Overlays a transparent PNG image on top of a backroung image.
+
+    Args:
+    background_img: The background image.
+    overlay_img: The transparent overlay image (4 channels), or a PreparedOverlay
+        from prepare_overlay() to skip the per-call preparation.
+    x, y: The top-left coordinates to place the overlay.
+    overlay_size: A tuple (width, height) to resize the overlay. If None, original size is used.
+    """
+
+    if overlay_img is None:
+        return
+
+    if isinstance(overlay_img, PreparedOverlay):
+        prepared = overlay_img
+        if overlay_size is not None:
+            h, w = prepared.inv_alpha.shape[:2]
+            if (w, h) != tuple(overlay_size):
+                raise ValueError("A PreparedOverlay cannot be resized; prepare it at the wanted size.")
+    else:
+        prepared = prepare_overlay(overlay_img, overlay_size)
+
+    blend_prepared(background_img, prepared, x, y)